@@ -2,28 +2,78 @@
 
 import os
 import json
+import asyncio
+from collections import deque
 from backboard import BackboardClient
-from typing import AsyncGenerator, Dict, List, Optional, TYPE_CHECKING
+from contextlib import aclosing
+from typing import AsyncGenerator, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple, TYPE_CHECKING
+
+from .agent_actions import ActionContext, is_server_action, run_server_action
+from .json_stream import StreamingJSONParser
+from .llm_router import LLMRouter, Route
+from .llm_scheduler import AGENT, LLMScheduler, estimate_tokens, get_scheduler
 
 if TYPE_CHECKING:
     from ..state import StateManager
 
 DEBUG_AGENT = True
 
+
+def _action_key(action: Dict) -> str:
+    return json.dumps(action, sort_keys=True, default=str)
+
+
 class AgentService:
     """
     Manages the Backboard AI Agent lifecycle.
     Handles assistant creation, thread management, and streaming chat.
     """
     
-    def __init__(self):
-        """Initialize the Backboard client."""
-        api_key = os.getenv("BACKBOARD")
-        if not api_key:
-            raise ValueError("BACKBOARD environment variable is required")
+    def __init__(
+        self,
+        client=None,
+        thread_pool_size: Optional[int] = None,
+        router: Optional[LLMRouter] = None,
+        scheduler: Optional[LLMScheduler] = None,
+    ):
+        """
+        Initialize the Backboard client.
         
-        self.client = BackboardClient(api_key=api_key)
+        Args:
+            client: Backboard client to use (e.g. LocalBackboardClient in tests);
+                    defaults to BackboardClient with the BACKBOARD API key
+            thread_pool_size: Pre-created threads to keep ready
+                              (defaults to AGENT_THREAD_POOL_SIZE or 3; 0 disables)
+            router: Model router for the agent_planning / agent_summary call
+                    classes (routes are Backboard model@llm_provider; the
+                    default routes use the assistant's own model)
+            scheduler: Admission control for planner/summary calls (defaults
+                       to the process-wide scheduler shared with LLMService)
+        """
+        if client is None:
+            api_key = os.getenv("BACKBOARD")
+            if not api_key:
+                raise ValueError("BACKBOARD environment variable is required")
+            client = BackboardClient(api_key=api_key)
+        
+        self.client = client
         self.assistant_id: Optional[str] = None
+        
+        # Pool of ready threads so connecting clients skip create_thread
+        if thread_pool_size is None:
+            thread_pool_size = int(os.getenv("AGENT_THREAD_POOL_SIZE", "3"))
+        self.thread_pool_size = thread_pool_size
+        self._thread_pool: deque = deque()
+        self._refill_task: Optional[asyncio.Task] = None
+        self._pool_stats = {"hits": 0, "misses": 0, "created": 0, "errors": 0}
+        
+        # Messages land in a shared thread, so calls are routed but never
+        # hedged or retried on another route (that would duplicate them)
+        self.router = router or LLMRouter.from_env({
+            "agent_planning": [Route(self.PLANNER_MODEL)],
+            "agent_summary": [Route(self.SUMMARY_MODEL)],
+        })
+        self.scheduler = scheduler or get_scheduler()
     
     def _robust_json_parse(self, content: str) -> dict | list | None:
         """
@@ -84,6 +134,9 @@ class AgentService:
         Returns:
             The assistant ID (created or reused)
         """
+        # Pooled threads belong to the previous assistant
+        self._thread_pool.clear()
+        
         if assistant_id:
             # Reuse existing assistant from environment/config
             self.assistant_id = assistant_id
@@ -116,6 +169,76 @@ class AgentService:
         print(f"[AgentService] Created thread: {thread.thread_id}")
         return thread
 
+    # ==================== THREAD POOL ====================
+
+    async def acquire_thread(self):
+        """
+        Get a thread for a new conversation, from the pool when possible.
+        
+        Falls back to create_thread() when the pool is empty, and schedules a
+        background refill either way.
+        
+        Raises:
+            RuntimeError: If assistant is not initialized
+        """
+        if not self.assistant_id:
+            raise RuntimeError("Assistant not initialized. Call initialize() first.")
+        
+        if self._thread_pool:
+            thread = self._thread_pool.popleft()
+            self._pool_stats["hits"] += 1
+        else:
+            self._pool_stats["misses"] += 1
+            thread = await self.create_thread()
+        
+        self.refill_thread_pool()
+        return thread
+
+    def refill_thread_pool(self) -> None:
+        """Top the pool up in the background (no-op if a refill is running)."""
+        if self.thread_pool_size <= 0 or not self.assistant_id:
+            return
+        if self._refill_task and not self._refill_task.done():
+            return
+        self._refill_task = asyncio.create_task(self._refill())
+
+    async def _refill(self) -> None:
+        assistant_id = self.assistant_id
+        while len(self._thread_pool) < self.thread_pool_size:
+            try:
+                thread = await self.client.create_thread(assistant_id)
+            except Exception as e:
+                # Retried on the next acquire
+                self._pool_stats["errors"] += 1
+                print(f"[AgentService] Thread pool refill error: {e}")
+                return
+            if assistant_id != self.assistant_id:
+                return  # Re-initialized while we were creating
+            self._thread_pool.append(thread)
+            self._pool_stats["created"] += 1
+
+    async def stop_thread_pool(self) -> None:
+        if self._refill_task and not self._refill_task.done():
+            self._refill_task.cancel()
+            try:
+                await self._refill_task
+            except asyncio.CancelledError:
+                pass
+        self._thread_pool.clear()
+
+    def get_pool_stats(self) -> Dict:
+        acquired = self._pool_stats["hits"] + self._pool_stats["misses"]
+        return {
+            "size": len(self._thread_pool),
+            "target_size": self.thread_pool_size,
+            "refilling": bool(self._refill_task and not self._refill_task.done()),
+            "hit_rate": round(self._pool_stats["hits"] / acquired, 3) if acquired else 0.0,
+            **self._pool_stats,
+        }
+
+    def get_router_stats(self) -> Dict:
+        return self.router.get_stats()
+
     async def stream_chat(
         self, 
         thread_id: str, 
@@ -461,6 +584,9 @@ class AgentService:
     PLANNER_MODEL = "google/gemini-2.0-flash-001"
     SUMMARY_MODEL = "openai/gpt-4o"
 
+    # Max consecutive server-only steps before handing control back
+    MAX_SERVER_ROUNDS = 6
+
     def _build_agent_system_prompt(self, commands: List[Dict]) -> str:
         """Build system prompt with available commands for the agent."""
         commands_desc = []
@@ -575,72 +701,235 @@ BAD - DO NOT DO THIS:
   ]
 }}"""
 
-    async def run_agent_step(
+    def _build_step_content(
+        self,
+        prompt: str,
+        commands: List[Dict],
+        observations: Optional[List[Dict]],
+    ) -> str:
+        if observations is None:
+            # First step - include system prompt and user request
+            system_prompt = self._build_agent_system_prompt(commands)
+            return f"{system_prompt}\n\nUSER REQUEST: {prompt}"
+        # Continuation - provide observation results
+        obs_text = json.dumps(observations, indent=2)
+        return f"COMMAND RESULTS:\n{obs_text}\n\nContinue with the next actions, or respond with done=true if complete."
+
+    @staticmethod
+    def _route_kwargs(route: Route) -> Dict[str, str]:
+        # Routes without a provider keep the assistant's configured model
+        if not route.provider:
+            return {}
+        return {"llm_provider": route.provider, "model_name": route.model}
+
+    async def _stream_content(self, thread_id: str, content: str, call_class: str) -> AsyncIterator[str]:
+        """Send a message on the best route for call_class and yield the reply's deltas."""
+        async with self.scheduler.slot(AGENT, estimate_tokens(content)):
+            routed = self.router.stream(
+                call_class,
+                lambda route: self._stream_reply(thread_id, content, route),
+                hedge=False,
+                failover=False,
+            )
+            async with aclosing(routed) as stream:
+                async for delta in stream:
+                    yield delta
+
+    async def _stream_reply(self, thread_id: str, content: str, route: Route) -> AsyncIterator[str]:
+        stream = await self.client.add_message(
+            thread_id=thread_id,
+            content=content,
+            memory="Auto",
+            stream=True,
+            **self._route_kwargs(route),
+        )
+        streamed = False
+        async for event in stream:
+            if not isinstance(event, dict):
+                continue
+            if event.get("type") == "content_streaming" and event.get("content"):
+                streamed = True
+                yield event["content"]
+            elif event.get("type") == "message_complete" and not streamed and event.get("content"):
+                # Providers that don't stream deliver the whole reply at the end
+                yield event["content"]
+
+    async def stream_agent_step(
         self,
         thread_id: str,
         prompt: str,
         commands: List[Dict],
         observations: Optional[List[Dict]] = None,
-    ) -> Dict:
+    ) -> AsyncIterator[Tuple[str, Dict]]:
         """
-        Run a single step of the agent loop.
+        Streaming variant of run_agent_step.
         
-        Args:
-            thread_id: Backboard thread ID
-            prompt: User's original request
-            commands: Available commands from frontend
-            observations: Results from previous command executions
-            
-        Returns:
-            Dict with reasoning, actions, and done flag
+        Yields ("action", action) as soon as each entry of "actions" is
+        complete in the streamed reply, then ("step", result) with the fully
+        parsed step (the authoritative action list).
         """
         if not self.assistant_id:
             raise RuntimeError("Assistant not initialized. Call initialize() first.")
 
-        # Build the message content
-        if observations is None:
-            # First step - include system prompt and user request
-            system_prompt = self._build_agent_system_prompt(commands)
-            content = f"{system_prompt}\n\nUSER REQUEST: {prompt}"
-        else:
-            # Continuation - provide observation results
-            obs_text = json.dumps(observations, indent=2)
-            content = f"COMMAND RESULTS:\n{obs_text}\n\nContinue with the next actions, or respond with done=true if complete."
+        content = self._build_step_content(prompt, commands, observations)
 
         if DEBUG_AGENT:
             print(f"[AgentService] Agent step with model: {self.PLANNER_MODEL}")
             print(f"[AgentService] Content: {content[:500]}...")
 
-        # Call Backboard with the planner model
+        parser = StreamingJSONParser(("actions",))
         try:
-            response = await self.client.add_message(
-                thread_id=thread_id,
-                content=content,
-                memory="Auto",
-                stream=False,
-            )
-            
-            # Extract content from response
-            response_content = ""
-            if hasattr(response, 'content'):
-                response_content = str(response.content)
-            else:
-                response_content = str(response)
-            
+            async with aclosing(self._stream_content(thread_id, content, "agent_planning")) as stream:
+                async for delta in stream:
+                    for action in parser.feed(delta):
+                        if isinstance(action, dict):
+                            yield "action", action
+
             if DEBUG_AGENT:
-                print(f"[AgentService] Raw response: {response_content}")
+                print(f"[AgentService] Raw response: {parser.text}")
 
             # Parse JSON from response
-            return self._parse_agent_response(response_content)
-
+            step = self._parse_agent_response(parser.text)
         except Exception as e:
             print(f"[AgentService] Agent step error: {e}")
-            return {
+            step = {
                 "reasoning": f"Error: {str(e)}",
                 "actions": [],
                 "done": True,
                 "error": str(e)
             }
+        yield "step", step
+
+    async def run_agent_step(
+        self,
+        thread_id: str,
+        prompt: str,
+        commands: List[Dict],
+        observations: Optional[List[Dict]] = None,
+    ) -> Dict:
+        """
+        Run a single step of the agent loop.
+        
+        Args:
+            thread_id: Backboard thread ID
+            prompt: User's original request
+            commands: Available commands from frontend
+            observations: Results from previous command executions
+            
+        Returns:
+            Dict with reasoning, actions, and done flag
+        """
+        step = {}
+        async for kind, item in self.stream_agent_step(thread_id, prompt, commands, observations):
+            if kind == "step":
+                step = item
+        return step
+
+    async def run_agent_turn(
+        self,
+        thread_id: str,
+        prompt: str,
+        commands: List[Dict],
+        observations: Optional[List[Dict]] = None,
+        action_context: Optional[ActionContext] = None,
+        on_step: Optional[Callable[[Dict], Awaitable[None]]] = None,
+        on_action: Optional[Callable[[Dict], Awaitable[None]]] = None,
+    ) -> Dict:
+        """
+        Run agent steps until the planner needs the client or is done.
+        
+        Read-only actions (see agent_actions.SERVER_ACTIONS) are executed on
+        the server in parallel and fed straight back as observations; only UI
+        actions are returned for the frontend to execute. Steps are streamed:
+        server actions start as soon as their JSON object closes, and client
+        actions are announced through on_action before the step completes.
+        
+        Args:
+            thread_id: Backboard thread ID
+            prompt: User's original request
+            commands: Available commands (include server commands for the first step)
+            observations: Results from previous command executions
+            action_context: Services for server actions (None sends every action to the client)
+            on_step: Called with each step before the next one starts
+            on_action: Called with each client action as soon as it is parsed
+            
+        Returns:
+            The last step: reasoning, client-side actions, done flag and
+            server_results (observations still owed to the planner when
+            client actions are pending)
+        """
+        def runs_on_server(action) -> bool:
+            return action_context is not None and isinstance(action, dict) and is_server_action(action)
+
+        rounds = 0
+        while True:
+            # Server actions started while the reply was still streaming
+            started: Dict[str, List[asyncio.Task]] = {}
+            step: Dict = {}
+            try:
+                async for kind, item in self.stream_agent_step(
+                    thread_id=thread_id,
+                    prompt=prompt,
+                    commands=commands,
+                    observations=observations,
+                ):
+                    if kind == "step":
+                        step = item
+                    elif runs_on_server(item):
+                        task = asyncio.create_task(run_server_action(item, action_context))
+                        started.setdefault(_action_key(item), []).append(task)
+                    elif on_action:
+                        await on_action(item)
+
+                actions = step.get("actions") or []
+                server_actions = [a for a in actions if runs_on_server(a)]
+                client_actions = [a for a in actions if not runs_on_server(a)]
+
+                # The parsed step is authoritative: reuse early tasks that match it
+                tasks = []
+                for action in server_actions:
+                    pending = started.get(_action_key(action))
+                    if pending:
+                        tasks.append(pending.pop(0))
+                    else:
+                        tasks.append(asyncio.create_task(run_server_action(action, action_context)))
+                server_results = list(await asyncio.gather(*tasks)) if tasks else []
+            finally:
+                for pending in started.values():
+                    for task in pending:
+                        task.cancel()
+
+            if server_actions and DEBUG_AGENT:
+                print(f"[AgentService] Ran {len(server_actions)} server actions")
+
+            rounds += 1
+            step = {
+                **step,
+                "actions": client_actions,
+                "server_actions": server_actions,
+                "server_results": server_results,
+            }
+            if not step.get("done") and not client_actions and (
+                not server_results or rounds >= self.MAX_SERVER_ROUNDS
+            ):
+                # Nothing left for anyone to execute
+                step["done"] = True
+            
+            if on_step:
+                await on_step(step)
+            
+            if step.get("done") or client_actions:
+                return step
+            observations = server_results
+
+    def _build_summary_prompt(self, prompt: str, all_observations: List[Dict]) -> str:
+        return f"""The user requested: "{prompt}"
+
+Here's what was accomplished:
+{json.dumps(all_observations, indent=2)}
+
+Write a brief, friendly 1-2 sentence summary of what was done. 
+Be conversational and mention specific actions taken."""
 
     async def generate_summary(
         self,
@@ -662,24 +951,24 @@ BAD - DO NOT DO THIS:
         if not self.assistant_id:
             raise RuntimeError("Assistant not initialized. Call initialize() first.")
 
-        summary_prompt = f"""The user requested: "{prompt}"
-
-Here's what was accomplished:
-{json.dumps(all_observations, indent=2)}
-
-Write a brief, friendly 1-2 sentence summary of what was done. 
-Be conversational and mention specific actions taken."""
-
         if DEBUG_AGENT:
             print(f"[AgentService] Generating summary with model: {self.SUMMARY_MODEL}")
 
         try:
-            response = await self.client.add_message(
-                thread_id=thread_id,
-                content=summary_prompt,
-                memory="Auto",
-                stream=False,
-            )
+            content = self._build_summary_prompt(prompt, all_observations)
+            async with self.scheduler.slot(AGENT, estimate_tokens(content)):
+                response = await self.router.call(
+                    "agent_summary",
+                    lambda route: self.client.add_message(
+                        thread_id=thread_id,
+                        content=content,
+                        memory="Auto",
+                        stream=False,
+                        **self._route_kwargs(route),
+                    ),
+                    hedge=False,
+                    failover=False,
+                )
             
             if hasattr(response, 'content'):
                 return str(response.content)
@@ -689,6 +978,31 @@ Be conversational and mention specific actions taken."""
             print(f"[AgentService] Summary generation error: {e}")
             return "Completed your request."
 
+    async def stream_summary(
+        self,
+        thread_id: str,
+        prompt: str,
+        all_observations: List[Dict],
+    ) -> AsyncIterator[str]:
+        """Streaming variant of generate_summary; yields text deltas."""
+        if not self.assistant_id:
+            raise RuntimeError("Assistant not initialized. Call initialize() first.")
+
+        if DEBUG_AGENT:
+            print(f"[AgentService] Streaming summary with model: {self.SUMMARY_MODEL}")
+
+        produced = False
+        try:
+            content = self._build_summary_prompt(prompt, all_observations)
+            async with aclosing(self._stream_content(thread_id, content, "agent_summary")) as stream:
+                async for delta in stream:
+                    produced = True
+                    yield delta
+        except Exception as e:
+            print(f"[AgentService] Summary generation error: {e}")
+        if not produced:
+            yield "Completed your request."
+
     def _parse_agent_response(self, response_content: str) -> Dict:
         """Parse the agent's JSON response using robust parsing."""
         parsed = self._robust_json_parse(response_content)
@@ -0,0 +1,218 @@
+"""
+Server-executable agent actions.
+
+Read-only agent commands (market search and lookups) run on the server, in
+parallel, and their results go straight back to the planner as observations.
+Only UI actions (opening panels, layout) are sent to the frontend, which
+removes a client round trip for every pure research step.
+
+Results use the same observation shape the frontend sends back:
+    {"command": ..., "status": "success" | "error", "result": "..."}
+"""
+
+import asyncio
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+if TYPE_CHECKING:
+    from ..state import StateManager
+
+DEBUG_AGENT_ACTIONS = False
+
+# Per-action timeout; a slow connector shouldn't stall the whole step
+ACTION_TIMEOUT_SECONDS = 8.0
+
+HISTORY_RANGES = {
+    "1H": 3600,
+    "6H": 6 * 3600,
+    "1D": 24 * 3600,
+    "5D": 5 * 24 * 3600,
+    "1W": 7 * 24 * 3600,
+    "1M": 30 * 24 * 3600,
+}
+
+
+@dataclass
+class ActionContext:
+    """Services available to server actions (anything may be None)."""
+    state: "StateManager"
+    poly: Any = None
+    kalshi: Any = None
+    pairing: Any = None
+    market_index: Any = None
+    price_history: Any = None
+
+
+ActionHandler = Callable[[Dict[str, Any], ActionContext], Awaitable[str]]
+
+
+def _market_line(market) -> str:
+    return f'- ID: "{market.market_id}" | Title: "{market.title}" | Source: {market.source}'
+
+
+async def search_markets_action(params: Dict[str, Any], ctx: ActionContext) -> str:
+    from ..search_helper import search_markets
+
+    query = str(params.get("query") or "").strip()
+    if not query:
+        raise ValueError("query is required")
+
+    # On-demand search on both platforms (results land in StateManager)
+    searches = [c.search_markets(query) for c in (ctx.poly, ctx.kalshi) if c]
+    if searches:
+        await asyncio.gather(*searches, return_exceptions=True)
+
+    markets, _, _ = search_markets(state=ctx.state, q=query, limit=5)
+    if not markets:
+        return "No markets found."
+    return "Found markets:\n" + "\n".join(_market_line(m) for m in markets)
+
+
+def _require_market(params: Dict[str, Any], ctx: ActionContext):
+    market_id = str(params.get("marketId") or params.get("market_id") or "").strip()
+    if not market_id:
+        raise ValueError("marketId is required")
+    market = ctx.state.get_market(market_id)
+    if not market:
+        raise ValueError(f"Market {market_id} not found. Use search-markets first.")
+    return market
+
+
+async def get_market_action(params: Dict[str, Any], ctx: ActionContext) -> str:
+    market = _require_market(params, ctx)
+    lines = [
+        f'Market "{market.title}" ({market.source}, {market.status})',
+        f"ID: {market.market_id}",
+    ]
+    if market.sector:
+        lines.append(f"Sector: {market.sector}")
+    if market.outcomes:
+        lines.append("Outcomes: " + ", ".join(f"{o.name} {o.price:.2f}" for o in market.outcomes[:6]))
+    lines.append(f"24h volume: {market.volume_24h:,.0f} | Liquidity: {market.liquidity:,.0f}")
+    if market.description:
+        lines.append(f"Description: {market.description[:300]}")
+    return "\n".join(lines)
+
+
+def _summarize_prices(name: str, prices: List[float]) -> str:
+    if not prices:
+        return f"- {name}: no history"
+    change = prices[-1] - prices[0]
+    return (
+        f"- {name}: {prices[0]:.3f} -> {prices[-1]:.3f} ({change:+.3f}), "
+        f"low {min(prices):.3f}, high {max(prices):.3f}, {len(prices)} points"
+    )
+
+
+async def get_history_action(params: Dict[str, Any], ctx: ActionContext) -> str:
+    market = _require_market(params, ctx)
+    range_key = str(params.get("range") or "1D").upper()
+
+    async def outcome_prices(outcome) -> List[float]:
+        token_id = outcome.outcome_id
+        if market.source == "polymarket" and ctx.poly and (token_id.isdigit() or len(token_id) > 20):
+            try:
+                if ctx.price_history:
+                    raw = await ctx.price_history.get_history(token_id, range_key)
+                else:
+                    raw = await ctx.poly.fetch_price_history(token_id, range_key)
+                if raw:
+                    return [float(p.get("p", 0)) for p in raw]
+            except Exception as e:
+                print(f"[AgentActions] History fetch error for {token_id}: {e}")
+        points = ctx.state.get_history(market.market_id, token_id, HISTORY_RANGES.get(range_key))
+        return [p.mid for p in points]
+
+    outcomes = market.outcomes[:3]
+    series = await asyncio.gather(*(outcome_prices(o) for o in outcomes))
+    lines = [f'Price history ({range_key}) for "{market.title}":']
+    lines.extend(_summarize_prices(o.name, prices) for o, prices in zip(outcomes, series))
+    return "\n".join(lines)
+
+
+async def compare_action(params: Dict[str, Any], ctx: ActionContext) -> str:
+    from ..matching import find_related_market
+
+    market = _require_market(params, ctx)
+    matches: List[Tuple[Any, Optional[float]]] = []
+    if ctx.pairing:
+        if not ctx.pairing.is_paired(market.market_id):
+            await ctx.pairing.refresh(market.market_id)
+        matches = list(ctx.pairing.get_pairs(market.market_id)[:3])
+    if not matches:
+        related = find_related_market(market, ctx.state.get_all_markets(), index=ctx.market_index)
+        if related:
+            matches = [(related, None)]
+    if not matches:
+        return f'No equivalent market found for "{market.title}".'
+
+    lines = [f'Equivalent markets for "{market.title}" ({market.source}):']
+    for other, score in matches:
+        line = _market_line(other)
+        if score is not None:
+            line += f" | Similarity: {score:.2f}"
+        if other.outcomes and market.outcomes:
+            line += f" | Price: {other.outcomes[0].price:.2f} vs {market.outcomes[0].price:.2f}"
+        lines.append(line)
+    return "\n".join(lines)
+
+
+# command id -> (handler, command descriptor advertised to the planner)
+SERVER_ACTIONS: Dict[str, Tuple[ActionHandler, Dict]] = {
+    "search-markets": (search_markets_action, {
+        "id": "search-markets",
+        "label": "Search Markets",
+        "description": "Search for prediction markets by query to get Market IDs",
+        "params": [{"name": "query", "type": "text"}],
+    }),
+    "get-market": (get_market_action, {
+        "id": "get-market",
+        "label": "Get Market",
+        "description": "Get details (outcome prices, volume, description) for a market ID",
+        "params": [{"name": "marketId", "type": "market"}],
+    }),
+    "get-history": (get_history_action, {
+        "id": "get-history",
+        "label": "Get Price History",
+        "description": "Summarize a market's price history (range: 1H, 6H, 1D, 5D, 1W, 1M)",
+        "params": [{"name": "marketId", "type": "market"}, {"name": "range", "type": "text"}],
+    }),
+    "compare": (compare_action, {
+        "id": "compare",
+        "label": "Compare Across Platforms",
+        "description": "Find the equivalent market on the other platform and compare prices",
+        "params": [{"name": "marketId", "type": "market"}],
+    }),
+}
+
+
+def is_server_action(action: Dict) -> bool:
+    return action.get("command") in SERVER_ACTIONS
+
+
+def with_server_commands(commands: List[Dict]) -> List[Dict]:
+    """Advertise server actions the frontend didn't already list."""
+    listed = {c.get("id") for c in commands}
+    return commands + [desc for cmd_id, (_, desc) in SERVER_ACTIONS.items() if cmd_id not in listed]
+
+
+async def run_server_action(action: Dict, ctx: ActionContext) -> Dict:
+    command = action.get("command")
+    handler, _ = SERVER_ACTIONS[command]
+    try:
+        result = await asyncio.wait_for(
+            handler(action.get("params") or {}, ctx),
+            timeout=ACTION_TIMEOUT_SECONDS,
+        )
+        return {"command": command, "status": "success", "result": result}
+    except asyncio.TimeoutError:
+        return {"command": command, "status": "error", "result": "Timed out"}
+    except Exception as e:
+        if DEBUG_AGENT_ACTIONS:
+            print(f"[AgentActions] {command} failed: {e}")
+        return {"command": command, "status": "error", "result": str(e)}
+
+
+async def run_server_actions(actions: List[Dict], ctx: ActionContext) -> List[Dict]:
+    """Run server actions concurrently; results keep the actions' order."""
+    return list(await asyncio.gather(*(run_server_action(a, ctx) for a in actions)))
@@ -0,0 +1,144 @@
+"""
+Incremental JSON parser for streamed LLM output.
+
+Feed text chunks as they arrive; every completed item of one target container
+is emitted as soon as its closing character is seen, so callers can act on
+partial responses:
+
+    parser = StreamingJSONParser()            # items of the root container
+    parser = StreamingJSONParser(("actions",))  # items of root["actions"]
+
+Object members are emitted as (key, value) tuples, array elements as values.
+Leading prose or a markdown fence before the root "{" / "[" is skipped.
+Items that fail to parse are dropped; callers that need the full result
+should still parse the complete text at the end.
+"""
+
+import json
+from typing import Any, List, Optional, Tuple, Union
+
+PathKey = Union[str, int]
+
+
+class _Frame:
+    __slots__ = ("kind", "key", "state", "pending_key", "count")
+
+    def __init__(self, kind: str, key: Optional[PathKey]):
+        self.kind = kind  # "{" or "["
+        self.key = key  # Key/index of this container in its parent
+        self.state = "key" if kind == "{" else "value"
+        self.pending_key: Optional[str] = None
+        self.count = 0
+
+
+class StreamingJSONParser:
+    def __init__(self, path: Tuple[PathKey, ...] = ()):
+        self.path = tuple(path)
+        self.done = False
+        self._buf = ""
+        self._pos = 0
+        self._stack: List[_Frame] = []
+        self._in_string = False
+        self._escape = False
+        self._string_start = 0
+        # Start offset (and object key) of the target item being read
+        self._item_start: Optional[int] = None
+        self._item_key: Optional[str] = None
+
+    @property
+    def text(self) -> str:
+        """Everything fed so far."""
+        return self._buf
+
+    def _at_target(self) -> bool:
+        if len(self._stack) != len(self.path) + 1:
+            return False
+        return tuple(f.key for f in self._stack[1:]) == self.path
+
+    def _emit(self, end: int, out: list) -> None:
+        raw = self._buf[self._item_start:end].strip()
+        key = self._item_key
+        self._item_start = None
+        self._item_key = None
+        try:
+            value = json.loads(raw)
+        except ValueError:
+            return
+        frame = self._stack[-1]
+        out.append((key, value) if frame.kind == "{" else value)
+
+    def feed(self, chunk: str) -> List[Any]:
+        """Consume a chunk and return the target items it completed."""
+        self._buf += chunk
+        out: List[Any] = []
+        buf = self._buf
+        i = self._pos
+
+        while i < len(buf) and not self.done:
+            c = buf[i]
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif c == "\\":
+                    self._escape = True
+                elif c == '"':
+                    self._in_string = False
+                    frame = self._stack[-1]
+                    if frame.kind == "{" and frame.state == "colon":
+                        try:
+                            frame.pending_key = json.loads(buf[self._string_start:i + 1])
+                        except ValueError:
+                            frame.pending_key = None
+                    elif self._item_start is not None and self._at_target():
+                        self._emit(i + 1, out)
+                i += 1
+                continue
+
+            if not self._stack:
+                # Skip prose / code fences before the root container
+                if c in "{[":
+                    self._stack.append(_Frame(c, None))
+                i += 1
+                continue
+
+            frame = self._stack[-1]
+
+            if c in " \t\r\n":
+                pass
+            elif c == "," or c in "}]":
+                if self._item_start is not None and self._at_target():
+                    self._emit(i, out)  # Pending primitive (number/bool/null)
+                if c == ",":
+                    frame.state = "key" if frame.kind == "{" else "value"
+                else:
+                    self._stack.pop()
+                    if not self._stack:
+                        self.done = True
+                    elif self._item_start is not None and self._at_target():
+                        self._emit(i + 1, out)
+            elif frame.kind == "{" and frame.state == "key":
+                if c == '"':
+                    self._in_string = True
+                    self._string_start = i
+                    frame.state = "colon"
+            elif c == ":":
+                if frame.kind == "{":
+                    frame.state = "value"
+            elif frame.state == "value":
+                key: Optional[PathKey] = frame.pending_key if frame.kind == "{" else frame.count
+                if self._at_target():
+                    self._item_start = i
+                    self._item_key = frame.pending_key
+                frame.state = "after"
+                frame.count += 1
+                if c in "{[":
+                    self._stack.append(_Frame(c, key))
+                elif c == '"':
+                    self._in_string = True
+                    self._string_start = i
+
+            i += 1
+
+        self._pos = i
+        return out
@@ -0,0 +1,224 @@
+"""Content-addressed response cache for LLM calls."""
+
+import asyncio
+import hashlib
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+
+from ..storage import connect_sqlite
+
+DEBUG_LLM_CACHE = False
+
+# TTL (seconds) per call site. Prompts embed their own context (history,
+# article text), so the TTL only bounds how stale an identical answer may be.
+CALL_SITE_TTLS: Dict[str, float] = {
+    "sentiment": 24 * 3600,
+    "summary": 30 * 60,
+    "search_queries": 24 * 3600,
+    "keywords": 5 * 60,
+    "suggestions": 60,
+    "default": 5 * 60,
+}
+
+
+class LLMResponseCache:
+    """
+    Two-tier cache keyed by (model, prompt hash).
+
+    - Memory tier: LRU bounded by max_entries
+    - Disk tier: optional SQLite file, shared across restarts
+    - Identical in-flight prompts share one upstream call (single-flight)
+    - Callers can reject a response (validate) so it isn't cached
+    """
+
+    def __init__(self, max_entries: int = 2000, db_path: Optional[str] = None):
+        self.max_entries = max_entries
+        self._memory: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._waiters: Dict[str, int] = {}
+
+        # Stats
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.inflight_joins = 0
+        self.latency_saved = 0.0
+        # call_site -> (total seconds, calls) of real upstream calls
+        self._latency: Dict[str, Tuple[float, int]] = {}
+
+        self._db = None
+        if db_path:
+            self._db = connect_sqlite(db_path)
+            self._db.execute(
+                """
+                CREATE TABLE IF NOT EXISTS llm_responses (
+                    key TEXT PRIMARY KEY,
+                    response TEXT NOT NULL,
+                    expires_at REAL NOT NULL
+                )
+                """
+            )
+            self._db.commit()
+
+    @staticmethod
+    def make_key(model: str, prompt: str) -> str:
+        """
+        Key for a prompt sent to `model`. For routed calls LLMService passes
+        the call site's candidate routes rather than the model that happened
+        to answer (unknown before the call): any route in that set may serve
+        a cached entry, and changing the routes starts fresh entries. Hit and
+        latency-saved stats are likewise per call site, not per model.
+        """
+        return hashlib.sha256(f"{model}\0{prompt}".encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        entry = self._memory.get(key)
+        if entry is not None:
+            response, expires_at = entry
+            if now < expires_at:
+                self._memory.move_to_end(key)
+                return response
+            del self._memory[key]
+
+        if self._db is not None:
+            row = self._db.execute(
+                "SELECT response, expires_at FROM llm_responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row and now < row[1]:
+                self.disk_hits += 1
+                self._remember(key, row[0], row[1])
+                return row[0]
+        return None
+
+    def put(self, key: str, response: str, ttl: float) -> None:
+        expires_at = time.time() + ttl
+        self._remember(key, response, expires_at)
+        if self._db is not None:
+            try:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO llm_responses VALUES (?, ?, ?)",
+                    (key, response, expires_at),
+                )
+                self._db.commit()
+            except Exception as e:
+                print(f"[LLMCache] Persist error: {e}")
+
+    def _remember(self, key: str, response: str, expires_at: float) -> None:
+        self._memory[key] = (response, expires_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    @staticmethod
+    def ttl_for(call_site: str) -> float:
+        return CALL_SITE_TTLS.get(call_site, CALL_SITE_TTLS["default"])
+
+    def lookup(self, model: str, prompt: str, call_site: str = "default") -> Optional[str]:
+        """Counted lookup for callers that don't go through get_or_call (streaming)."""
+        cached = self.get(self.make_key(model, prompt))
+        if cached is not None:
+            self.hits += 1
+            self.latency_saved += self._avg_latency(call_site)
+        else:
+            self.misses += 1
+        return cached
+
+    def store(self, model: str, prompt: str, response: str, call_site: str = "default") -> None:
+        if response:
+            self.put(self.make_key(model, prompt), response, self.ttl_for(call_site))
+
+    def _avg_latency(self, call_site: str) -> float:
+        total, count = self._latency.get(call_site, (0.0, 0))
+        return total / count if count else 0.0
+
+    async def get_or_call(
+        self,
+        model: str,
+        prompt: str,
+        call: Callable[[], Awaitable[str]],
+        call_site: str = "default",
+        ttl: Optional[float] = None,
+        validate: Optional[Callable[[str], bool]] = None,
+    ) -> str:
+        """
+        Cached response for the prompt, calling upstream on a miss.
+
+        Concurrent callers share one upstream call, which is only cancelled
+        once every waiting caller has given up. With `validate`, a response
+        is only cached if it accepts it (e.g. it parses), so a malformed
+        answer is retried next time instead of being served for the TTL.
+        """
+        key = self.make_key(model, prompt)
+
+        cached = self.get(key)
+        if cached is not None:
+            self.hits += 1
+            self.latency_saved += self._avg_latency(call_site)
+            if DEBUG_LLM_CACHE:
+                print(f"[LLMCache] Hit ({call_site})")
+            return cached
+
+        task = self._inflight.get(key)
+        if task is not None and not task.cancelled():
+            self.inflight_joins += 1
+            self.latency_saved += self._avg_latency(call_site)
+        else:
+            self.misses += 1
+            task = asyncio.create_task(self._call_and_store(key, call, call_site, ttl, validate))
+            self._inflight[key] = task
+
+            def forget(done: asyncio.Task) -> None:
+                if self._inflight.get(key) is done:
+                    del self._inflight[key]
+
+            task.add_done_callback(forget)
+
+        self._waiters[key] = self._waiters.get(key, 0) + 1
+        try:
+            return await asyncio.shield(task)
+        except asyncio.CancelledError:
+            # Abort the upstream call only when nobody is left waiting for it
+            if self._waiters.get(key) == 1 and not task.done():
+                task.cancel()
+            raise
+        finally:
+            remaining = self._waiters.get(key, 1) - 1
+            if remaining:
+                self._waiters[key] = remaining
+            else:
+                self._waiters.pop(key, None)
+
+    async def _call_and_store(
+        self,
+        key: str,
+        call: Callable[[], Awaitable[str]],
+        call_site: str,
+        ttl: Optional[float],
+        validate: Optional[Callable[[str], bool]],
+    ) -> str:
+        start = time.perf_counter()
+        response = await call()
+
+        total, count = self._latency.get(call_site, (0.0, 0))
+        self._latency[call_site] = (total + time.perf_counter() - start, count + 1)
+
+        if response and (validate is None or validate(response)):
+            self.put(key, response, ttl if ttl is not None else self.ttl_for(call_site))
+        elif response and DEBUG_LLM_CACHE:
+            print(f"[LLMCache] Not caching rejected response ({call_site})")
+        return response
+
+    def get_stats(self) -> Dict:
+        lookups = self.hits + self.misses + self.inflight_joins
+        return {
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "inflight_joins": self.inflight_joins,
+            "hit_rate": round((self.hits + self.inflight_joins) / lookups, 3) if lookups else 0.0,
+            "estimated_latency_saved_seconds": round(self.latency_saved, 2),
+            "memory_entries": len(self._memory),
+            "disk_enabled": self._db is not None,
+        }
@@ -0,0 +1,350 @@
+"""
+Latency-aware routing of LLM calls across models/providers.
+
+Each call class (a call site such as "suggestions", "sentiment" or the
+agent's "planning") has an ordered list of candidate routes. The router keeps
+a sliding window of latency and errors per (call class, route) and sends each
+call to the fastest healthy candidate. Optionally, a hedged request is fired
+at the next candidate once the first hasn't answered within its own p95.
+
+Routes are configured per call class with LLM_ROUTES_<CLASS> (falling back to
+LLM_ROUTES_DEFAULT), e.g.
+    LLM_ROUTES_SUGGESTIONS="google/gemini-2.0-flash-001@cerebras,meta-llama/llama-3.3-70b-instruct@groq"
+and hedging with LLM_HEDGE="suggestions,sentiment" (or "all").
+
+For streamed calls the recorded latency is time to first chunk, which is
+also what hedging races on.
+"""
+
+import asyncio
+import os
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, AsyncContextManager, AsyncIterator, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple, TypeVar
+
+DEBUG_LLM_ROUTER = False
+
+T = TypeVar("T")
+
+
+@dataclass(frozen=True)
+class Route:
+    """A model, optionally pinned to one provider (None keeps the caller's default)."""
+    model: str
+    provider: Optional[str] = None
+
+    def __str__(self) -> str:
+        return f"{self.model}@{self.provider}" if self.provider else self.model
+
+
+def parse_routes(spec: str) -> List[Route]:
+    """Parse "model@provider,model" into routes."""
+    routes = []
+    for item in spec.split(","):
+        item = item.strip()
+        if not item:
+            continue
+        model, _, provider = item.partition("@")
+        routes.append(Route(model.strip(), provider.strip() or None))
+    return routes
+
+
+class RouteStats:
+    """Sliding window (by count and age) of call outcomes for one route."""
+
+    def __init__(self, window_size: int = 50, window_seconds: float = 300.0):
+        self.window_seconds = window_seconds
+        self._samples: deque = deque(maxlen=window_size)  # (ts, latency, ok)
+
+    def record(self, latency: float, ok: bool, now: Optional[float] = None) -> None:
+        self._samples.append((now if now is not None else time.monotonic(), latency, ok))
+
+    def _prune(self) -> None:
+        cutoff = time.monotonic() - self.window_seconds
+        while self._samples and self._samples[0][0] < cutoff:
+            self._samples.popleft()
+
+    @property
+    def count(self) -> int:
+        self._prune()
+        return len(self._samples)
+
+    @property
+    def error_rate(self) -> float:
+        self._prune()
+        if not self._samples:
+            return 0.0
+        return sum(1 for _, _, ok in self._samples if not ok) / len(self._samples)
+
+    def percentile(self, q: float) -> Optional[float]:
+        """Latency percentile (0-1) over successful calls, None without data."""
+        self._prune()
+        latencies = sorted(lat for _, lat, ok in self._samples if ok)
+        if not latencies:
+            return None
+        return latencies[min(len(latencies) - 1, int(q * len(latencies)))]
+
+    def to_dict(self) -> Dict[str, Any]:
+        p50, p95 = self.percentile(0.5), self.percentile(0.95)
+        return {
+            "samples": self.count,
+            "error_rate": round(self.error_rate, 3),
+            "p50_ms": round(p50 * 1000, 1) if p50 is not None else None,
+            "p95_ms": round(p95 * 1000, 1) if p95 is not None else None,
+        }
+
+
+class LLMRouter:
+    """
+    Picks the fastest healthy route per call class, with optional hedging
+    and failover to the next candidate.
+    """
+
+    def __init__(
+        self,
+        routes: Dict[str, List[Route]],
+        hedge_classes: Iterable[str] = (),
+        window_size: int = 50,
+        window_seconds: float = 300.0,
+        min_samples: int = 3,
+        max_error_rate: float = 0.5,
+    ):
+        """
+        Args:
+            routes: call class -> candidate routes in preference order
+                    ("default" is used for classes without their own list)
+            hedge_classes: Call classes allowed to hedge ("all" for every class)
+            window_size: Samples kept per route
+            window_seconds: Max age of a sample
+            min_samples: Samples needed before a route's latency/health counts
+            max_error_rate: Routes above this error rate are tried last
+        """
+        self.routes = {k: list(v) for k, v in routes.items() if v}
+        self.hedge_classes = set(hedge_classes)
+        self.window_size = window_size
+        self.window_seconds = window_seconds
+        self.min_samples = min_samples
+        self.max_error_rate = max_error_rate
+        self._stats: Dict[Tuple[str, Route], RouteStats] = {}
+
+        # Counters
+        self.hedges = 0
+        self.hedge_wins = 0
+        self.failovers = 0
+
+    @classmethod
+    def from_env(cls, defaults: Dict[str, List[Route]], **kwargs) -> "LLMRouter":
+        """Build a router from defaults overridden by LLM_ROUTES_<CLASS> / LLM_HEDGE."""
+        routes = dict(defaults)
+        prefix = "LLM_ROUTES_"
+        for name, value in os.environ.items():
+            if name.startswith(prefix) and value.strip():
+                routes[name[len(prefix):].lower()] = parse_routes(value)
+        hedge = [c.strip().lower() for c in os.getenv("LLM_HEDGE", "").split(",") if c.strip()]
+        if any(c in ("1", "true", "yes") for c in hedge):
+            hedge = ["all"]
+        return cls(routes, hedge_classes=hedge, **kwargs)
+
+    def routes_for(self, call_class: str) -> List[Route]:
+        return self.routes.get(call_class) or self.routes.get("default", [])
+
+    def stats_for(self, call_class: str, route: Route) -> RouteStats:
+        key = (call_class, route)
+        stats = self._stats.get(key)
+        if stats is None:
+            stats = self._stats[key] = RouteStats(self.window_size, self.window_seconds)
+        return stats
+
+    def record(self, call_class: str, route: Route, latency: float, ok: bool) -> None:
+        self.stats_for(call_class, route).record(latency, ok)
+
+    def _healthy(self, stats: RouteStats) -> bool:
+        return stats.count < self.min_samples or stats.error_rate <= self.max_error_rate
+
+    def rank(self, call_class: str) -> List[Route]:
+        """
+        Candidates, best first: healthy routes by median latency (routes
+        without enough samples first, so they get measured), then unhealthy
+        routes by error rate. Ties keep the configured order.
+        """
+        healthy, unhealthy = [], []
+        for order, route in enumerate(self.routes_for(call_class)):
+            stats = self.stats_for(call_class, route)
+            if self._healthy(stats):
+                p50 = stats.percentile(0.5) if stats.count >= self.min_samples else None
+                healthy.append((p50 if p50 is not None else 0.0, order, route))
+            else:
+                unhealthy.append((stats.error_rate, order, route))
+        return [r for _, _, r in sorted(healthy)] + [r for _, _, r in sorted(unhealthy)]
+
+    def hedge_delay(self, call_class: str, route: Route) -> Optional[float]:
+        """Seconds to wait for route before hedging (None: don't hedge)."""
+        if "all" not in self.hedge_classes and call_class not in self.hedge_classes:
+            return None
+        stats = self.stats_for(call_class, route)
+        if stats.count < self.min_samples:
+            return None
+        return stats.percentile(0.95)
+
+    async def _timed(self, call_class: str, route: Route, fn: Callable[[Route], Awaitable[T]]) -> T:
+        start = time.perf_counter()
+        try:
+            result = await fn(route)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            self.record(call_class, route, time.perf_counter() - start, False)
+            raise
+        self.record(call_class, route, time.perf_counter() - start, True)
+        return result
+
+    async def _race(
+        self,
+        call_class: str,
+        primary: Route,
+        backup: Route,
+        delay: float,
+        fn: Callable[[Route], Awaitable[T]],
+        discard: Optional[Callable[[T], Awaitable[None]]],
+        hedge_slot: Optional[Callable[[], AsyncContextManager[Any]]] = None,
+    ) -> T:
+        """
+        Run primary; start backup after delay (or on primary failure); first
+        success wins. A hedged backup runs alongside the primary, so it first
+        takes its own hedge_slot (a failover reuses the caller's).
+        """
+        async def hedged() -> T:
+            async with hedge_slot():
+                return await self._timed(call_class, backup, fn)
+
+        first = asyncio.create_task(self._timed(call_class, primary, fn))
+        tasks = {first}
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=delay)
+            if not done or first.exception() is not None:
+                if done:
+                    self.failovers += 1
+                    tasks.add(asyncio.create_task(self._timed(call_class, backup, fn)))
+                else:
+                    self.hedges += 1
+                    if DEBUG_LLM_ROUTER:
+                        print(f"[LLMRouter] Hedging {call_class}: {primary} slower than {delay:.2f}s, trying {backup}")
+                    tasks.add(asyncio.create_task(
+                        hedged() if hedge_slot else self._timed(call_class, backup, fn)
+                    ))
+
+            error: Optional[BaseException] = None
+            pending = set(tasks)
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is not first:
+                            self.hedge_wins += 1
+                        tasks.discard(task)
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+                elif discard and not task.cancelled() and task.exception() is None:
+                    await discard(task.result())
+
+    async def call(
+        self,
+        call_class: str,
+        fn: Callable[[Route], Awaitable[T]],
+        hedge: bool = True,
+        failover: bool = True,
+        discard: Optional[Callable[[T], Awaitable[None]]] = None,
+        hedge_slot: Optional[Callable[[], AsyncContextManager[Any]]] = None,
+    ) -> T:
+        """
+        Run fn(route) on the best route for call_class.
+
+        Args:
+            call_class: Routing/statistics class
+            fn: Performs the call for a given route
+            hedge: Allow a hedged request (if the class is configured to hedge)
+            failover: Retry on the next candidate when a route fails; turn
+                      off for calls with side effects
+            discard: Cleans up the result of a losing hedged request
+            hedge_slot: Admission for a hedged request, which runs next to
+                        the caller's own (e.g. an LLMScheduler slot)
+        """
+        ranked = self.rank(call_class)
+        if not ranked:
+            raise RuntimeError(f"No LLM routes configured for {call_class}")
+
+        error: Optional[Exception] = None
+        i = 0
+        while i < len(ranked):
+            route = ranked[i]
+            backup = ranked[i + 1] if i + 1 < len(ranked) else None
+            delay = self.hedge_delay(call_class, route) if hedge and backup else None
+            try:
+                if delay is not None:
+                    return await self._race(call_class, route, backup, delay, fn, discard, hedge_slot)
+                return await self._timed(call_class, route, fn)
+            except Exception as e:
+                error = e
+                if not failover:
+                    raise
+            i += 2 if delay is not None else 1
+            if i < len(ranked):
+                self.failovers += 1
+                if DEBUG_LLM_ROUTER:
+                    print(f"[LLMRouter] {call_class} failed on {route}: {error}; trying {ranked[i]}")
+        raise error
+
+    async def stream(
+        self,
+        call_class: str,
+        open_stream: Callable[[Route], AsyncIterator[str]],
+        hedge: bool = True,
+        failover: bool = True,
+        hedge_slot: Optional[Callable[[], AsyncContextManager[Any]]] = None,
+    ) -> AsyncIterator[str]:
+        """
+        Stream from the best route. Routing, hedging and failover apply up to
+        the first chunk; after that the chosen stream is consumed to the end.
+        """
+        async def first_chunk(route: Route) -> Tuple[AsyncIterator[str], Optional[str]]:
+            stream = open_stream(route)
+            try:
+                return stream, await stream.__anext__()
+            except StopAsyncIteration:
+                return stream, None
+            except BaseException:
+                await stream.aclose()
+                raise
+
+        async def close(opened: Tuple[AsyncIterator[str], Optional[str]]) -> None:
+            await opened[0].aclose()
+
+        stream, first = await self.call(
+            call_class, first_chunk, hedge=hedge, failover=failover, discard=close, hedge_slot=hedge_slot,
+        )
+        try:
+            if first is None:
+                return
+            yield first
+            async for chunk in stream:
+                yield chunk
+        finally:
+            await stream.aclose()
+
+    def get_stats(self) -> Dict[str, Any]:
+        routes: Dict[str, Dict[str, Any]] = {}
+        for (call_class, route), stats in self._stats.items():
+            routes.setdefault(call_class, {})[str(route)] = stats.to_dict()
+        return {
+            "routes": routes,
+            "hedge_classes": sorted(self.hedge_classes),
+            "hedges": self.hedges,
+            "hedge_wins": self.hedge_wins,
+            "failovers": self.failovers,
+        }
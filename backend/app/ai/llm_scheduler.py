@@ -0,0 +1,217 @@
+"""
+Process-wide scheduler for outbound LLM calls.
+
+Every LLM request (OpenRouter via LLMService, Backboard via AgentService)
+takes a slot here first:
+
+- Priority classes: interactive (suggestions, keywords, search queries)
+  before agent steps before batch research (sentiment, report summaries)
+- Global budget: max concurrent requests and max estimated prompt tokens in
+  flight; a few slots are reserved for interactive calls so a large
+  sentiment job can't occupy all of them
+- Fairness: within a class, waiting requests are served round-robin per
+  client (the WebSocket connection, via the llm_client context variable)
+- Queue-time metrics per class
+
+Cache hits never reach the scheduler.
+"""
+
+import asyncio
+import os
+import time
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import AsyncIterator, Deque, Dict, Optional
+
+DEBUG_LLM_SCHEDULER = False
+
+INTERACTIVE = 0
+AGENT = 1
+BATCH = 2
+
+PRIORITY_NAMES = {INTERACTIVE: "interactive", AGENT: "agent", BATCH: "batch"}
+
+# LLMService call site -> priority class (unlisted sites are interactive)
+CALL_SITE_PRIORITIES: Dict[str, int] = {
+    "suggestions": INTERACTIVE,
+    "search_queries": INTERACTIVE,
+    "keywords": INTERACTIVE,
+    "sentiment": BATCH,
+    "summary": BATCH,
+}
+
+# Who a request is made on behalf of; set once per WebSocket connection
+llm_client: ContextVar[str] = ContextVar("llm_client", default="anonymous")
+
+
+def priority_for(call_site: str) -> int:
+    return CALL_SITE_PRIORITIES.get(call_site, INTERACTIVE)
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough prompt size (~4 characters per token)."""
+    return len(text) // 4 + 1
+
+
+class _Waiter:
+    __slots__ = ("future", "priority", "tokens", "client", "enqueued_at")
+
+    def __init__(self, priority: int, tokens: int, client: str):
+        self.future: asyncio.Future = asyncio.get_running_loop().create_future()
+        self.priority = priority
+        self.tokens = tokens
+        self.client = client
+        self.enqueued_at = time.perf_counter()
+
+
+class LLMScheduler:
+    """Priority + fair-share admission control for LLM requests."""
+
+    def __init__(
+        self,
+        max_concurrency: int = 8,
+        max_inflight_tokens: int = 60000,
+        interactive_reserve: int = 2,
+        metrics_window: int = 200,
+    ):
+        """
+        Args:
+            max_concurrency: Requests in flight across the process
+            max_inflight_tokens: Estimated prompt tokens in flight (a single
+                                 larger request is still admitted when idle)
+            interactive_reserve: Slots only interactive requests may use
+            metrics_window: Recent queue times kept per class
+        """
+        self.max_concurrency = max(1, max_concurrency)
+        self.max_inflight_tokens = max_inflight_tokens
+        self.interactive_reserve = min(max(0, interactive_reserve), self.max_concurrency - 1)
+
+        # priority -> client -> FIFO of waiters (clients served round-robin)
+        self._queues: Dict[int, "OrderedDict[str, Deque[_Waiter]]"] = {
+            p: OrderedDict() for p in PRIORITY_NAMES
+        }
+        self.in_flight = 0
+        self.inflight_tokens = 0
+
+        # Metrics
+        self._waits: Dict[int, Deque[float]] = {p: deque(maxlen=metrics_window) for p in PRIORITY_NAMES}
+        self._admitted: Dict[int, int] = {p: 0 for p in PRIORITY_NAMES}
+        self._abandoned: Dict[int, int] = {p: 0 for p in PRIORITY_NAMES}
+
+    @classmethod
+    def from_env(cls) -> "LLMScheduler":
+        return cls(
+            max_concurrency=int(os.getenv("LLM_MAX_CONCURRENCY", "8")),
+            max_inflight_tokens=int(os.getenv("LLM_MAX_INFLIGHT_TOKENS", "60000")),
+            interactive_reserve=int(os.getenv("LLM_INTERACTIVE_RESERVE", "2")),
+        )
+
+    def queued(self, priority: Optional[int] = None) -> int:
+        priorities = [priority] if priority is not None else list(self._queues)
+        return sum(len(q) for p in priorities for q in self._queues[p].values())
+
+    def _fits(self, priority: int, tokens: int) -> bool:
+        limit = self.max_concurrency if priority == INTERACTIVE else self.max_concurrency - self.interactive_reserve
+        if self.in_flight >= limit:
+            return False
+        return self.in_flight == 0 or self.inflight_tokens + tokens <= self.max_inflight_tokens
+
+    def _grant(self, waiter: _Waiter) -> None:
+        waiter.future.set_result(None)
+        self.in_flight += 1
+        self.inflight_tokens += waiter.tokens
+        self._admitted[waiter.priority] += 1
+        self._waits[waiter.priority].append(time.perf_counter() - waiter.enqueued_at)
+
+    def _dispatch(self) -> None:
+        """Admit waiters in priority order, round-robin across clients."""
+        while True:
+            queue = next((self._queues[p] for p in sorted(self._queues) if self._queues[p]), None)
+            if queue is None:
+                return
+            client, waiters = next(iter(queue.items()))
+            waiter = waiters[0]
+            if waiter.future.done():
+                # Cancelled in the same tick as a release, before slot() could
+                # dequeue it: skip it instead of granting it the slot
+                waiters.popleft()
+                if not waiters:
+                    del queue[client]
+                continue
+            # Strict priority: lower classes wait while a higher one is blocked
+            if not self._fits(waiter.priority, waiter.tokens):
+                return
+            waiters.popleft()
+            del queue[client]
+            if waiters:
+                queue[client] = waiters  # Back of the line for this client
+            self._grant(waiter)
+
+    def _remove(self, waiter: _Waiter) -> None:
+        queue = self._queues[waiter.priority]
+        waiters = queue.get(waiter.client)
+        if waiters is not None and waiter in waiters:
+            waiters.remove(waiter)
+            if not waiters:
+                del queue[waiter.client]
+
+    def _release(self, tokens: int) -> None:
+        self.in_flight -= 1
+        self.inflight_tokens -= tokens
+        self._dispatch()
+
+    @asynccontextmanager
+    async def slot(self, priority: int, tokens: int = 0, client: Optional[str] = None) -> AsyncIterator[None]:
+        """Hold one request slot for the duration of the block."""
+        waiter = _Waiter(priority, tokens, client or llm_client.get())
+        self._queues[priority].setdefault(waiter.client, deque()).append(waiter)
+        self._dispatch()
+        try:
+            await waiter.future
+        except asyncio.CancelledError:
+            if waiter.future.done() and not waiter.future.cancelled():
+                self._release(tokens)  # Granted just as we were cancelled
+            else:
+                self._remove(waiter)
+                self._abandoned[priority] += 1
+            raise
+
+        if DEBUG_LLM_SCHEDULER:
+            waited = time.perf_counter() - waiter.enqueued_at
+            print(f"[LLMScheduler] {PRIORITY_NAMES[priority]} for {waiter.client} waited {waited * 1000:.0f}ms")
+        try:
+            yield
+        finally:
+            self._release(tokens)
+
+    def get_stats(self) -> Dict:
+        classes = {}
+        for priority, name in PRIORITY_NAMES.items():
+            waits = sorted(self._waits[priority])
+            classes[name] = {
+                "queued": self.queued(priority),
+                "admitted": self._admitted[priority],
+                "abandoned": self._abandoned[priority],
+                "avg_wait_ms": round(sum(waits) / len(waits) * 1000, 1) if waits else 0.0,
+                "p95_wait_ms": round(waits[min(len(waits) - 1, int(0.95 * len(waits)))] * 1000, 1) if waits else 0.0,
+            }
+        return {
+            "in_flight": self.in_flight,
+            "inflight_tokens": self.inflight_tokens,
+            "max_concurrency": self.max_concurrency,
+            "max_inflight_tokens": self.max_inflight_tokens,
+            "interactive_reserve": self.interactive_reserve,
+            "classes": classes,
+        }
+
+
+_scheduler: Optional[LLMScheduler] = None
+
+
+def get_scheduler() -> LLMScheduler:
+    """Lazy initialization of the shared LLMScheduler."""
+    global _scheduler
+    if _scheduler is None:
+        _scheduler = LLMScheduler.from_env()
+    return _scheduler
@@ -2,11 +2,20 @@
 
 import os
 import json
-import requests
 import asyncio
 from collections import deque
+from contextlib import aclosing
 from datetime import datetime
-from typing import Dict, List, Optional, TYPE_CHECKING
+from typing import AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple, TYPE_CHECKING
+
+import httpx
+
+from .json_stream import StreamingJSONParser
+from .llm_cache import LLMResponseCache
+from .llm_router import LLMRouter, Route
+from .llm_scheduler import LLMScheduler, estimate_tokens, get_scheduler, priority_for
+from .suggestion_cache import SuggestionCache
+from ..storage import data_path
 
 if TYPE_CHECKING:
     from ..state import StateManager
@@ -45,12 +54,26 @@ class LLMService:
     to provide contextual parameter suggestions.
     """
     
-    def __init__(self, api_key: Optional[str] = None):
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        cache: Optional[LLMResponseCache] = None,
+        http_client: Optional[httpx.AsyncClient] = None,
+        router: Optional[LLMRouter] = None,
+        scheduler: Optional[LLMScheduler] = None,
+    ):
         """
         Initialize the LLM service.
         
         Args:
             api_key: OpenRouter API key (defaults to OPENROUTER_API_KEY env var)
+            cache: Response cache (defaults to memory-only; set LLM_CACHE_DISK=1
+                   to also persist responses to SQLite)
+            http_client: Shared async HTTP client (created lazily if omitted)
+            router: Model/provider router (defaults to self.model for every
+                    call site, overridable with LLM_ROUTES_<CALL_SITE>)
+            scheduler: Admission control for upstream calls (defaults to the
+                       process-wide scheduler)
         """
         self.api_key = api_key or os.getenv("OPENROUTER_API_KEY")
         if not self.api_key:
@@ -63,6 +86,22 @@ class LLMService:
         self.command_history: deque[CommandExecution] = deque(maxlen=15)
         self._history_lock = asyncio.Lock()
         
+        # Prompt-keyed response cache shared by every call site
+        if cache is None:
+            use_disk = os.getenv("LLM_CACHE_DISK", "").lower() in ("1", "true", "yes")
+            cache = LLMResponseCache(db_path=data_path("llm_cache.db") if use_disk else None)
+        self.cache = cache
+        
+        # Process-wide parameter suggestion cache (shared by all connections)
+        self.suggestion_cache = SuggestionCache(ttl_seconds=30)
+        
+        # One pooled async client; cancelling a call closes its request
+        self._http = http_client
+        
+        # Per call site: fastest healthy model/provider, optional hedging
+        self.router = router or LLMRouter.from_env({"default": [Route(self.model)]})
+        self.scheduler = scheduler or get_scheduler()
+        
         if DEBUG_LLM:
             print(f"[LLMService] Initialized with model: {self.model}")
     
@@ -327,25 +366,64 @@ class LLMService:
         
         return prompt
     
-    async def _call_openrouter(self, prompt: str) -> str:
+    async def _call_openrouter(
+        self,
+        prompt: str,
+        call_site: str = "default",
+        cache: bool = True,
+        validate: Optional[Callable[[str], bool]] = None,
+    ) -> str:
         """
-        Call OpenRouter API synchronously (runs in thread pool).
+        Call OpenRouter through the response cache.
         
         Args:
             prompt: The prompt to send
+            call_site: Cache TTL class (see llm_cache.CALL_SITE_TTLS)
+            cache: Set False for non-deterministic uses that need a fresh sample
+            validate: Only responses it accepts are cached (e.g. "parses as
+                      the JSON this call site expects")
             
         Returns:
             Response content from the model
         """
-        headers = {
+        async def call() -> str:
+            slot = lambda: self.scheduler.slot(priority_for(call_site), estimate_tokens(prompt))
+            async with slot():
+                # A hedged request takes a scheduler slot of its own
+                return await self.router.call(
+                    call_site, lambda route: self._post_openrouter(prompt, route), hedge_slot=slot,
+                )
+        
+        if not cache:
+            return await call()
+        return await self.cache.get_or_call(self._cache_model(call_site), prompt, call, call_site=call_site, validate=validate)
+    
+    def _cache_model(self, call_site: str) -> str:
+        """Model part of the response cache key: the call site's candidate routes."""
+        return ",".join(str(route) for route in self.router.routes_for(call_site))
+    
+    def _get_http(self) -> httpx.AsyncClient:
+        if self._http is None:
+            self._http = httpx.AsyncClient(timeout=httpx.Timeout(10.0, connect=5.0))
+        return self._http
+    
+    async def aclose(self) -> None:
+        """Close the HTTP client (call on shutdown)."""
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
+    
+    def _request_headers(self) -> Dict[str, str]:
+        return {
             "Authorization": f"Bearer {self.api_key}",
             "Content-Type": "application/json",
             "HTTP-Referer": "https://jarvis-dashboard.local",
             "X-Title": "Jarvis Prediction Market Dashboard"
         }
-        
+    
+    def _request_body(self, prompt: str, stream: bool = False, route: Optional[Route] = None) -> Dict:
         data = {
-            "model": self.model,
+            "model": route.model if route else self.model,
             "messages": [
                 {
                     "role": "user",
@@ -353,20 +431,28 @@ class LLMService:
                 }
             ],
             "provider": {
-                "order": ["cerebras", "groq"]
+                "order": [route.provider] if route and route.provider else ["cerebras", "groq"]
             }
         }
+        if stream:
+            data["stream"] = True
+        return data
+    
+    async def _post_openrouter(self, prompt: str, route: Optional[Route] = None) -> str:
+        """
+        Call OpenRouter API (non-streaming).
         
-        # Run in thread pool to avoid blocking
-        loop = asyncio.get_event_loop()
-        response = await loop.run_in_executor(
-            None,
-            lambda: requests.post(
-                self.api_url,
-                headers=headers,
-                json=data,
-                timeout=10
-            )
+        Args:
+            prompt: The prompt to send
+            route: Model/provider to use (defaults to self.model)
+            
+        Returns:
+            Response content from the model
+        """
+        response = await self._get_http().post(
+            self.api_url,
+            headers=self._request_headers(),
+            json=self._request_body(prompt, route=route),
         )
         
         if response.status_code != 200:
@@ -379,12 +465,84 @@ class LLMService:
         
         return content
     
+    async def _stream_openrouter(self, prompt: str, route: Optional[Route] = None) -> AsyncIterator[str]:
+        """Yield content deltas from an OpenRouter SSE completion."""
+        async with self._get_http().stream(
+            "POST",
+            self.api_url,
+            headers=self._request_headers(),
+            json=self._request_body(prompt, stream=True, route=route),
+        ) as response:
+            if response.status_code != 200:
+                body = (await response.aread()).decode("utf-8", errors="replace")
+                raise Exception(f"OpenRouter API error: {response.status_code} - {body}")
+            
+            async for line in response.aiter_lines():
+                # Blank separators and ": OPENROUTER PROCESSING" keep-alives
+                if not line.startswith("data:"):
+                    continue
+                payload = line[5:].strip()
+                if payload == "[DONE]":
+                    break
+                try:
+                    chunk = json.loads(payload)
+                except ValueError:
+                    continue
+                if chunk.get("error"):
+                    raise Exception(f"OpenRouter stream error: {chunk['error']}")
+                choices = chunk.get("choices") or [{}]
+                delta = (choices[0].get("delta") or {}).get("content")
+                if delta:
+                    yield delta
+    
+    async def astream(
+        self,
+        prompt: str,
+        call_site: str = "default",
+        cache: bool = True,
+        validate: Optional[Callable[[str], bool]] = None,
+    ) -> AsyncIterator[str]:
+        """
+        Stream response tokens as they arrive.
+        
+        A cached response is yielded as a single chunk; a completed stream is
+        written back to the cache. Closing the generator early (or cancelling
+        the consuming task) aborts the HTTP request.
+        
+        Args:
+            prompt: The prompt to send
+            call_site: Cache TTL class (see llm_cache.CALL_SITE_TTLS)
+            cache: Set False for non-deterministic uses that need a fresh sample
+            validate: Only complete responses it accepts are cached
+        """
+        if cache:
+            cached = self.cache.lookup(self._cache_model(call_site), prompt, call_site)
+            if cached is not None:
+                yield cached
+                return
+        
+        parts: List[str] = []
+        slot = lambda: self.scheduler.slot(priority_for(call_site), estimate_tokens(prompt))
+        async with slot():
+            routed = self.router.stream(
+                call_site, lambda route: self._stream_openrouter(prompt, route), hedge_slot=slot,
+            )
+            async with aclosing(routed) as stream:
+                async for delta in stream:
+                    parts.append(delta)
+                    yield delta
+        
+        response = "".join(parts)
+        if cache and (validate is None or validate(response)):
+            self.cache.store(self._cache_model(call_site), prompt, response, call_site)
+    
     async def suggest_params(
         self,
         command_id: str,
         params: List[Dict[str, str]],
         current_params: Optional[Dict[str, str]] = None,
-        state_manager: Optional["StateManager"] = None
+        state_manager: Optional["StateManager"] = None,
+        on_suggestion: Optional[Callable[[str, Dict], Awaitable[None]]] = None,
     ) -> Dict:
         """
         Generate parameter suggestions for a command.
@@ -394,52 +552,20 @@ class LLMService:
             params: List of parameter definitions [{"name": "marketId", "type": "market"}]
             current_params: Current parameter values (optional)
             state_manager: StateManager for market search (optional)
+            on_suggestion: Awaited with (param_name, suggestion) as each one
+                           is parsed from the streamed response (optional)
             
         Returns:
             Dictionary of parameter suggestions
         """
         try:
-            # Build context from command history
-            async with self._history_lock:
-                context = self._build_context_string(command_id)
-            
-            # Optional: Search markets if state_manager available
-            market_summary = "Market List Based on Relevant Keywords:\n"
-            print("state mngr:", state_manager)
-            if state_manager:
-                # Extract keywords using LLM based on command history
-                keywords = await self._extract_keywords_llm(
-                    command_id,
-                    params,
-                    current_params,
-                    context
-                )
-                if keywords:
-                    market_summary += await self._search_markets(keywords, state_manager)
-                else:
-                    market_summary += "No relevant markets found, don't provide suggestions.\n"
-            
-            # Build prompt
-            prompt = self._build_suggestion_prompt(
-                command_id,
-                params,
-                context,
-                market_summary,
-                current_params
-            )
-            
-            if DEBUG_LLM:
-                print(f"[LLMService] Generating suggestions for {command_id}")
-                print(f"[LLMService] Prompt:\n{prompt}")
-            
-            # Call OpenRouter API
-            response_content = await self._call_openrouter(prompt)
-            
-            if DEBUG_LLM:
-                print(f"[LLMService] Raw response:\n{response_content}")
-            
-            # Parse response
-            suggestions = self._parse_suggestions(response_content, params)
+            suggestions = {}
+            async for param_name, suggestion in self.stream_suggestions(
+                command_id, params, current_params, state_manager
+            ):
+                suggestions[param_name] = suggestion
+                if on_suggestion is not None:
+                    await on_suggestion(param_name, suggestion)
             
             if DEBUG_LLM:
                 print(f"[LLMService] Parsed suggestions: {suggestions}")
@@ -451,6 +577,80 @@ class LLMService:
                 print(f"[LLMService] Error generating suggestions: {e}")
             return {}
     
+    async def suggestion_cache_key(
+        self,
+        command_id: str,
+        params: List[Dict[str, str]],
+        current_params: Optional[Dict[str, str]] = None,
+    ) -> str:
+        """Suggestion cache key covering every input of the suggestion prompt."""
+        async with self._history_lock:
+            context = self._build_context_string(command_id)
+        return SuggestionCache.make_key(command_id, params, current_params, context)
+    
+    async def stream_suggestions(
+        self,
+        command_id: str,
+        params: List[Dict[str, str]],
+        current_params: Optional[Dict[str, str]] = None,
+        state_manager: Optional["StateManager"] = None
+    ) -> AsyncIterator[Tuple[str, Dict]]:
+        """
+        Yield (param_name, suggestion) pairs as soon as each one is complete
+        in the streamed response. Raises on API errors.
+        """
+        # Build context from command history
+        async with self._history_lock:
+            context = self._build_context_string(command_id)
+        
+        # Optional: Search markets if state_manager available
+        market_summary = "Market List Based on Relevant Keywords:\n"
+        print("state mngr:", state_manager)
+        if state_manager:
+            # Extract keywords using LLM based on command history
+            keywords = await self._extract_keywords_llm(
+                command_id,
+                params,
+                current_params,
+                context
+            )
+            if keywords:
+                market_summary += await self._search_markets(keywords, state_manager)
+            else:
+                market_summary += "No relevant markets found, don't provide suggestions.\n"
+        
+        # Build prompt
+        prompt = self._build_suggestion_prompt(
+            command_id,
+            params,
+            context,
+            market_summary,
+            current_params
+        )
+        
+        if DEBUG_LLM:
+            print(f"[LLMService] Generating suggestions for {command_id}")
+            print(f"[LLMService] Prompt:\n{prompt}")
+        
+        parser = StreamingJSONParser()
+        emitted = set()
+        valid = lambda r: isinstance(self._robust_json_parse(r), dict)
+        async with aclosing(self.astream(prompt, call_site="suggestions", validate=valid)) as stream:
+            async for delta in stream:
+                for param_name, suggestion in parser.feed(delta):
+                    if self._valid_suggestion(suggestion) and param_name not in emitted:
+                        emitted.add(param_name)
+                        yield param_name, suggestion
+        
+        if DEBUG_LLM:
+            print(f"[LLMService] Raw response:\n{parser.text}")
+        
+        # Whole-response parse catches anything the incremental pass missed
+        for param_name, suggestion in self._parse_suggestions(parser.text, params).items():
+            if param_name not in emitted:
+                emitted.add(param_name)
+                yield param_name, suggestion
+    
     async def _extract_keywords_llm(
         self,
         command_id: str,
@@ -491,7 +691,10 @@ class LLMService:
             if DEBUG_LLM:
                 print(f"[LLMService] Extracting keywords with LLM for {command_id}")
             
-            response = await self._call_openrouter(prompt)
+            response = await self._call_openrouter(
+                prompt, call_site="keywords",
+                validate=lambda r: isinstance(self._robust_json_parse(r), list),
+            )
             
             if DEBUG_LLM:
                 print(f"[LLMService] Keyword extraction response: {response}")
@@ -535,11 +738,15 @@ class LLMService:
         # Validate structure
         validated_suggestions = {}
         for param_name, suggestion in suggestions.items():
-            if isinstance(suggestion, dict) and suggestion.get("type") in ["direct", "market_list"]:
+            if self._valid_suggestion(suggestion):
                 validated_suggestions[param_name] = suggestion
         
         return validated_suggestions
     
+    @staticmethod
+    def _valid_suggestion(suggestion) -> bool:
+        return isinstance(suggestion, dict) and suggestion.get("type") in ["direct", "market_list"]
+    
     async def generate_market_search_queries(self, title: str, target_platform: str) -> List[str]:
         """
         Generate search queries to find a market on a different platform.
@@ -551,6 +758,13 @@ class LLMService:
         Returns:
             List of search query strings
         """
+        return [q async for q in self.stream_market_search_queries(title, target_platform)]
+    
+    async def stream_market_search_queries(self, title: str, target_platform: str) -> AsyncIterator[str]:
+        """
+        Like generate_market_search_queries, but yields each query as soon as
+        it is complete so the caller can start searching before the response ends.
+        """
         prompt = f"""
 Given the prediction market title "{title}", suggest 3 short, effective search queries to find the EQUIVALENT market on {target_platform}.
 The market might be phrased differently (e.g. "Will Trump win" vs "Presidential Election Winner").
@@ -558,23 +772,33 @@ Focus on the core entities and event.
 Return ONLY a valid JSON array of strings. Do not output markdown.
 Example: ["Donald Trump", "US Election 2024", "Presidential Winner"]
 """
+        parser = StreamingJSONParser()
+        queries: List[str] = []
         try:
-            response = await self._call_openrouter(prompt)
-            # clean response locally to be safe
-            cleaned = response.strip()
-            if cleaned.startswith("```json"):
-                cleaned = cleaned[7:-3]
-            elif cleaned.startswith("```"):
-                cleaned = cleaned[3:-3]
+            def valid(response: str) -> bool:
+                queries = self._robust_json_parse(response)
+                return isinstance(queries, list) and bool(queries)
             
-            queries = json.loads(cleaned)
-            if isinstance(queries, list):
-                return [str(q) for q in queries][:3]
-            return []
+            async with aclosing(self.astream(prompt, call_site="search_queries", validate=valid)) as stream:
+                async for delta in stream:
+                    for query in parser.feed(delta):
+                        if len(queries) < 3:
+                            queries.append(str(query))
+                            yield queries[-1]
+                    if len(queries) >= 3:
+                        # Closing the stream aborts the request before astream
+                        # caches it, so cache the queries we have
+                        self.cache.store(self._cache_model("search_queries"), prompt, json.dumps(queries), "search_queries")
+                        return
+            
+            if not queries:
+                queries = self._robust_json_parse(parser.text)
+                if isinstance(queries, list):
+                    for query in queries[:3]:
+                        yield str(query)
         except Exception as e:
             if DEBUG_LLM:
                 print(f"[LLM] Failed to generate search queries: {e}")
-            return []
 
     def get_history_stats(self) -> Dict:
         """Get statistics about command history."""
@@ -590,3 +814,15 @@ Example: ["Donald Trump", "US Election 2024", "Presidential Winner"]
             "command_counts": command_counts,
             "max_size": self.command_history.maxlen
         }
+    
+    def get_cache_stats(self) -> Dict:
+        """Get statistics about the LLM response cache."""
+        return self.cache.get_stats()
+    
+    def get_scheduler_stats(self) -> Dict:
+        """Get queue depth, in-flight budget and queue times per priority class."""
+        return self.scheduler.get_stats()
+    
+    def get_router_stats(self) -> Dict:
+        """Get per-route latency/error windows and hedging counters."""
+        return self.router.get_stats()
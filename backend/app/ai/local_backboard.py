@@ -0,0 +1,72 @@
+"""
+In-process stand-in for BackboardClient.
+
+Implements the subset of the Backboard SDK that AgentService uses
+(create_assistant, create_thread, add_message with and without streaming)
+so the agent can be exercised in tests without network access.
+"""
+
+import asyncio
+import json
+import uuid
+from types import SimpleNamespace
+from typing import Any, AsyncIterator, Dict, List, Optional, Union
+
+DEFAULT_REPLY = {"reasoning": "", "actions": [], "done": True}
+
+
+class LocalBackboardClient:
+    def __init__(
+        self,
+        replies: Optional[List[Union[str, Dict]]] = None,
+        latency: float = 0.0,
+        stream_chunk_size: int = 8,
+    ):
+        """
+        Args:
+            replies: Replies returned by add_message in order (dicts are JSON
+                     encoded); DEFAULT_REPLY once exhausted
+            latency: Simulated seconds per create_thread / add_message call
+            stream_chunk_size: Characters per streamed content chunk
+        """
+        self.replies = list(replies or [])
+        self.latency = latency
+        self.stream_chunk_size = stream_chunk_size
+        self.threads: List[str] = []
+        self.messages: List[Dict[str, Any]] = []
+
+    async def create_assistant(self, name: str, description: Optional[str] = None, **kwargs):
+        return SimpleNamespace(assistant_id=str(uuid.uuid4()), name=name, description=description)
+
+    async def create_thread(self, assistant_id: str):
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        thread_id = str(uuid.uuid4())
+        self.threads.append(thread_id)
+        return SimpleNamespace(thread_id=thread_id, assistant_id=assistant_id)
+
+    def _next_reply(self) -> str:
+        reply = self.replies.pop(0) if self.replies else DEFAULT_REPLY
+        return reply if isinstance(reply, str) else json.dumps(reply)
+
+    async def add_message(
+        self,
+        thread_id: str,
+        content: Optional[str] = None,
+        memory: Optional[str] = None,
+        stream: bool = False,
+        **kwargs,
+    ):
+        self.messages.append({"thread_id": thread_id, "content": content, "stream": stream})
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        reply = self._next_reply()
+        if stream:
+            return self._stream(reply)
+        return SimpleNamespace(content=reply, thread_id=thread_id)
+
+    async def _stream(self, reply: str) -> AsyncIterator[Dict[str, Any]]:
+        for i in range(0, len(reply), self.stream_chunk_size):
+            await asyncio.sleep(0)
+            yield {"type": "content_streaming", "content": reply[i:i + self.stream_chunk_size]}
+        yield {"type": "message_complete", "content": reply}
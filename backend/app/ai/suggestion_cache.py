@@ -0,0 +1,215 @@
+"""
+Process-wide cache for parameter suggestions.
+
+Entries are keyed by everything the suggestion prompt depends on:
+(command_id, params schema, current_params, command history context), so a
+hit is only served when the LLM would have been asked the same question.
+"""
+
+import asyncio
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+DEBUG_SUGGESTION_CACHE = False
+
+
+def params_schema_hash(params: List[Dict]) -> str:
+    """Order-independent hash of a command's parameter definitions."""
+    schema = sorted((str(p.get("name")), str(p.get("type"))) for p in params)
+    return hashlib.sha1(json.dumps(schema).encode("utf-8")).hexdigest()
+
+
+PartialListener = Callable[[str, Dict], Awaitable[None]]
+
+
+class SuggestionCache:
+    """
+    TTL + LRU bounded suggestion cache with single-flight computation.
+
+    Concurrent requests for the same key share one computation; it is only
+    cancelled once every waiting caller has given up. A computation can
+    publish() suggestions as they are parsed; every waiting caller that
+    passed on_partial receives them, including ones already published
+    before it joined.
+    """
+
+    def __init__(self, ttl_seconds: float = 30, max_entries: int = 500):
+        self.ttl = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[Dict, float]]" = OrderedDict()
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._waiters: Dict[str, int] = {}
+        self._listeners: Dict[str, List[PartialListener]] = {}
+        # Suggestions published so far by in-flight computations
+        self._partials: Dict[str, Dict[str, Dict]] = {}
+        # Keys computed speculatively and not yet served
+        self._prefetched: Set[str] = set()
+
+        # Stats
+        self.hits = 0
+        self.misses = 0
+        self.inflight_joins = 0
+        self.prefetches = 0
+        self.prefetch_hits = 0
+
+    @staticmethod
+    def make_key(
+        command_id: str,
+        params: List[Dict],
+        current_params: Optional[Dict],
+        history_context: str,
+    ) -> str:
+        basis = json.dumps(
+            [
+                command_id,
+                params_schema_hash(params),
+                sorted((current_params or {}).items()),
+                hashlib.sha1(history_context.encode("utf-8")).hexdigest(),
+            ],
+            default=str,
+        )
+        return hashlib.sha256(basis.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[Dict]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        suggestions, created_at = entry
+        if time.time() - created_at > self.ttl:
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return suggestions
+
+    def set(self, key: str, suggestions: Dict) -> None:
+        self._entries[key] = (suggestions, time.time())
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            evicted, _ = self._entries.popitem(last=False)
+            self._prefetched.discard(evicted)
+
+    def is_computing(self, key: str) -> bool:
+        return key in self._inflight
+
+    def waiters(self, key: str) -> int:
+        return self._waiters.get(key, 0)
+
+    def warm(self, key: str, compute: Callable[[], Awaitable[Dict]]) -> Optional[asyncio.Task]:
+        """Start a speculative computation unless the key is cached or in flight."""
+        if self.get(key) is not None or key in self._inflight:
+            return None
+        self.prefetches += 1
+        self._prefetched.add(key)
+        return self._start(key, compute)
+
+    def _start(self, key: str, compute: Callable[[], Awaitable[Dict]]) -> asyncio.Task:
+        async def run() -> Dict:
+            try:
+                suggestions = await compute()
+                if suggestions:
+                    self.set(key, suggestions)
+                else:
+                    # suggest_params returns {} on errors; don't hand that
+                    # to every connection asking for the same key
+                    self._entries.pop(key, None)
+                    self._prefetched.discard(key)
+                return suggestions
+            finally:
+                self._inflight.pop(key, None)
+                self._partials.pop(key, None)
+
+        task = asyncio.create_task(run())
+        task.add_done_callback(self._log_failure)
+        self._inflight[key] = task
+        return task
+
+    async def publish(self, key: str, param_name: str, suggestion: Dict) -> None:
+        """Forward one suggestion of an in-flight computation to its listeners."""
+        self._partials.setdefault(key, {})[param_name] = suggestion
+        listeners = list(self._listeners.get(key, ()))
+        if listeners:
+            await asyncio.gather(*[listener(param_name, suggestion) for listener in listeners], return_exceptions=True)
+
+    @staticmethod
+    def _log_failure(task: asyncio.Task) -> None:
+        if not task.cancelled() and task.exception():
+            print(f"[SuggestionCache] Computation failed: {task.exception()}")
+
+    async def get_or_compute(
+        self,
+        key: str,
+        compute: Callable[[], Awaitable[Dict]],
+        on_partial: Optional[PartialListener] = None,
+    ) -> Tuple[Dict, bool]:
+        """
+        Returns (suggestions, cached); cached is False for the caller that computed.
+
+        on_partial receives each suggestion the computation publishes while
+        this caller waits (not called for cache hits).
+        """
+        cached = self.get(key)
+        if cached is not None:
+            self.hits += 1
+            if key in self._prefetched:
+                self._prefetched.discard(key)
+                self.prefetch_hits += 1
+            if DEBUG_SUGGESTION_CACHE:
+                print(f"[SuggestionCache] Hit {key[:8]}")
+            return cached, True
+
+        task = self._inflight.get(key)
+        joined = task is not None
+        if joined:
+            self.inflight_joins += 1
+            if key in self._prefetched:
+                self._prefetched.discard(key)
+                self.prefetch_hits += 1
+        else:
+            self.misses += 1
+            task = self._start(key, compute)
+
+        self._waiters[key] = self._waiters.get(key, 0) + 1
+        replay: List[Tuple[str, Dict]] = []
+        if on_partial is not None:
+            # Registered together with the snapshot, so nothing is missed or sent twice
+            replay = list(self._partials.get(key, {}).items())
+            self._listeners.setdefault(key, []).append(on_partial)
+        try:
+            for param_name, suggestion in replay:
+                try:
+                    await on_partial(param_name, suggestion)
+                except Exception:
+                    pass  # Partials are best-effort; the final result still follows
+            return await asyncio.shield(task), joined
+        except asyncio.CancelledError:
+            # Abort the upstream call only when nobody is left waiting for it
+            if self._waiters.get(key) == 1 and not task.done():
+                task.cancel()
+            raise
+        finally:
+            if on_partial is not None:
+                listeners = self._listeners.get(key, [])
+                listeners.remove(on_partial)
+                if not listeners:
+                    self._listeners.pop(key, None)
+            remaining = self._waiters.get(key, 1) - 1
+            if remaining:
+                self._waiters[key] = remaining
+            else:
+                self._waiters.pop(key, None)
+
+    def get_stats(self) -> Dict:
+        lookups = self.hits + self.misses + self.inflight_joins
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "inflight_joins": self.inflight_joins,
+            "hit_rate": round((self.hits + self.inflight_joins) / lookups, 3) if lookups else 0.0,
+            "prefetches": self.prefetches,
+            "prefetch_hits": self.prefetch_hits,
+            "entries": len(self._entries),
+            "inflight": len(self._inflight),
+        }
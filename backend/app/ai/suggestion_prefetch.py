@@ -0,0 +1,153 @@
+"""
+Speculative prefetch of parameter suggestions.
+
+After each tracked execution, predicts the commands the user is likely to
+open next from the command history (first-order Markov over command_id
+sequences, falling back to overall frequency) and warms the shared
+SuggestionCache for them, so the palette finds suggestions ready.
+
+- Only commands whose params schema has been seen in a suggestion request
+  can be prefetched (the schema comes from the client)
+- Prefetches are limited to max_per_minute computations
+- A new execution changes the history context, so in-flight prefetches are
+  cancelled (unless a real request has joined them) and predictions redone
+"""
+
+import asyncio
+import os
+import time
+from collections import Counter, deque
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
+
+if TYPE_CHECKING:
+    from ..state import StateManager
+    from .llm_service import LLMService
+
+DEBUG_PREFETCH = False
+
+# Fewer observed transitions out of the last command than this -> use frequency
+MIN_TRANSITIONS = 2
+
+
+def predict_next_commands(
+    history: List[str],
+    top_k: int = 2,
+    min_probability: float = 0.25,
+) -> List[Tuple[str, float]]:
+    """Likely next command_ids (with probability) given a command_id sequence."""
+    if not history:
+        return []
+    last = history[-1]
+    counts = Counter(nxt for prev, nxt in zip(history, history[1:]) if prev == last)
+    if sum(counts.values()) < MIN_TRANSITIONS:
+        counts = Counter(history)
+    total = sum(counts.values())
+    ranked = sorted(counts.items(), key=lambda x: (-x[1], x[0]))
+    return [(cmd, n / total) for cmd, n in ranked if n / total >= min_probability][:top_k]
+
+
+class SuggestionPrefetcher:
+    def __init__(
+        self,
+        llm: "LLMService",
+        state_manager: Optional["StateManager"] = None,
+        max_per_minute: Optional[int] = None,
+        top_k: int = 2,
+        min_probability: float = 0.25,
+        delay_seconds: float = 1.0,
+    ):
+        self.llm = llm
+        self.state = state_manager
+        if max_per_minute is None:
+            max_per_minute = int(os.getenv("SUGGESTION_PREFETCH_PER_MINUTE", "6"))
+        self.max_per_minute = max_per_minute
+        self.top_k = top_k
+        self.min_probability = min_probability
+        self.delay = delay_seconds
+
+        # command_id -> (params schema, current_params) of the latest request
+        self._templates: Dict[str, Tuple[List[Dict], Dict]] = {}
+        self._budget: deque = deque()
+        self._scheduler: Optional[asyncio.Task] = None
+        self._warming: Dict[str, asyncio.Task] = {}
+
+        # Stats
+        self.started = 0
+        self.cancelled = 0
+        self.skipped_budget = 0
+        self.skipped_unknown = 0
+
+    def record_request(self, command_id: str, params: List[Dict], current_params: Optional[Dict]) -> None:
+        """Remember the params schema the client sends for a command."""
+        self._templates[command_id] = (params, dict(current_params or {}))
+
+    def _take_budget(self) -> bool:
+        now = time.monotonic()
+        while self._budget and now - self._budget[0] > 60:
+            self._budget.popleft()
+        if len(self._budget) >= self.max_per_minute:
+            return False
+        self._budget.append(now)
+        return True
+
+    def on_execution(self) -> None:
+        """History changed: drop stale prefetches and schedule new ones."""
+        self.cancel()
+        if self.max_per_minute <= 0:
+            return
+        self._scheduler = asyncio.create_task(self._run())
+
+    def cancel(self) -> None:
+        if self._scheduler and not self._scheduler.done():
+            self._scheduler.cancel()
+        cache = self.llm.suggestion_cache
+        for key, task in self._warming.items():
+            # Leave computations a real request is already waiting on
+            if not task.done() and cache.waiters(key) == 0:
+                task.cancel()
+                self.cancelled += 1
+        self._warming.clear()
+
+    async def _run(self) -> None:
+        # Debounce bursts of executions before spending LLM calls
+        await asyncio.sleep(self.delay)
+        history = [e.command_id for e in self.llm.command_history]
+        predictions = predict_next_commands(history, self.top_k, self.min_probability)
+        cache = self.llm.suggestion_cache
+
+        for command_id, probability in predictions:
+            template = self._templates.get(command_id)
+            if template is None:
+                self.skipped_unknown += 1
+                continue
+            params, current_params = template
+            key = await self.llm.suggestion_cache_key(command_id, params, current_params)
+            if cache.get(key) is not None or cache.is_computing(key):
+                continue
+            if not self._take_budget():
+                self.skipped_budget += 1
+                break
+
+            task = cache.warm(key, lambda c=command_id, p=params, cp=current_params, k=key: self.llm.suggest_params(
+                command_id=c,
+                params=p,
+                current_params=cp,
+                state_manager=self.state,
+                # Streaming requests that join the prefetch get partial frames
+                on_suggestion=lambda name, s: cache.publish(k, name, s),
+            ))
+            if task is not None:
+                self.started += 1
+                self._warming[key] = task
+                if DEBUG_PREFETCH:
+                    print(f"[Prefetch] Warming {command_id} (p={probability:.2f})")
+
+    def get_stats(self) -> Dict:
+        return {
+            "started": self.started,
+            "cancelled": self.cancelled,
+            "skipped_budget": self.skipped_budget,
+            "skipped_unknown_schema": self.skipped_unknown,
+            "max_per_minute": self.max_per_minute,
+            "known_commands": len(self._templates),
+        }
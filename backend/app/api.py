@@ -1,9 +1,11 @@
 import asyncio
+import functools
 import time
 import json
 import random
 import os
 from collections import deque
+from contextlib import aclosing
 from datetime import datetime, timedelta
 from typing import List, Optional
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect, Query, HTTPException, Request
@@ -13,8 +15,11 @@ from .schemas import Market, OrderBook, QuotePoint, Event, EventSearchResult
 from .news.fetcher import news_fetcher  # type: ignore
 from .news.rank import rank_articles
 from .search_helper import search_markets as search_markets_helper
-from .services.researcher import research_market, ResearchReport
+from .services.researcher import DEFAULT_CI_HALF_WIDTH, research_market, stream_research_market, ResearchReport
+from .services.report_cache import normalize_query
 from .ai.llm_service import LLMService
+from .ai.agent_actions import ActionContext, with_server_commands
+from .ai.llm_scheduler import llm_client
 
 DEBUG_WS = False
 
@@ -262,6 +267,7 @@ async def get_event_markets(request: Request, slug: str):
 
 @router.get("/markets/{market_id}/history", response_model=List[QuotePoint])
 async def get_market_history(
+    request: Request,
     market_id: str, 
     outcome_id: Optional[str] = None,
     range: Optional[str] = None  # 1H, 6H, 1D, 5D, 1W, 1M, ALL
@@ -277,6 +283,10 @@ async def get_market_history(
     if not outcome_id:
          raise HTTPException(status_code=400, detail="outcome_id required")
 
+    kalshi = getattr(request.app.state, "kalshi", None)
+    if market.source == "kalshi" and kalshi:
+        return (await kalshi.get_backfilled_history(market_id, range)).get(outcome_id, [])
+
     # Convert range to seconds
     range_seconds = None
     if range and range.upper() != "ALL":
@@ -309,36 +319,33 @@ async def get_all_outcomes_history(
     
     # For Polymarket markets, fetch real historical data from their API
     if market.source == "polymarket":
-        poly = getattr(request.app.state, "poly", None)
-        if poly:
+        price_history = getattr(request.app.state, "price_history", None)
+        if price_history:
             interval = range.upper() if range else "1D"
             
-            for outcome in market.outcomes:
-                token_id = outcome.outcome_id
-                
-                # Only fetch for valid numeric token IDs (Polymarket CLOB tokens)
-                if token_id.isdigit() or len(token_id) > 20:
-                    try:
-                        raw_history = await poly.fetch_price_history(token_id, interval)
-                        
-                        # Convert to QuotePoint format
-                        points = []
-                        for point in raw_history:
-                            ts = point.get("t", 0)
-                            price = float(point.get("p", 0))
-                            points.append({
-                                "ts": ts,
-                                "mid": price,
-                                "bid": None,
-                                "ask": None
-                            })
-                        
-                        if points:
-                            history_by_outcome[token_id] = points
-                    except Exception as e:
-                        print(f"[API] Error fetching history for {token_id}: {e}")
-    
-    # If no Polymarket history or it's Kalshi, use our collected data
+            # Only fetch for valid numeric token IDs (Polymarket CLOB tokens)
+            token_ids = [
+                o.outcome_id for o in market.outcomes
+                if o.outcome_id.isdigit() or len(o.outcome_id) > 20
+            ]
+            raw_histories = await price_history.get_many(token_ids, interval)
+            
+            # Convert to QuotePoint format
+            for token_id, raw_history in raw_histories.items():
+                history_by_outcome[token_id] = [
+                    {"ts": point.get("t", 0), "mid": float(point.get("p", 0)), "bid": None, "ask": None}
+                    for point in raw_history
+                ]
+    
+    # Kalshi: upstream candles merged with our collected ticks
+    kalshi = getattr(request.app.state, "kalshi", None)
+    if market.source == "kalshi" and kalshi:
+        history_by_outcome = {
+            oid: [{"ts": p.ts, "mid": p.mid, "bid": p.bid, "ask": p.ask} for p in points]
+            for oid, points in (await kalshi.get_backfilled_history(market_id, range)).items()
+        }
+    
+    # If no Polymarket history or no Kalshi backfill, use our collected data
     if not history_by_outcome:
         # Convert range to seconds
         range_seconds = None
@@ -383,24 +390,58 @@ async def get_market_orderbook(market_id: str, outcome_id: Optional[str] = None)
 
     return state.get_orderbook(market_id, outcome_id)
 
+async def _ensure_pairs(request: Request, market: Market, refresh: bool) -> None:
+    """
+    Score a market's pairs if it has none yet. A forced refresh first pulls
+    fresh candidates from both platforms into state (connectors index them
+    via the StateManager listener), then re-scores.
+    """
+    pairing = request.app.state.pairing
+    poly = getattr(request.app.state, "poly", None)
+    kalshi = getattr(request.app.state, "kalshi", None)
+    if refresh and poly and kalshi:
+        from .matching import search_candidate_markets
+        try:
+            await search_candidate_markets(
+                market, kalshi, poly, llm_service=getattr(request.app.state, "llm", None)
+            )
+        except Exception as e:
+            print(f"[API] Candidate search error: {e}")
+    
+    if refresh or not pairing.is_paired(market.market_id):
+        await pairing.refresh(market.market_id)
+
+
 @router.get("/markets/{market_id}/related", response_model=Optional[Market])
-async def get_related_market(market_id: str):
+async def get_related_market(request: Request, market_id: str, refresh: bool = False):
     market = state.get_market(market_id)
     if not market:
         raise HTTPException(status_code=404, detail="Market not found")
     
+    pairing = getattr(request.app.state, "pairing", None)
+    if pairing:
+        await _ensure_pairs(request, market, refresh)
+        best = pairing.get_best(market_id)
+        if best:
+            return best[0]
+    
     all_markets = state.get_all_markets()
     from .matching import find_related_market
-    return find_related_market(market, all_markets)
+    index = getattr(request.app.state, "market_index", None)
+    return find_related_market(market, all_markets, index=index)
 
 
 @router.get("/markets/{market_id}/compare")
 async def get_cross_market_comparison(
     request: Request,
     market_id: str,
+    refresh: bool = False,
 ):
     """
-    Find the most similar market on the opposing platform using semantic embeddings.
+    Find the most similar market on the opposing platform.
+    
+    Served from the precomputed pairing table. `refresh=true` runs a live
+    search on both platforms to discover new candidates and re-scores.
     
     Returns:
         {
@@ -414,11 +455,7 @@ async def get_cross_market_comparison(
     if not market:
         raise HTTPException(status_code=404, detail="Market not found")
     
-    # Get connectors from app state
-    poly = getattr(request.app.state, "poly", None)
-    kalshi = getattr(request.app.state, "kalshi", None)
-    embedding_service = getattr(request.app.state, "embedding", None)
-    llm_service = getattr(request.app.state, "llm", None)
+    pairing = getattr(request.app.state, "pairing", None)
     
     source_market = {
         "market_id": market.market_id,
@@ -426,25 +463,20 @@ async def get_cross_market_comparison(
         "source": market.source,
     }
     
-    # Try embedding-based matching first
-    if embedding_service and poly and kalshi:
-        from .matching import find_similar_market_embedding
-        try:
-            results = await find_similar_market_embedding(
-                target_market=market,
-                embedding_service=embedding_service,
-                kalshi_connector=kalshi,
-                polymarket_connector=poly,
-                llm_service=llm_service,
-                threshold=0.60, # Slightly lower threshold since we sort by score
-            )
-            
-            if results:
-                # results is List[Tuple[Market, float]]
-                # Backend Compatibility: similar_market is the top match
-                top_match, top_score = results[0]
-                
-                similar_markets_list = [
+    if pairing:
+        await _ensure_pairs(request, market, refresh)
+        
+        results = pairing.get_pairs(market_id)
+        if results:
+            top_match, top_score = results[0]
+            return {
+                "source_market": source_market,
+                "similar_market": {
+                    "market_id": top_match.market_id,
+                    "title": top_match.title,
+                    "source": top_match.source,
+                },
+                "similar_markets": [
                     {
                         "market_id": m.market_id,
                         "title": m.title,
@@ -452,26 +484,16 @@ async def get_cross_market_comparison(
                         "score": round(s, 3),
                     }
                     for m, s in results
-                ]
-                
-                return {
-                    "source_market": source_market,
-                    "similar_market": {
-                        "market_id": top_match.market_id,
-                        "title": top_match.title,
-                        "source": top_match.source,
-                    },
-                    "similar_markets": similar_markets_list,
-                    "similarity_score": round(top_score, 3),
-                    "method": "embedding",
-                }
-        except Exception as e:
-            print(f"[API] Embedding comparison error: {e}")
+                ],
+                "similarity_score": round(top_score, 3),
+                "method": pairing.method(market_id),
+            }
     
     # Fallback to text-based matching
     all_markets = state.get_all_markets()
     from .matching import find_related_market
-    fallback_match = find_related_market(market, all_markets)
+    index = getattr(request.app.state, "market_index", None)
+    fallback_match = find_related_market(market, all_markets, index=index)
     
     if fallback_match:
         return {
@@ -499,28 +521,6 @@ async def get_cross_market_comparison(
     }
 
 
-class SuggestionCache:
-    def __init__(self, ttl_seconds: int = 30):
-        self.ttl = timedelta(seconds=ttl_seconds)
-        self.cache: dict[str, tuple[dict, datetime]] = {}
-
-    def get(self, command_id: str) -> Optional[dict]:
-        entry = self.cache.get(command_id)
-        if not entry:
-            return None
-        suggestions, timestamp = entry
-        if datetime.utcnow() - timestamp > self.ttl:
-            self.cache.pop(command_id, None)
-            return None
-        return suggestions
-
-    def set(self, command_id: str, suggestions: dict) -> None:
-        self.cache[command_id] = (suggestions, datetime.utcnow())
-
-    def invalidate(self, command_id: str) -> None:
-        self.cache.pop(command_id, None)
-
-
 class RateLimiter:
     def __init__(self, max_requests: int = 10, window_seconds: int = 60):
         self.max_requests = max_requests
@@ -580,6 +580,7 @@ class ConnectionManager:
 manager = ConnectionManager()
 
 from .manager import SubscriptionManager
+from .ws_dispatch import ConnectionDispatcher
 import json
 
 # ...
@@ -588,389 +589,495 @@ import json
 async def websocket_endpoint(websocket: WebSocket):
     sub_manager = SubscriptionManager()
     await websocket.accept()
+    # LLM calls made for this connection are queued fairly against others
+    llm_client.set(f"ws:{id(websocket)}")
     
     # Agent state for this connection
     current_thread_id = None
     current_agent_state = None  # For agentic workflow loop
+    # Serializes ops that create or advance the agent thread
+    agent_lock = asyncio.Lock()
 
-    # Caching and rate limiting for suggestions
-    suggestion_cache = SuggestionCache(ttl_seconds=30)
+    # Rate limiting for suggestions (the suggestion cache is process-wide on LLMService)
     rate_limiter = RateLimiter(max_requests=10, window_seconds=60)
     
     # Get services from app state
     agent_service = getattr(websocket.app.state, "agent", None)
     llm_service = getattr(websocket.app.state, "llm", None)
+    prefetcher = getattr(websocket.app.state, "suggestion_prefetcher", None)
+
+    # Slow ops run as tracked tasks so the receive loop stays responsive
+    dispatcher = ConnectionDispatcher(websocket)
+
+    # Services for agent actions executed server-side
+    action_context = ActionContext(
+        state=state,
+        poly=getattr(websocket.app.state, "poly", None),
+        kalshi=getattr(websocket.app.state, "kalshi", None),
+        pairing=getattr(websocket.app.state, "pairing", None),
+        market_index=getattr(websocket.app.state, "market_index", None),
+        price_history=getattr(websocket.app.state, "price_history", None),
+    )
     
-    try:
-        while True:
-            # Client must send {"op": "subscribe", "market_id": "..."}
-            # Or {"op": "unsubscribe", "market_id": "..."}
-            # Or {"op": "agent_init"} or {"op": "agent_message", "content": "..."}
-            data = await websocket.receive_json()
-            op = data.get("op")
+    # ===== AGENT OPERATIONS =====
+
+    async def handle_init(data: dict):
+        """Create an agent thread for this connection."""
+        nonlocal current_thread_id
+        if not agent_service:
+            await websocket.send_json({
+                "type": "error",
+                "error": "Agent service not available"
+            })
+            return
 
-            if DEBUG_WS:
-                print(f"[WebSocket] Received op={op} payload={data}")
-            
-            # ===== AGENT OPERATIONS =====
-            
-            if op == "agent_init":
-                if not agent_service:
-                    await websocket.send_json({
-                        "type": "error",
-                        "error": "Agent service not available"
-                    })
-                    continue
-                    
-                try:
-                    # Ensure assistant is initialized
-                    if not agent_service.assistant_id:
-                        await agent_service.initialize()
-                    
-                    # Create new thread for this connection
-                    thread = await agent_service.create_thread()
-                    current_thread_id = thread.thread_id
+        try:
+            # Ensure assistant is initialized
+            if not agent_service.assistant_id:
+                await agent_service.initialize()
 
-                    if DEBUG_WS:
-                        print(f"[WebSocket] Agent ready thread_id={current_thread_id}")
-                    
-                    await websocket.send_json({
-                        "type": "agent_ready",
-                        "thread_id": current_thread_id,
-                        "assistant_id": agent_service.assistant_id
-                    })
-                except Exception as e:
-                    await websocket.send_json({
-                        "type": "error",
-                        "error": f"Failed to initialize agent: {str(e)}"
-                    })
+            # Create new thread for this connection
+            thread = await agent_service.acquire_thread()
+            current_thread_id = thread.thread_id
 
-            elif op == "agent_message":
-                if not agent_service:
-                    await websocket.send_json({
-                        "type": "error",
-                        "error": "Agent service not available"
-                    })
-                    continue
-                    
-                try:
-                    prompt = data.get("content")
-                    thread_id = data.get("thread_id") or current_thread_id
-                    
-                    if not prompt:
-                        await websocket.send_json({
-                            "type": "error",
-                            "error": "No content provided"
-                        })
-                        continue
-                    
-                    if not thread_id:
-                        await websocket.send_json({
-                            "type": "error",
-                            "error": "No active thread_id. Send 'agent_init' first."
-                        })
-                        continue
-
-                    # Stream agent response
-                    async for chunk in agent_service.stream_chat(thread_id, prompt):
-                        await websocket.send_json({
-                            "type": "agent_response",
-                            "payload": chunk
-                        })
-                        
-                except Exception as e:
-                    await websocket.send_json({
-                        "type": "error",
-                        "error": f"Agent error: {str(e)}"
-                    })
+            if DEBUG_WS:
+                print(f"[WebSocket] Agent ready thread_id={current_thread_id}")
 
-            elif op == "agent_track_execution":
-                try:
-                    command_id = data.get("command_id")
-                    params = data.get("params", {})
-                    timestamp = data.get("timestamp")
-
-                    if command_id:
-                        # Track in LLMService (for param suggestions)
-                        if llm_service:
-                            await llm_service.track_execution(
-                                command_id=command_id,
-                                params=params,
-                                timestamp=timestamp,
-                                state_manager=state,
-                            )
-                        
-                        # Also track in AgentService (for chat context)
-                        if agent_service:
-                            # Ensure thread exists
-                            if not current_thread_id:
-                                if not agent_service.assistant_id:
-                                    await agent_service.initialize()
-                                thread = await agent_service.create_thread()
-                                current_thread_id = thread.thread_id
-                            
-                            # Send to agent to store in memory with market enrichment
-                            await agent_service.track_execution(
-                                thread_id=current_thread_id,
-                                command_id=command_id,
-                                params=params,
-                                timestamp=timestamp,
-                                state_manager=state,
-                            )
-
-                        if DEBUG_WS:
-                            print(
-                                "[WebSocket] Tracked execution "
-                                f"command_id={command_id} params={params}"
-                            )
-
-                        await websocket.send_json({
-                            "type": "execution_tracked",
-                            "command_id": command_id,
-                        })
-                except Exception as e:
-                    print(f"[WebSocket] Error tracking execution: {e}")
-
-            elif op == "agent_suggest_params":
-                if not llm_service:
-                    await websocket.send_json({
-                        "type": "error",
-                        "error": "LLM service not available",
-                        "request_id": data.get("request_id"),
-                    })
-                    continue
+            await websocket.send_json({
+                "type": "agent_ready",
+                "thread_id": current_thread_id,
+                "assistant_id": agent_service.assistant_id
+            })
+        except Exception as e:
+            await websocket.send_json({
+                "type": "error",
+                "error": f"Failed to initialize agent: {str(e)}"
+            })
+
+    async def handle_message(data: dict):
+        """Stream a chat reply from the agent."""
+        if not agent_service:
+            await websocket.send_json({
+                "type": "error",
+                "error": "Agent service not available"
+            })
+            return
 
-                if not validate_suggestion_request(data):
-                    await websocket.send_json({
-                        "type": "error",
-                        "error": "Invalid suggestion request",
-                        "request_id": data.get("request_id"),
-                    })
-                    continue
+        try:
+            prompt = data.get("content")
+            thread_id = data.get("thread_id") or current_thread_id
+
+            if not prompt:
+                await websocket.send_json({
+                    "type": "error",
+                    "error": "No content provided"
+                })
+                return
+
+            if not thread_id:
+                await websocket.send_json({
+                    "type": "error",
+                    "error": "No active thread_id. Send 'agent_init' first."
+                })
+                return
+
+            # Stream agent response
+            async for chunk in agent_service.stream_chat(thread_id, prompt):
+                await websocket.send_json({
+                    "type": "agent_response",
+                    "payload": chunk
+                })
 
-                if not rate_limiter.is_allowed():
-                    await websocket.send_json({
-                        "type": "error",
-                        "error": "Too many suggestion requests",
-                        "request_id": data.get("request_id"),
-                    })
-                    continue
-
-                try:
-                    command_id = data.get("command_id")
-                    params = data.get("params", [])
-                    current_params = data.get("current_params", {})
-                    request_id = data.get("request_id")
-
-                    cached = suggestion_cache.get(command_id)
-                    if cached is not None:
-                        if DEBUG_WS:
-                            print(f"[WebSocket] Suggestion cache hit command_id={command_id}")
-                        await websocket.send_json({
-                            "type": "param_suggestions",
-                            "command_id": command_id,
-                            "request_id": request_id,
-                            "suggestions": cached,
-                            "cached": True,
-                        })
-                        continue
-
-                    try:
-                        # Use LLMService for parameter suggestions
-                        suggestions = await asyncio.wait_for(
-                            llm_service.suggest_params(
-                                command_id=command_id,
-                                params=params,
-                                current_params=current_params,
-                                state_manager=state,
-                            ),
-                            timeout=10,  # 10 second timeout for OpenRouter
-                        )
-                    except asyncio.TimeoutError:
-                        if DEBUG_WS:
-                            print(
-                                "[WebSocket] Suggestion request timed out "
-                                f"command_id={command_id} request_id={request_id}"
-                            )
-                        await websocket.send_json({
-                            "type": "error",
-                            "error": "Suggestion request timed out",
-                            "request_id": request_id,
-                        })
-                        continue
-
-                    suggestion_cache.set(command_id, suggestions)
-
-                    if DEBUG_WS:
-                        print(
-                            "[WebSocket] Sending suggestions "
-                            f"command_id={command_id} request_id={request_id} "
-                            f"payload={suggestions}"
+        except Exception as e:
+            await websocket.send_json({
+                "type": "error",
+                "error": f"Agent error: {str(e)}"
+            })
+
+    async def handle_track_execution(data: dict):
+        """Record a command execution for suggestions and agent memory."""
+        nonlocal current_thread_id
+        try:
+            command_id = data.get("command_id")
+            params = data.get("params", {})
+            timestamp = data.get("timestamp")
+
+            if command_id:
+                # Track in LLMService (for param suggestions)
+                if llm_service:
+                    await llm_service.track_execution(
+                        command_id=command_id,
+                        params=params,
+                        timestamp=timestamp,
+                        state_manager=state,
+                    )
+                    if prefetcher:
+                        prefetcher.on_execution()
+
+                # Also track in AgentService (for chat context)
+                if agent_service:
+                    async with agent_lock:
+                        # Ensure thread exists
+                        if not current_thread_id:
+                            if not agent_service.assistant_id:
+                                await agent_service.initialize()
+                            thread = await agent_service.acquire_thread()
+                            current_thread_id = thread.thread_id
+
+                        # Send to agent to store in memory with market enrichment
+                        await agent_service.track_execution(
+                            thread_id=current_thread_id,
+                            command_id=command_id,
+                            params=params,
+                            timestamp=timestamp,
+                            state_manager=state,
                         )
 
-                    await websocket.send_json({
-                        "type": "param_suggestions",
-                        "command_id": command_id,
-                        "request_id": request_id,
-                        "suggestions": suggestions,
-                    })
+                if DEBUG_WS:
+                    print(
+                        "[WebSocket] Tracked execution "
+                        f"command_id={command_id} params={params}"
+                    )
 
-                except Exception as e:
-                    print(f"[WebSocket] Error generating suggestions: {e}")
-                    await websocket.send_json({
-                        "type": "error",
-                        "error": f"Failed to generate suggestions: {str(e)}",
-                        "request_id": data.get("request_id"),
-                    })
+                await websocket.send_json({
+                    "type": "execution_tracked",
+                    "command_id": command_id,
+                })
+        except Exception as e:
+            print(f"[WebSocket] Error tracking execution: {e}")
+
+    async def handle_suggest_params(data: dict):
+        """Suggest parameter values for a command."""
+        if not llm_service:
+            await websocket.send_json({
+                "type": "error",
+                "error": "LLM service not available",
+                "request_id": data.get("request_id"),
+            })
+            return
+
+        if not validate_suggestion_request(data):
+            await websocket.send_json({
+                "type": "error",
+                "error": "Invalid suggestion request",
+                "request_id": data.get("request_id"),
+            })
+            return
+
+        if not rate_limiter.is_allowed():
+            await websocket.send_json({
+                "type": "error",
+                "error": "Too many suggestion requests",
+                "request_id": data.get("request_id"),
+            })
+            return
 
-            # ===== AGENTIC COMMAND RUNNER =====
-            
-            elif op == "agent_start":
-                """Start an agentic workflow with frontend-driven tool execution."""
-                if not agent_service:
-                    await websocket.send_json({
-                        "type": "error",
-                        "error": "Agent service not available"
-                    })
-                    continue
+        try:
+            command_id = data.get("command_id")
+            params = data.get("params", [])
+            current_params = data.get("current_params", {})
+            request_id = data.get("request_id")
 
-                try:
-                    prompt = data.get("prompt")
-                    commands = data.get("commands", [])
-                    
-                    if not prompt:
-                        await websocket.send_json({
-                            "type": "error",
-                            "error": "No prompt provided"
-                        })
-                        continue
-
-                    # Ensure thread exists
-                    if not current_thread_id:
-                        if not agent_service.assistant_id:
-                            await agent_service.initialize()
-                        thread = await agent_service.create_thread()
-                        current_thread_id = thread.thread_id
-
-                    if DEBUG_WS:
-                        print(f"[WebSocket] agent_start: prompt={prompt[:100]}... commands={len(commands)}")
-
-                    # Store agent state for this connection
-                    agent_state = {
-                        "prompt": prompt,
-                        "commands": commands,
-                        "all_observations": [],
-                    }
-                    
-                    # Get first step from agent
-                    step_result = await agent_service.run_agent_step(
-                        thread_id=current_thread_id,
-                        prompt=prompt,
-                        commands=commands,
-                        observations=None,
+            if prefetcher:
+                prefetcher.record_request(command_id, params, current_params)
+
+            suggestion_cache = llm_service.suggestion_cache
+            cache_key = await llm_service.suggestion_cache_key(
+                command_id, params, current_params
+            )
+
+            async def send_partial(param_name: str, suggestion: dict) -> None:
+                await websocket.send_json({
+                    "type": "param_suggestion_partial",
+                    "command_id": command_id,
+                    "request_id": request_id,
+                    "param": param_name,
+                    "suggestion": suggestion,
+                })
+
+            def compute_suggestions():
+                # Suggestions are published as they are parsed, so every
+                # waiting "stream": true request gets partial frames, whether
+                # it started the computation or joined it
+                return llm_service.suggest_params(
+                    command_id=command_id,
+                    params=params,
+                    current_params=current_params,
+                    state_manager=state,
+                    on_suggestion=lambda name, s: suggestion_cache.publish(cache_key, name, s),
+                )
+
+            try:
+                # Use LLMService for parameter suggestions; identical
+                # requests from any connection share one computation
+                # (opt-in "stream": true adds param_suggestion_partial frames)
+                suggestions, cached = await asyncio.wait_for(
+                    suggestion_cache.get_or_compute(
+                        cache_key,
+                        compute_suggestions,
+                        on_partial=send_partial if data.get("stream") else None,
+                    ),
+                    timeout=10,  # Cancels the in-flight OpenRouter request
+                )
+            except asyncio.TimeoutError:
+                if DEBUG_WS:
+                    print(
+                        "[WebSocket] Suggestion request timed out "
+                        f"command_id={command_id} request_id={request_id}"
                     )
+                await websocket.send_json({
+                    "type": "error",
+                    "error": "Suggestion request timed out",
+                    "request_id": request_id,
+                })
+                return
+
+            if cached:
+                if DEBUG_WS:
+                    print(f"[WebSocket] Suggestion cache hit command_id={command_id}")
+                await websocket.send_json({
+                    "type": "param_suggestions",
+                    "command_id": command_id,
+                    "request_id": request_id,
+                    "suggestions": suggestions,
+                    "cached": True,
+                })
+                return
 
-                    # Store state for continuation
-                    current_agent_state = agent_state
+            if DEBUG_WS:
+                print(
+                    "[WebSocket] Sending suggestions "
+                    f"command_id={command_id} request_id={request_id} "
+                    f"payload={suggestions}"
+                )
+
+            await websocket.send_json({
+                "type": "param_suggestions",
+                "command_id": command_id,
+                "request_id": request_id,
+                "suggestions": suggestions,
+            })
 
-                    await websocket.send_json({
-                        "type": "agent_step",
-                        "payload": {
-                            "reasoning": step_result.get("reasoning", ""),
-                            "actions": step_result.get("actions", []),
-                            "done": step_result.get("done", False),
-                            "model": "gemini",
-                        }
-                    })
+        except Exception as e:
+            print(f"[WebSocket] Error generating suggestions: {e}")
+            await websocket.send_json({
+                "type": "error",
+                "error": f"Failed to generate suggestions: {str(e)}",
+                "request_id": data.get("request_id"),
+            })
+
+    # ===== AGENTIC COMMAND RUNNER =====
+
+    async def send_agent_step(step: dict, agent_state: dict):
+        """Send a step to the client; server action results are recorded for the summary."""
+        agent_state["all_observations"].extend(step.get("server_results", []))
+        await websocket.send_json({
+            "type": "agent_step",
+            "payload": {
+                "reasoning": step.get("reasoning", ""),
+                "actions": step.get("actions", []),
+                "done": step.get("done", False),
+                "model": "gemini",
+                # Informational: actions the server already executed
+                "server_actions": [
+                    {**action, "status": result["status"], "result": result.get("result")}
+                    for action, result in zip(step.get("server_actions", []), step.get("server_results", []))
+                ],
+            }
+        })
+
+    async def send_agent_action(action: dict):
+        """Announce a client action as soon as the planner has emitted it."""
+        await websocket.send_json({
+            "type": "agent_action",
+            "payload": {"action": action},
+        })
+
+    async def send_agent_complete(prompt: str, agent_state: dict):
+        """Stream the summary as agent_summary_delta frames, then agent_complete."""
+        parts = []
+        async with aclosing(agent_service.stream_summary(
+            thread_id=current_thread_id,
+            prompt=prompt,
+            all_observations=agent_state["all_observations"],
+        )) as deltas:
+            async for delta in deltas:
+                parts.append(delta)
+                await websocket.send_json({
+                    "type": "agent_summary_delta",
+                    "payload": {"delta": delta},
+                })
+        await websocket.send_json({
+            "type": "agent_complete",
+            "payload": {
+                "summary": "".join(parts),
+                "model": "gpt",
+            }
+        })
+
+    async def handle_start(data: dict):
+        """Start an agentic workflow with frontend-driven tool execution."""
+        nonlocal current_thread_id, current_agent_state
+        if not agent_service:
+            await websocket.send_json({
+                "type": "error",
+                "error": "Agent service not available"
+            })
+            return
 
-                    # If already done (error or empty), generate summary
-                    if step_result.get("done"):
-                        summary = await agent_service.generate_summary(
-                            thread_id=current_thread_id,
-                            prompt=prompt,
-                            all_observations=[],
-                        )
-                        await websocket.send_json({
-                            "type": "agent_complete",
-                            "payload": {
-                                "summary": summary,
-                                "model": "gpt",
-                            }
-                        })
-
-                except Exception as e:
-                    print(f"[WebSocket] agent_start error: {e}")
-                    await websocket.send_json({
-                        "type": "error",
-                        "error": f"Agent start failed: {str(e)}"
-                    })
+        try:
+            prompt = data.get("prompt")
+            commands = data.get("commands", [])
+
+            if not prompt:
+                await websocket.send_json({
+                    "type": "error",
+                    "error": "No prompt provided"
+                })
+                return
+
+            # Ensure thread exists
+            if not current_thread_id:
+                if not agent_service.assistant_id:
+                    await agent_service.initialize()
+                thread = await agent_service.acquire_thread()
+                current_thread_id = thread.thread_id
 
-            elif op == "agent_observation":
-                """Receive command execution results and continue agent loop."""
-                if not agent_service:
-                    await websocket.send_json({
-                        "type": "error",
-                        "error": "Agent service not available"
-                    })
-                    continue
+            if DEBUG_WS:
+                print(f"[WebSocket] agent_start: prompt={prompt[:100]}... commands={len(commands)}")
 
-                try:
-                    results = data.get("results", [])
-                    
-                    # Get stored agent state
-                    if not current_agent_state:
-                        await websocket.send_json({
-                            "type": "error",
-                            "error": "No active agent session. Call agent_start first."
-                        })
-                        continue
-
-                    # Accumulate observations
-                    current_agent_state["all_observations"].extend(results)
-
-                    if DEBUG_WS:
-                        print(f"[WebSocket] agent_observation: {len(results)} results")
-
-                    # Get next step from agent
-                    step_result = await agent_service.run_agent_step(
-                        thread_id=current_thread_id,
-                        prompt=current_agent_state["prompt"],
-                        commands=current_agent_state["commands"],
-                        observations=results,
-                    )
+            # Store agent state for this connection
+            agent_state = {
+                "prompt": prompt,
+                "commands": commands,
+                "all_observations": [],
+            }
 
-                    await websocket.send_json({
-                        "type": "agent_step",
-                        "payload": {
-                            "reasoning": step_result.get("reasoning", ""),
-                            "actions": step_result.get("actions", []),
-                            "done": step_result.get("done", False),
-                            "model": "gemini",
-                        }
-                    })
+            # Run agent steps; read-only actions execute server-side
+            step_result = await agent_service.run_agent_turn(
+                thread_id=current_thread_id,
+                prompt=prompt,
+                commands=with_server_commands(commands),
+                observations=None,
+                action_context=action_context,
+                on_step=lambda step: send_agent_step(step, agent_state),
+                on_action=send_agent_action,
+            )
 
-                    # If done, generate summary with GPT
-                    if step_result.get("done"):
-                        summary = await agent_service.generate_summary(
-                            thread_id=current_thread_id,
-                            prompt=current_agent_state["prompt"],
-                            all_observations=current_agent_state["all_observations"],
-                        )
-                        await websocket.send_json({
-                            "type": "agent_complete",
-                            "payload": {
-                                "summary": summary,
-                                "model": "gpt",
-                            }
-                        })
-                        # Clear agent state
-                        current_agent_state = None
-
-                except Exception as e:
-                    print(f"[WebSocket] agent_observation error: {e}")
+            # Store state for continuation
+            agent_state["pending_observations"] = step_result.get("server_results", [])
+            current_agent_state = agent_state
+
+            # If already done (error or empty), generate summary
+            if step_result.get("done"):
+                await send_agent_complete(prompt, agent_state)
+
+        except Exception as e:
+            print(f"[WebSocket] agent_start error: {e}")
+            await websocket.send_json({
+                "type": "error",
+                "error": f"Agent start failed: {str(e)}"
+            })
+
+    async def handle_observation(data: dict):
+        """Receive command execution results and continue agent loop."""
+        nonlocal current_agent_state
+        if not agent_service:
+            await websocket.send_json({
+                "type": "error",
+                "error": "Agent service not available"
+            })
+            return
+
+        try:
+            results = data.get("results", [])
+
+            # Get stored agent state
+            if not current_agent_state:
+                await websocket.send_json({
+                    "type": "error",
+                    "error": "No active agent session. Call agent_start first."
+                })
+                return
+
+            # Accumulate observations
+            current_agent_state["all_observations"].extend(results)
+
+            if DEBUG_WS:
+                print(f"[WebSocket] agent_observation: {len(results)} results")
+
+            # Server results from the same step go back together with the client's
+            observations = current_agent_state.pop("pending_observations", []) + results
+
+            # Get next step(s) from agent
+            agent_state = current_agent_state
+            step_result = await agent_service.run_agent_turn(
+                thread_id=current_thread_id,
+                prompt=agent_state["prompt"],
+                commands=agent_state["commands"],
+                observations=observations,
+                action_context=action_context,
+                on_step=lambda step: send_agent_step(step, agent_state),
+                on_action=send_agent_action,
+            )
+            agent_state["pending_observations"] = step_result.get("server_results", [])
+
+            # If done, generate summary with GPT
+            if step_result.get("done"):
+                await send_agent_complete(agent_state["prompt"], agent_state)
+                # Clear agent state
+                current_agent_state = None
+
+        except Exception as e:
+            print(f"[WebSocket] agent_observation error: {e}")
+            await websocket.send_json({
+                "type": "error",
+                "error": f"Agent observation failed: {str(e)}"
+            })
+
+    handlers = {
+        "agent_init": handle_init,
+        "agent_message": handle_message,
+        "agent_track_execution": handle_track_execution,
+        "agent_suggest_params": handle_suggest_params,
+        "agent_start": handle_start,
+        "agent_observation": handle_observation,
+    }
+    # Ops that read or replace the connection's agent thread/loop state
+    agent_thread_ops = {"agent_init", "agent_message", "agent_start", "agent_observation"}
+
+    def locked(handler, data: dict):
+        async def run():
+            async with agent_lock:
+                await handler(data)
+        return run
+    
+    try:
+        while True:
+            # Client must send {"op": "subscribe", "market_id": "..."}
+            # Or {"op": "unsubscribe", "market_id": "..."}
+            # Or {"op": "agent_init"} or {"op": "agent_message", "content": "..."}
+            # Or {"op": "cancel", "request_id": "..."} to abort a pending request
+            data = await websocket.receive_json()
+            op = data.get("op")
+
+            if DEBUG_WS:
+                print(f"[WebSocket] Received op={op} payload={data}")
+
+            if op in handlers:
+                handler = handlers[op]
+                if op in agent_thread_ops:
+                    run = locked(handler, data)
+                else:
+                    run = functools.partial(handler, data)
+                await dispatcher.submit(op, run, data.get("request_id"))
+
+            elif op == "cancel":
+                request_id = data.get("request_id")
+                if request_id is not None and dispatcher.cancel(request_id):
                     await websocket.send_json({
-                        "type": "error",
-                        "error": f"Agent observation failed: {str(e)}"
+                        "type": "cancelled",
+                        "request_id": request_id,
                     })
             
             # ===== EXISTING MARKET OPERATIONS =====
@@ -990,6 +1097,8 @@ async def websocket_endpoint(websocket: WebSocket):
                     
     except WebSocketDisconnect:
         await sub_manager.unsubscribe_from_all(websocket)
+    finally:
+        await dispatcher.close()
 
 @router.get("/news/search")
 async def search_news(
@@ -1020,6 +1129,7 @@ async def search_news(
     # Streaming mode
     if stream:
         async def generate():
+            started = time.perf_counter()
             accumulated = []
             for provider, articles in news_fetcher.fetch_multiple_iter(
                 providers=selected_providers,
@@ -1032,7 +1142,9 @@ async def search_news(
                 # Send update event
                 payload = {
                     "provider": provider,
-                    "articles": ranked
+                    "articles": ranked,
+                    # Wall time until this provider's results arrived
+                    "elapsed_ms": round((time.perf_counter() - started) * 1000),
                 }
                 yield f"event: update\ndata: {json.dumps(payload)}\n\n"
                 await asyncio.sleep(0)  # Allow other tasks to run
@@ -1061,19 +1173,49 @@ async def search_news(
     return articles
 
 
+@router.get("/llm/stats")
+async def get_llm_stats(request: Request):
+    """Cache, routing and scheduling counters for LLM-backed features."""
+    from .services.sentiment_store import get_article_store
+    
+    llm = getattr(request.app.state, "llm", None)
+    prefetcher = getattr(request.app.state, "suggestion_prefetcher", None)
+    refresher = getattr(request.app.state, "sentiment_refresher", None)
+    return {
+        "response_cache": llm.get_cache_stats() if llm else None,
+        "router": llm.get_router_stats() if llm else None,
+        "scheduler": llm.get_scheduler_stats() if llm else None,
+        "suggestions": llm.suggestion_cache.get_stats() if llm else None,
+        "suggestion_prefetch": prefetcher.get_stats() if prefetcher else None,
+        "article_sentiment": get_article_store().get_stats(),
+        "sentiment_refresh": refresher.get_stats() if refresher else None,
+    }
+
+
+@router.get("/agent/stats")
+async def get_agent_stats(request: Request):
+    """Agent thread pool and model routing metrics."""
+    agent = getattr(request.app.state, "agent", None)
+    if not agent:
+        raise HTTPException(status_code=503, detail="Agent service not available")
+    return {"thread_pool": agent.get_pool_stats(), "router": agent.get_router_stats()}
+
+
 @router.get("/markets/{market_id}/sentiment")
 async def get_market_sentiment(
     request: Request,
     market_id: str,
     q: Optional[str] = None,
+    refresh: bool = False,
 ):
     """
     Generate sentiment analysis for a market.
     
     Query param `q` overrides the market title as the search term.
     
-    WARNING: This is an expensive operation (multiple LLM calls).
-    Results should be cached for 15-60 minutes.
+    This is an expensive operation (multiple LLM calls), so reports are
+    cached per (market_id, query). Stale reports are served immediately
+    while a background refresh runs; `refresh=true` forces recomputation.
     """
     # Get pre-initialized LLM service from app state
     llm = getattr(request.app.state, "llm", None)
@@ -1087,16 +1229,31 @@ async def get_market_sentiment(
     
     query = q or market.title
     
-    try:
-        report = await research_market(
+    async def compute() -> ResearchReport:
+        # Batch jobs share LLM capacity fairly per market
+        llm_client.set(f"sentiment:{market_id}")
+        return await research_market(
             llm=llm,
             market_id=market_id,
             query=query,
             max_articles=50,
+            reference=market.title if market else None,
         )
+    
+    report_cache = getattr(request.app.state, "sentiment_cache", None)
+    try:
+        if report_cache:
+            entry, cached = await report_cache.get_or_compute(market_id, query, compute, force=refresh)
+            report, age_seconds = entry.report, entry.age_seconds
+        else:
+            report, cached, age_seconds = await compute(), False, 0.0
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Research failed: {e}")
     
+    return _sentiment_payload(report, cached, age_seconds)
+
+
+def _sentiment_payload(report: ResearchReport, cached: bool, age_seconds: float) -> dict:
     return {
         "market_id": report.market_id,
         "query": report.query,
@@ -1104,8 +1261,148 @@ async def get_market_sentiment(
         "signal": report.signal,
         "summary": report.summary,
         "articles_analyzed": report.articles_analyzed,
+        "articles_skipped": report.articles_skipped,
         "top_positive": report.top_positive_headlines,
         "top_negative": report.top_negative_headlines,
         "generated_at": report.generated_at,
+        "cached": cached,
+        "age_seconds": round(age_seconds, 1),
     }
 
+
+
+# Streaming research runs by (market_id, normalized query): the shared task,
+# progress listeners (one queue per SSE client) and final run metadata
+_sentiment_streams: dict = {}
+
+
+def _start_sentiment_stream(key, llm, market_id: str, query: str, ci_half_width: float,
+                            reference: Optional[str], report_cache) -> dict:
+    run = {"listeners": [], "meta": {}, "last_progress": None}
+    
+    async def compute() -> ResearchReport:
+        # Batch jobs share LLM capacity fairly per market
+        llm_client.set(f"sentiment:{market_id}")
+        try:
+            async for kind, item in stream_research_market(
+                llm, market_id, query, ci_half_width=ci_half_width, reference=reference,
+            ):
+                if kind == "progress":
+                    run["last_progress"] = item
+                    for listener in run["listeners"]:
+                        listener.put_nowait(item)
+                else:
+                    run["meta"] = {k: v for k, v in item.items() if k != "report"}
+                    return item["report"]
+        finally:
+            if _sentiment_streams.get(key) is run:
+                del _sentiment_streams[key]
+    
+    if report_cache and report_cache.is_computing(market_id, query):
+        # A /sentiment computation is in flight: wait for it (no progress)
+        run["task"] = report_cache.compute_shared(market_id, query, compute)
+        return run
+    
+    async def compute_and_cache() -> ResearchReport:
+        report = await compute()
+        # A run that stopped early (at this caller's ci_half_width) isn't
+        # the full report /sentiment and the refresher expect: don't cache it
+        if report_cache and not run["meta"].get("stopped_early"):
+            report_cache.put(market_id, query, report)
+        return report
+    
+    # Not the report cache's single-flight computation, so /sentiment never
+    # joins a run that may stop early
+    run["task"] = asyncio.create_task(compute_and_cache())
+    run["task"].add_done_callback(_log_stream_failure)
+    _sentiment_streams[key] = run
+    return run
+
+
+def _log_stream_failure(task: asyncio.Task) -> None:
+    # Also marks the exception retrieved once every SSE client has left
+    if not task.cancelled() and task.exception():
+        print(f"[API] Sentiment stream failed: {task.exception()}")
+
+
+@router.get("/markets/{market_id}/sentiment/stream")
+async def stream_market_sentiment(
+    request: Request,
+    market_id: str,
+    q: Optional[str] = None,
+    refresh: bool = False,
+    ci_half_width: float = Query(DEFAULT_CI_HALF_WIDTH, gt=0, le=100, description="Stop once the 95% CI is this narrow"),
+):
+    """
+    Sentiment analysis streamed via SSE.
+    
+    Emits `progress` events with the running score, signal and 95% confidence
+    interval (ci_low/ci_high) as article batches are scored, then a `done`
+    event with the same payload as /markets/{id}/sentiment. Scoring stops
+    early once the interval is narrower than ±ci_half_width. A fresh cached
+    report is returned as a single `done` event.
+    
+    Concurrent stream requests for the same market/query share one run.
+    Only runs that scored every story are written to the report cache;
+    plain /sentiment requests never wait on a streaming run.
+    """
+    llm = getattr(request.app.state, "llm", None)
+    if not llm:
+        raise HTTPException(status_code=503, detail="LLM service not available")
+    
+    market = state.get_market(market_id)
+    if not market and not q:
+        raise HTTPException(status_code=404, detail="Market not found. Provide ?q= parameter.")
+    
+    query = q or market.title
+    report_cache = getattr(request.app.state, "sentiment_cache", None)
+    
+    async def generate():
+        entry = None if refresh or not report_cache else report_cache.get(market_id, query)
+        if entry is not None and entry.age_seconds <= report_cache.ttl:
+            payload = _sentiment_payload(entry.report, True, entry.age_seconds)
+            yield f"event: done\ndata: {json.dumps(payload)}\n\n"
+            return
+        
+        # Join a streaming run for the same market/query, or start one (a
+        # /sentiment computation already in flight is joined here, without
+        # progress events). /sentiment requests don't join streaming runs.
+        key = (market_id, normalize_query(query))
+        run = _sentiment_streams.get(key)
+        if run is None:
+            run = _start_sentiment_stream(key, llm, market_id, query, ci_half_width,
+                                          market.title if market else None, report_cache)
+        queue: asyncio.Queue = asyncio.Queue()
+        if run.get("last_progress"):
+            queue.put_nowait(run["last_progress"])
+        run["listeners"].append(queue)
+        task = run["task"]
+        
+        try:
+            while True:
+                getter = asyncio.ensure_future(queue.get())
+                await asyncio.wait({getter, task}, return_when=asyncio.FIRST_COMPLETED)
+                if not getter.done():
+                    getter.cancel()
+                    break
+                yield f"event: progress\ndata: {json.dumps(getter.result())}\n\n"
+            while not queue.empty():
+                yield f"event: progress\ndata: {json.dumps(queue.get_nowait())}\n\n"
+            
+            result = await asyncio.shield(task)
+            report = getattr(result, "report", result)
+            meta = run["meta"]
+            payload = {
+                **_sentiment_payload(report, False, 0.0),
+                "stories_scored": meta.get("scored"),
+                "stories_total": meta.get("total"),
+                "stopped_early": meta.get("stopped_early", False),
+            }
+            yield f"event: done\ndata: {json.dumps(payload)}\n\n"
+        except Exception as e:
+            yield f"event: error\ndata: {json.dumps({'detail': f'Research failed: {e}'})}\n\n"
+        finally:
+            if queue in run["listeners"]:
+                run["listeners"].remove(queue)
+    
+    return StreamingResponse(generate(), media_type="text/event-stream")
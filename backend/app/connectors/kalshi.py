@@ -1,7 +1,9 @@
 import httpx
 import asyncio
 import re
-from ..schemas import Market, Outcome, OrderBookLevel, Event
+import time
+from collections import OrderedDict
+from ..schemas import Market, Outcome, OrderBookLevel, Event, QuotePoint
 from ..state import StateManager
 from ..taxonomy import get_sector_from_kalshi_category
 
@@ -19,6 +21,40 @@ def extract_keywords(query: str) -> list[str]:
     words = re.findall(r'\b[a-zA-Z]+\b', query.lower())
     return [w for w in words if w not in STOP_WORDS and len(w) > 1]
 
+# Chart range -> (seconds of history, candlestick period in minutes)
+CANDLE_RANGES = {
+    "1H": (3600, 1),
+    "6H": (6 * 3600, 1),
+    "1D": (24 * 3600, 60),
+    "5D": (5 * 24 * 3600, 60),
+    "1W": (7 * 24 * 3600, 60),
+    "1M": (30 * 24 * 3600, 60),
+    "ALL": (3 * 365 * 24 * 3600, 1440),
+}
+
+
+def candle_to_point(candle: dict) -> QuotePoint | None:
+    """Yes-side QuotePoint from a Kalshi candlestick (prices in cents)."""
+    def close(field: str):
+        value = (candle.get(field) or {}).get("close")
+        return float(value) / 100 if value is not None else None
+
+    bid, ask, last = close("yes_bid"), close("yes_ask"), close("price")
+    mid = (bid + ask) / 2 if bid and ask else last if last is not None else bid or ask
+    if mid is None or candle.get("end_period_ts") is None:
+        return None
+    return QuotePoint(ts=float(candle["end_period_ts"]), mid=mid, bid=bid, ask=ask,
+                      volume=float(candle["volume"]) if candle.get("volume") is not None else None)
+
+
+def merge_history(backfill: list[QuotePoint], local: list[QuotePoint]) -> list[QuotePoint]:
+    """Backfilled candles up to where locally collected (finer) ticks begin."""
+    if not local:
+        return list(backfill)
+    start = local[0].ts
+    return [p for p in backfill if p.ts < start] + list(local)
+
+
 SERIES_TO_SECTOR = {
     "KXNFL": "Sports", "KXNBA": "Sports", "KXMLB": "Sports", 
     "KXNHL": "Sports", "KXSOCCER": "Sports", "KXWNBA": "Sports",
@@ -32,9 +68,14 @@ SERIES_TO_SECTOR = {
 
 
 class KalshiConnector:
-    def __init__(self, state_manager: StateManager):
+    def __init__(self, state_manager: StateManager, max_candle_series: int = 500):
         self.state = state_manager
         self.client = httpx.AsyncClient(base_url=KALSHI_API_URL, timeout=30.0)
+        # (ticker, range) -> (candles, fetched_at); refreshed from the tail,
+        # least recently used series evicted beyond max_candle_series
+        self.max_candle_series = max_candle_series
+        self._candles: OrderedDict[tuple[str, str], tuple[list[QuotePoint], float]] = OrderedDict()
+        self._candle_tasks: dict[tuple[str, str], asyncio.Task] = {}
 
     async def search_markets(self, query: str) -> list[Market]:
         """
@@ -323,3 +364,80 @@ class KalshiConnector:
                         (yes_bids[0].p + yes_asks[0].p)/2, yes_bids[0].p, yes_asks[0].p)
         except:
             pass
+
+    # ---------- history backfill ----------
+
+    async def fetch_candlesticks(self, market: Market, start_ts: int, end_ts: int, period: int) -> list[QuotePoint]:
+        """Yes-side price candles for a market from Kalshi's candlesticks API."""
+        series = market.category or market.source_id.split("-")[0]
+        try:
+            resp = await self.client.get(
+                f"/series/{series}/markets/{market.source_id}/candlesticks",
+                params={"start_ts": start_ts, "end_ts": end_ts, "period_interval": period},
+            )
+            if resp.status_code != 200:
+                print(f"[Kalshi] Candlesticks failed for {market.source_id}: {resp.status_code}")
+                return []
+            points = [candle_to_point(c) for c in resp.json().get("candlesticks", [])]
+            return sorted((p for p in points if p), key=lambda p: p.ts)
+        except Exception as e:
+            print(f"[Kalshi] Error fetching candlesticks for {market.source_id}: {e}")
+            return []
+
+    async def _backfill(self, market: Market, range_key: str) -> list[QuotePoint]:
+        window, period = CANDLE_RANGES[range_key]
+        key = (market.source_id, range_key)
+        now = int(time.time())
+        cached = self._candles.get(key)
+
+        if cached and cached[0]:
+            candles = cached[0]
+            # The last candle may have been partial: refetch from it onwards
+            tail = int(candles[-1].ts)
+            fresh = await self.fetch_candlesticks(market, tail - period * 60, now, period)
+            if fresh:
+                candles = [p for p in candles if p.ts < tail] + [p for p in fresh if p.ts >= tail]
+        else:
+            candles = await self.fetch_candlesticks(market, now - window, now, period)
+
+        candles = [p for p in candles if p.ts >= now - window]
+        self._candles[key] = (candles, time.time())
+        self._candles.move_to_end(key)
+        while len(self._candles) > self.max_candle_series:
+            self._candles.popitem(last=False)
+        return candles
+
+    async def get_backfilled_history(self, market_id: str, range: str | None = None) -> dict[str, list[QuotePoint]]:
+        """
+        Market history keyed by outcome_id: upstream candles (cached, fetched
+        on first request and refreshed at most once per candle period)
+        merged with locally collected ticks.
+        """
+        market = self.state.get_market(market_id)
+        range_key = (range or "1D").upper()
+        if range_key not in CANDLE_RANGES:
+            range_key = "1D"
+        window, period = CANDLE_RANGES[range_key]
+        local = self.state.get_all_outcomes_history(market_id, None if range_key == "ALL" else window)
+        if not market or market.source != "kalshi" or not market.outcomes:
+            return local
+
+        key = (market.source_id, range_key)
+        cached = self._candles.get(key)
+        if cached and time.time() - cached[1] < max(period * 60, 60):
+            candles = cached[0]
+            self._candles.move_to_end(key)
+        else:
+            task = self._candle_tasks.get(key)
+            if task is None:
+                task = asyncio.create_task(self._backfill(market, range_key))
+                self._candle_tasks[key] = task
+                task.add_done_callback(lambda _: self._candle_tasks.pop(key, None))
+            candles = await asyncio.shield(task)
+
+        # Pollers record the first (yes) outcome only
+        oid = market.outcomes[0].outcome_id
+        merged = merge_history(candles, local.get(oid, []))
+        if merged:
+            local[oid] = merged
+        return local
@@ -12,6 +12,18 @@ from ..taxonomy import get_sector_from_pm_tags, extract_pm_tag_labels
 GAMMA_API_URL = "https://gamma-api.polymarket.com"
 CLOB_API_URL = "https://clob.polymarket.com"
 
+# Chart range -> CLOB /prices-history interval
+PRICE_HISTORY_INTERVALS = {
+    "1H": "1h",
+    "6H": "6h",
+    "1D": "1d",
+    "5D": "1d",  # 5 days = use 1d fidelity
+    "1W": "1w",
+    "1M": "1m",
+    "ALL": "max",
+}
+PRICE_HISTORY_FIDELITY = 60  # 60 minute fidelity for cleaner data
+
 # Common stop words to filter out for smarter search
 STOP_WORDS = {
     "a", "an", "the", "is", "are", "was", "were", "will", "would", "could", 
@@ -431,35 +443,27 @@ class PolymarketConnector:
             
             await asyncio.sleep(0.1)
 
-    async def fetch_price_history(self, token_id: str, interval: str = "1d") -> list[dict]:
+    async def fetch_price_history(self, token_id: str, interval: str = "1d", start_ts: int | None = None) -> list[dict]:
         """
         Fetch historical price data from Polymarket CLOB API.
         
         Args:
             token_id: The CLOB token ID (outcome_id)
             interval: Time interval - '1h', '6h', '1d', '1w', '1m', or 'max'
+            start_ts: Only fetch points from this unix time on (replaces interval)
         
         Returns:
             List of {t: timestamp, p: price} objects
         """
         try:
-            # Map our intervals to Polymarket's format
-            interval_map = {
-                "1H": "1h",
-                "6H": "6h", 
-                "1D": "1d",
-                "5D": "1d",  # 5 days = use 1d fidelity
-                "1W": "1w",
-                "1M": "1m",
-                "ALL": "max"
-            }
-            pm_interval = interval_map.get(interval.upper(), "1d")
+            params = {"market": token_id, "fidelity": PRICE_HISTORY_FIDELITY}
+            if start_ts is not None:
+                params["startTs"] = int(start_ts)
+            else:
+                # Map our intervals to Polymarket's format
+                params["interval"] = PRICE_HISTORY_INTERVALS.get(interval.upper(), "1d")
             
-            resp = await self.clob_client.get("/prices-history", params={
-                "market": token_id,
-                "interval": pm_interval,
-                "fidelity": 60  # 60 minute fidelity for cleaner data
-            })
+            resp = await self.clob_client.get("/prices-history", params=params)
             
             if resp.status_code == 200:
                 data = resp.json()
@@ -0,0 +1,149 @@
+"""
+MinHash / LSH index over market titles.
+
+Provides sub-linear candidate blocking for title matching: each market is
+reduced to a MinHash signature over its title shingles, and the signature is
+split into bands that are hashed into buckets. Markets sharing any bucket with
+the query become candidates, which are then ranked by estimated Jaccard.
+
+Tuning (NUM_PERM = BANDS * ROWS): with 16 bands of 2 rows, pairs with word
+Jaccard 0.3 collide with ~78% probability and 0.5 with ~99%.
+"""
+
+import re
+import zlib
+from typing import Dict, List, Optional, Set, Tuple
+
+from .schemas import Market
+
+NUM_BANDS = 16
+ROWS_PER_BAND = 2
+NUM_PERM = NUM_BANDS * ROWS_PER_BAND
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+
+SHINGLE_STOP_WORDS = {
+    "will", "the", "a", "an", "in", "on", "at", "by", "to", "of", "for", "is",
+    "be", "and", "or", "with", "this", "that", "what", "who", "which",
+}
+
+
+def _make_permutations(n: int, seed: int = 1) -> List[Tuple[int, int]]:
+    """Deterministic (a, b) coefficients for universal hashing."""
+    perms = []
+    x = seed
+    for _ in range(n):
+        # Simple LCG so signatures are stable across processes
+        x = (x * 6364136223846793005 + 1442695040888963407) % (1 << 64)
+        a = (x >> 3) % _MERSENNE_PRIME or 1
+        x = (x * 6364136223846793005 + 1442695040888963407) % (1 << 64)
+        b = (x >> 3) % _MERSENNE_PRIME
+        perms.append((a, b))
+    return perms
+
+
+_PERMUTATIONS = _make_permutations(NUM_PERM)
+
+
+def title_shingles(title: str) -> Set[str]:
+    """Word shingles of a title (lowercased, stop words removed)."""
+    words = re.findall(r"[a-z0-9$%.]+", title.lower())
+    return {w.strip(".") for w in words if w.strip(".") and w not in SHINGLE_STOP_WORDS}
+
+
+def minhash_signature(shingles: Set[str]) -> Tuple[int, ...]:
+    """MinHash signature of a shingle set (empty set -> all max values)."""
+    if not shingles:
+        return tuple([_MAX_HASH] * NUM_PERM)
+    hashes = [zlib.crc32(s.encode("utf-8")) for s in shingles]
+    return tuple(
+        min(((a * h + b) % _MERSENNE_PRIME) & _MAX_HASH for h in hashes)
+        for a, b in _PERMUTATIONS
+    )
+
+
+def estimate_jaccard(sig_a: Tuple[int, ...], sig_b: Tuple[int, ...]) -> float:
+    return sum(1 for x, y in zip(sig_a, sig_b) if x == y) / NUM_PERM
+
+
+class MarketLSHIndex:
+    """
+    Incrementally updated LSH index of markets.
+
+    Register `add` as a StateManager market listener to keep it current.
+    """
+
+    def __init__(self, max_candidates: int = 50):
+        self.max_candidates = max_candidates
+        self._markets: Dict[str, Market] = {}
+        self._signatures: Dict[str, Tuple[int, ...]] = {}
+        self._buckets: List[Dict[Tuple[int, ...], Set[str]]] = [{} for _ in range(NUM_BANDS)]
+
+    def __len__(self) -> int:
+        return len(self._markets)
+
+    def _bands(self, signature: Tuple[int, ...]):
+        for i in range(NUM_BANDS):
+            yield i, signature[i * ROWS_PER_BAND:(i + 1) * ROWS_PER_BAND]
+
+    def add(self, market: Market):
+        """Insert or update a market."""
+        market_id = market.market_id
+        signature = minhash_signature(title_shingles(market.title))
+        old = self._signatures.get(market_id)
+        self._markets[market_id] = market
+
+        if old == signature:
+            return
+        if old is not None:
+            self._remove_signature(market_id, old)
+
+        self._signatures[market_id] = signature
+        for i, band in self._bands(signature):
+            self._buckets[i].setdefault(band, set()).add(market_id)
+
+    def remove(self, market_id: str):
+        signature = self._signatures.pop(market_id, None)
+        self._markets.pop(market_id, None)
+        if signature is not None:
+            self._remove_signature(market_id, signature)
+
+    def _remove_signature(self, market_id: str, signature: Tuple[int, ...]):
+        for i, band in self._bands(signature):
+            bucket = self._buckets[i].get(band)
+            if bucket:
+                bucket.discard(market_id)
+                if not bucket:
+                    del self._buckets[i][band]
+
+    def query(
+        self,
+        market: Market,
+        exclude_source: Optional[str] = None,
+        limit: Optional[int] = None,
+    ) -> List[Market]:
+        """
+        Candidate markets sharing at least one LSH bucket with `market`,
+        ranked by estimated Jaccard similarity (best first).
+        """
+        signature = self._signatures.get(market.market_id)
+        if signature is None:
+            signature = minhash_signature(title_shingles(market.title))
+
+        candidate_ids: Set[str] = set()
+        for i, band in self._bands(signature):
+            bucket = self._buckets[i].get(band)
+            if bucket:
+                candidate_ids.update(bucket)
+        candidate_ids.discard(market.market_id)
+
+        scored = []
+        for market_id in candidate_ids:
+            other = self._markets.get(market_id)
+            if other is None or (exclude_source and other.source == exclude_source):
+                continue
+            scored.append((estimate_jaccard(signature, self._signatures[market_id]), other))
+
+        scored.sort(key=lambda x: x[0], reverse=True)
+        return [m for _, m in scored[: limit or self.max_candidates]]
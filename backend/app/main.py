@@ -8,7 +8,14 @@ from .connectors.polymarket import PolymarketConnector
 from .connectors.kalshi import KalshiConnector
 from .ai.agent import AgentService
 from .ai.llm_service import LLMService
+from .ai.suggestion_prefetch import SuggestionPrefetcher
 from .ai.embedding_service import EmbeddingService
+from .services.pairing import MarketPairingService
+from .lsh import MarketLSHIndex
+from .services.report_cache import SentimentReportCache
+from .services.sentiment_refresher import SentimentRefresher
+from .services.price_history import PriceHistoryService
+from .services.state_snapshot import StateSnapshotter
 from contextlib import asynccontextmanager
 
 from pathlib import Path
@@ -39,6 +46,9 @@ async def lifespan(app: FastAPI):
     app.state.poly = poly_connector
     app.state.kalshi = kalshi_connector
     
+    # Cached, concurrent per-outcome price history for charts
+    app.state.price_history = PriceHistoryService(poly_connector)
+    
     # Initialize Agent Service (for chat)
     print("Initializing Agent Service...")
     try:
@@ -46,6 +56,7 @@ async def lifespan(app: FastAPI):
         # Load assistant ID from environment or create new one
         assistant_id = os.getenv("BACKBOARD_ASSISTANT_ID")
         await agent_service.initialize(assistant_id)
+        agent_service.refill_thread_pool()
         app.state.agent = agent_service
         print(f"Agent Service initialized with assistant: {agent_service.assistant_id}")
     except ValueError as e:
@@ -70,6 +81,11 @@ async def lifespan(app: FastAPI):
         print(f"Failed to initialize LLM Service: {e}")
         app.state.llm = None
     
+    # Warm suggestions for commands the user is likely to open next
+    app.state.suggestion_prefetcher = (
+        SuggestionPrefetcher(app.state.llm, state) if app.state.llm else None
+    )
+    
     # Initialize Embedding Service (for cross-market comparison)
     print("Initializing Embedding Service...")
     try:
@@ -84,7 +100,32 @@ async def lifespan(app: FastAPI):
         print(f"Failed to initialize Embedding Service: {e}")
         app.state.embedding = None
 
+    # MinHash/LSH title index for find_related_market (kept current on insert)
+    market_index = MarketLSHIndex()
+    for market in state.get_all_markets():
+        market_index.add(market)
+    state.add_market_listener(market_index.add)
+    app.state.market_index = market_index
+
+    # Initialize cross-platform pairing (background, updates as markets arrive)
+    pairing_service = MarketPairingService(state, embedding_service=app.state.embedding)
+    pairing_service.start()
+    app.state.pairing = pairing_service
+
+    # Warm start: restore markets/books/quotes from the last snapshot in the
+    # background (after the listeners above, so they index restored markets)
+    snapshotter = StateSnapshotter(state)
+    snapshotter.start()
+    app.state.snapshotter = snapshotter
+
     
+    # Sentiment report cache (SQLite-backed, survives restarts)
+    try:
+        app.state.sentiment_cache = SentimentReportCache()
+    except Exception as e:
+        print(f"Sentiment report cache unavailable: {e}")
+        app.state.sentiment_cache = None
+
     # Initialize SubscriptionManager
     from .manager import SubscriptionManager
     sub_manager = SubscriptionManager()
@@ -105,6 +146,16 @@ async def lifespan(app: FastAPI):
 
     sub_manager.set_spawner(spawner)
 
+    # Keep sentiment reports warm for the most-watched markets
+    sentiment_refresher = None
+    if app.state.llm and app.state.sentiment_cache:
+        sentiment_refresher = SentimentRefresher(
+            state, app.state.llm, app.state.sentiment_cache,
+            subscriptions=lambda: sub_manager.subscriptions,
+        )
+        sentiment_refresher.start()
+    app.state.sentiment_refresher = sentiment_refresher
+
     print("Server startup complete. Markets will load on-demand via search.")
     
     # Link StateManager to WS manager (Broadcast)
@@ -125,6 +176,17 @@ async def lifespan(app: FastAPI):
     state.update_orderbook = side_effect_ob
 
     yield
+
+    await snapshotter.stop()
+    await pairing_service.stop()
+    if sentiment_refresher:
+        await sentiment_refresher.stop()
+    if app.state.suggestion_prefetcher:
+        app.state.suggestion_prefetcher.cancel()
+    if app.state.llm:
+        await app.state.llm.aclose()
+    if app.state.agent:
+        await app.state.agent.stop_thread_pool()
     
     # Shutdown (Manager handles task cleanup if we implemented it, 
     # but for now we just let them die with loop or explicit cancel)
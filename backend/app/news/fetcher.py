@@ -5,6 +5,7 @@ from pathlib import Path
 # Load .env before importing providers so API keys are available
 load_dotenv(Path(__file__).parent.parent.parent.parent / ".env")
 
+import time
 from typing import List, Dict, Callable, Generator, Tuple
 from concurrent.futures import ThreadPoolExecutor, as_completed
 
@@ -108,16 +109,18 @@ class NewsFetcher:
         if not valid_providers:
             return
 
-        def fetch_from_provider(provider: str) -> List[Article]:
+        def fetch_from_provider(provider: str) -> Tuple[List[Article], float]:
+            start = time.perf_counter()
             try:
-                return self._providers[provider](
+                result = self._providers[provider](
                     query=query,
                     limit=limit,
                     **kwargs,
                 )
             except Exception as e:
                 print(f"[NewsFetcher] Error with {provider}: {e}")
-                return []
+                result = []
+            return result, time.perf_counter() - start
 
         with ThreadPoolExecutor(max_workers=len(valid_providers)) as executor:
             future_to_provider = {
@@ -128,8 +131,8 @@ class NewsFetcher:
             for future in as_completed(future_to_provider):
                 provider = future_to_provider[future]
                 try:
-                    result = future.result()
-                    print(f"[NewsFetcher] {provider} returned {len(result)} articles")
+                    result, elapsed = future.result()
+                    print(f"[NewsFetcher] {provider} returned {len(result)} articles in {elapsed:.2f}s")
                     yield provider, result
                 except Exception as e:
                     print(f"[NewsFetcher] {provider} failed: {e}")
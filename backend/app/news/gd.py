@@ -1,69 +1,126 @@
+import math
+import time
 import requests
-from typing import List, Dict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import List, Dict, Optional, Tuple
 from datetime import datetime, timedelta
 
+BASE_URL = "https://api.gdeltproject.org/api/v2/doc/doc"
+MAX_PAGE_SIZE = 250  # GDELT allows up to 250 per request
+MIN_PAGE_SIZE = 25  # Smaller pages cost more requests than they save in latency
+MAX_PARALLEL_PAGES = 4
+PAGE_TIMEOUT = 15
+
+
+def _fetch_page(params: Dict, startrecord: int, page_size: int) -> List[Dict]:
+    resp = requests.get(
+        BASE_URL,
+        params={**params, "maxrecords": page_size, "startrecord": startrecord},
+        timeout=PAGE_TIMEOUT,
+    )
+    resp.raise_for_status()
+    return resp.json().get("articles", [])
+
+
+def _assemble(
+    pages: Dict[int, Optional[List[Dict]]],
+    num_pages: int,
+    page_size: int,
+    limit: int,
+) -> Tuple[List[Dict], bool]:
+    """
+    Items of the finished pages in order, stopping where sequential paging
+    would have stopped (failed, empty or short page, or limit reached).
+
+    Returns:
+        (items, complete) - complete once later pages can't change the result
+    """
+    items: List[Dict] = []
+    for page in range(num_pages):
+        if page not in pages:
+            return items, False  # Still waiting for an earlier page
+        batch = pages[page]
+        if not batch:
+            return items, True  # Request failed or no more results
+        items.extend(batch)
+        if len(items) >= limit or len(batch) < page_size:
+            return items, True
+    return items, True
+
+
+def _to_article(item: Dict) -> Dict:
+    pub_dt = item.get("seendate") or item.get("date")
+    if pub_dt:
+        try:
+            pub_dt = datetime.strptime(pub_dt, "%Y%m%d%H%M%S").isoformat()
+        except Exception:
+            pub_dt = pub_dt
+
+    return {
+        "source": "gdelt2",
+        "title": item.get("title") or "",
+        "description": item.get("themes") or "",
+        "url": item.get("url"),
+        "published_at": pub_dt,
+        "language": "en",  # sourcelang=english
+        "raw": item,
+    }
+
+
 def fetch_gdelt2(query: str, limit: int = 20, **kwargs) -> List[Dict]:
     """
     Fetch news articles from GDELT 2.0 using keyword search.
     Ensures the requested `limit` is actually returned by paginating results.
 
+    The pages needed for `limit` are planned up front and fetched
+    concurrently (at most `max_workers` at a time); outstanding pages are
+    abandoned as soon as the earlier ones settle the result.
+
     Signature:
         fetch_gdelt2(query: str, limit: int = 20, **kwargs) -> List[Dict]
     """
-    base_url = "https://api.gdeltproject.org/api/v2/doc/doc"
+    started = time.perf_counter()
     today = datetime.utcnow()
     start_date = kwargs.get("start_date", (today - timedelta(days=7)).strftime("%Y%m%d%H%M%S"))
     end_date = kwargs.get("end_date", today.strftime("%Y%m%d%H%M%S"))
+    max_workers = kwargs.get("max_workers", MAX_PARALLEL_PAGES)
 
-    articles: List[Dict] = []
-    startrecord = 0
-    batch_size = min(limit, 250)  # GDELT allows up to 250 per request
-
-    while len(articles) < limit:
-        params = {
-            "query": query,
-            "mode": "ArtList",
-            "format": "JSON",
-            "maxrecords": batch_size,
-            "startdatetime": start_date,
-            "enddatetime": end_date,
-            "startrecord": startrecord,
-            "sourcelang": "english",
-        }
+    params = {
+        "query": query,
+        "mode": "ArtList",
+        "format": "JSON",
+        "startdatetime": start_date,
+        "enddatetime": end_date,
+        "sourcelang": "english",
+    }
 
-        try:
-            resp = requests.get(base_url, params=params, timeout=15)
-            resp.raise_for_status()
-            data = resp.json()
-        except Exception:
-            break
+    # Spread the limit over the workers so typical limits (30 for research,
+    # <= 100 for /news/search) are fetched as several concurrent pages too
+    page_size = min(limit, MAX_PAGE_SIZE, max(MIN_PAGE_SIZE, math.ceil(limit / max(1, max_workers))))
+    num_pages = math.ceil(limit / page_size) if page_size > 0 else 0
+    pages: Dict[int, Optional[List[Dict]]] = {}
+    items: List[Dict] = []
 
-        batch = data.get("articles", [])
-        if not batch:
-            break  # no more results
-
-        for item in batch:
-            pub_dt = item.get("seendate") or item.get("date")
-            if pub_dt:
+    if num_pages:
+        executor = ThreadPoolExecutor(max_workers=max(1, min(num_pages, max_workers)))
+        futures = {
+            executor.submit(_fetch_page, params, page * page_size, page_size): page
+            for page in range(num_pages)
+        }
+        try:
+            for future in as_completed(futures):
                 try:
-                    pub_dt = datetime.strptime(pub_dt, "%Y%m%d%H%M%S").isoformat()
+                    pages[futures[future]] = future.result()
                 except Exception:
-                    pub_dt = pub_dt
-
-            articles.append({
-                "source": "gdelt2",
-                "title": item.get("title") or "",
-                "description": item.get("themes") or "",
-                "url": item.get("url"),
-                "published_at": pub_dt,
-                "raw": item,
-            })
-
-            if len(articles) >= limit:
-                break
-
-        startrecord += len(batch)
-        if len(batch) < batch_size:
-            break  # no more data to paginate
+                    pages[futures[future]] = None
+                items, complete = _assemble(pages, num_pages, page_size, limit)
+                if complete:
+                    break
+        finally:
+            # Don't wait for pages we no longer need
+            executor.shutdown(wait=False, cancel_futures=True)
 
-    return articles[:limit]
+    articles = [_to_article(item) for item in items[:limit]]
+    elapsed = time.perf_counter() - started
+    print(f"[GDELT] {len(articles)} articles from {len(pages)}/{num_pages} pages in {elapsed:.2f}s")
+    return articles
@@ -37,6 +37,7 @@ def fetch_newsdata(query: str, limit: int = 20, **kwargs) -> List[Dict]:
             "description": a.get("description"),
             "url": a.get("link"),
             "published_at": a.get("pubDate"),
+            "language": params["language"],
             "raw": a,
         })
 
@@ -5,13 +5,21 @@ Simple, balanced ranking by relevance and recency.
 No source bias. No forced interleaving.
 """
 
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Sequence, Tuple
+from collections import OrderedDict
 from datetime import datetime, timezone
+import hashlib
+import heapq
 import re
 import math
 
 from langdetect import detect, LangDetectException
 
+try:
+    import numpy as np  # Vectorized recency/score math and top-k
+except ImportError:  # Pure-Python fallback (same results), e.g. for minimal installs
+    np = None
+
 Article = Dict[str, object]
 
 STOP_WORDS = {"the", "a", "an", "is", "are", "was", "were", "be", "been", 
@@ -27,6 +35,47 @@ WEIGHT_QUALITY = 0.20
 # Recency decay - increased half-life to allow older articles
 RECENCY_HALF_LIFE_HOURS = 72
 
+TIMESTAMP_FORMATS = [
+    "%Y-%m-%dT%H:%M:%S.%f",
+    "%Y-%m-%dT%H:%M:%S",
+    "%Y-%m-%d %H:%M:%S",
+    "%Y-%m-%d",
+]
+
+# Near-duplicate clustering: 64-bit SimHash over word bigrams of title +
+# snippet; articles within NEAR_DUPLICATE_DISTANCE bits are one story
+# (re-titled wire copies land around 5-10 bits apart, different stories on
+# the same topic 20+). The hash is split into NEAR_DUPLICATE_DISTANCE + 1
+# blocks, so any such pair shares at least one block exactly (pigeonhole)
+# and only those pairs are compared.
+SIMHASH_BITS = 64
+NEAR_DUPLICATE_DISTANCE = 8
+SIMHASH_SNIPPET_CHARS = 300
+MIN_SIMHASH_FEATURES = 4
+
+# Snippet characters considered by lexical_similarity
+SIMILARITY_SNIPPET_CHARS = 500
+
+# Language filter: common function words used for the cheap first pass.
+# Titles the heuristic can't call either way go to langdetect.
+ENGLISH_MARKERS = STOP_WORDS | {
+    "as", "after", "over", "says", "new", "how", "why", "what", "who", "into",
+    "about", "up", "more", "than", "could", "can", "you", "we", "he", "she",
+    "they", "his", "her", "their", "our", "amid", "ahead", "against", "year",
+}
+FOREIGN_MARKERS = {
+    "el", "la", "los", "las", "del", "y", "que", "por", "para", "con", "una",
+    "le", "les", "des", "du", "et", "est", "une", "pour", "dans", "sur",
+    "der", "die", "das", "und", "mit", "von", "für", "ist", "zu", "den",
+    "il", "di", "che", "per", "della", "não", "com", "uma", "os", "em",
+    "yang", "dan", "untuk", "dari", "het", "een", "van", "niet", "ve", "bir",
+}
+LANGUAGE_MEMO_SIZE = 10000
+
+_WORD_RE = re.compile(r"[^\W\d_]+")
+_language_memo: "OrderedDict[int, bool]" = OrderedDict()
+_language_stats = {"declared": 0, "memo_hits": 0, "heuristic": 0, "langdetect": 0}
+
 
 def tokenize(text: str) -> set:
     """Extract meaningful terms from text."""
@@ -34,14 +83,92 @@ def tokenize(text: str) -> set:
     return {w for w in words if w not in STOP_WORDS}
 
 
+def guess_english(text: str) -> Optional[bool]:
+    """
+    Cheap first pass: True/False when the title is clearly (not) English,
+    None when it's ambiguous and needs langdetect.
+    """
+    words = _WORD_RE.findall(text.lower())
+    if not words:
+        return None
+    letters = sum(len(w) for w in words)
+    non_ascii = sum(1 for w in words for ch in w if ord(ch) > 127)
+    if non_ascii / letters > 0.3:
+        return False  # Non-Latin script
+    english = sum(1 for w in words if w in ENGLISH_MARKERS)
+    foreign = sum(1 for w in words if w in FOREIGN_MARKERS)
+    if foreign >= 2 and foreign > english:
+        return False
+    if not non_ascii and english and english / len(words) >= 0.15 and english > foreign:
+        return True
+    return None
+
+
 def is_english(text: str) -> bool:
-    """Check if text is English using langdetect."""
+    """Check if text is English (heuristic first, langdetect for ambiguous text; memoized)."""
     if not text or len(text.strip()) < 10:
         return True  # Too short to detect, allow it
-    try:
-        return detect(text) == "en"
-    except LangDetectException:
-        return True  # Detection failed, allow it
+    
+    key = hash(text)
+    cached = _language_memo.get(key)
+    if cached is not None:
+        _language_stats["memo_hits"] += 1
+        _language_memo.move_to_end(key)
+        return cached
+    
+    result = guess_english(text)
+    if result is not None:
+        _language_stats["heuristic"] += 1
+    else:
+        _language_stats["langdetect"] += 1
+        try:
+            result = detect(text) == "en"
+        except LangDetectException:
+            result = True  # Detection failed, allow it
+    
+    _language_memo[key] = result
+    if len(_language_memo) > LANGUAGE_MEMO_SIZE:
+        _language_memo.popitem(last=False)
+    return result
+
+
+def filter_english(articles: List[Article]) -> List[Article]:
+    """
+    Keep English articles. Providers that already filter by language declare
+    it in the article's "language" field, which skips detection.
+    """
+    kept = []
+    for a in articles:
+        language = a.get("language")
+        if language:
+            _language_stats["declared"] += 1
+            if str(language).lower().startswith("en"):
+                kept.append(a)
+        elif is_english(str(a.get("title", ""))):
+            kept.append(a)
+    return kept
+
+
+def get_language_stats() -> Dict[str, int]:
+    """Counters for how language decisions were made."""
+    return {**_language_stats, "memo_size": len(_language_memo)}
+
+
+def _now() -> float:
+    return datetime.now(timezone.utc).timestamp()
+
+
+def _clean_timestamp(ts: str) -> str:
+    # Handle timezone suffixes
+    if "+" in ts and ts.index("+") > 10:
+        return ts[:ts.index("+")]
+    if ts.endswith("Z"):
+        return ts[:-1]
+    return ts
+
+
+def _strptime_utc(clean_ts: str, fmt: str) -> float:
+    return datetime.strptime(clean_ts, fmt).replace(tzinfo=timezone.utc).timestamp()
 
 
 def parse_timestamp(ts) -> float:
@@ -51,31 +178,53 @@ def parse_timestamp(ts) -> float:
     if isinstance(ts, (int, float)):
         return ts / 1000 if ts > 1e12 else float(ts)
     if isinstance(ts, str):
-        # Handle timezone suffixes
-        clean_ts = ts
-        if "+" in ts and ts.index("+") > 10:
-            clean_ts = ts[:ts.index("+")]
-        elif ts.endswith("Z"):
-            clean_ts = ts[:-1]
-        
-        formats = [
-            "%Y-%m-%dT%H:%M:%S.%f",
-            "%Y-%m-%dT%H:%M:%S",
-            "%Y-%m-%d %H:%M:%S",
-            "%Y-%m-%d",
-        ]
-        for fmt in formats:
+        clean_ts = _clean_timestamp(ts)
+        for fmt in TIMESTAMP_FORMATS:
             try:
-                dt = datetime.strptime(clean_ts, fmt)
-                return dt.replace(tzinfo=timezone.utc).timestamp()
+                return _strptime_utc(clean_ts, fmt)
             except ValueError:
                 continue
     return 0.0
 
 
-def calculate_relevance(query: str, title: str, description: str = "") -> float:
-    """Score 0-1 based on query term matches in title."""
-    query_terms = tokenize(query)
+# Strings exactly in one of TIMESTAMP_FORMATS' zero-padded shapes, which
+# datetime.fromisoformat parses to the same value much faster than strptime
+_ISO_SHAPE = re.compile(r"\d{4}-\d{2}-\d{2}(?:T\d{2}:\d{2}:\d{2}(?:\.\d{1,6})?| \d{2}:\d{2}:\d{2})?")
+
+
+class TimestampParser:
+    """
+    parse_timestamp for a batch. Zero-padded ISO strings take a
+    fromisoformat fast path; anything else tries the last format that
+    matched first (articles from one provider share a format, and the
+    formats are mutually exclusive, so the order doesn't change the result).
+    """
+
+    def __init__(self):
+        self._formats = list(TIMESTAMP_FORMATS)
+
+    def parse(self, ts) -> float:
+        if not isinstance(ts, str):
+            return parse_timestamp(ts)
+        clean_ts = _clean_timestamp(ts)
+        if _ISO_SHAPE.fullmatch(clean_ts):
+            try:
+                return datetime.fromisoformat(clean_ts).replace(tzinfo=timezone.utc).timestamp()
+            except ValueError:
+                return 0.0  # Out-of-range fields fail every format too
+        for i, fmt in enumerate(self._formats):
+            try:
+                value = _strptime_utc(clean_ts, fmt)
+            except ValueError:
+                continue
+            if i:
+                self._formats.insert(0, self._formats.pop(i))
+            return value
+        return 0.0
+
+
+def relevance_score(query_terms: set, query_lower: str, title: str) -> float:
+    """calculate_relevance with the query already tokenized."""
     if not query_terms:
         return 0.5
     
@@ -87,23 +236,41 @@ def calculate_relevance(query: str, title: str, description: str = "") -> float:
     term_score = matches / len(query_terms)
     
     # Exact phrase bonus
-    phrase_bonus = 0.25 if query.lower() in title_lower else 0.0
+    phrase_bonus = 0.25 if query_lower in title_lower else 0.0
     
     return min(term_score * 0.75 + phrase_bonus, 1.0)
 
 
-def calculate_recency(published_at) -> float:
-    """Score 0-1 using exponential decay, 48h half-life."""
-    ts = parse_timestamp(published_at)
+def calculate_relevance(query: str, title: str, description: str = "") -> float:
+    """Score 0-1 based on query term matches in title."""
+    return relevance_score(tokenize(query), query.lower(), title)
+
+
+def lexical_similarity(reference_terms: set, article: Article) -> float:
+    """
+    Score 0-1: share of reference terms (e.g. a market title's) in the
+    article. Title matches count fully, snippet-only matches count half.
+    """
+    if not reference_terms:
+        return 0.0
+    title_terms = tokenize(article.get("title") or "")
+    snippet_terms = tokenize(str(article.get("description") or "")[:SIMILARITY_SNIPPET_CHARS])
+    hits = sum(1.0 if t in title_terms else 0.5 if t in snippet_terms else 0.0 for t in reference_terms)
+    return hits / len(reference_terms)
+
+
+def recency_score(ts: float, now: float) -> float:
     if ts <= 0:
         return 0.3
-    
-    now = datetime.now(timezone.utc).timestamp()
     age_hours = max((now - ts) / 3600, 0)
-    
     return math.pow(0.5, age_hours / RECENCY_HALF_LIFE_HOURS)
 
 
+def calculate_recency(published_at) -> float:
+    """Score 0-1 using exponential decay, 48h half-life."""
+    return recency_score(parse_timestamp(published_at), _now())
+
+
 def calculate_title_quality(title: str) -> float:
     """Heuristic quality score for title."""
     if not title:
@@ -132,20 +299,148 @@ def calculate_title_quality(title: str) -> float:
     return score
 
 
-def deduplicate(articles: List[Article]) -> List[Article]:
-    """Remove duplicates by URL."""
+def _url_key(article: Article) -> str:
+    return str(article.get("url", "")).lower().strip()
+
+
+def _dedupe_order(order: Sequence[int], articles: Sequence[Article]) -> List[int]:
+    """Keep the first position of each URL in order."""
     seen = set()
     unique = []
-    for a in articles:
-        url = str(a.get("url", "")).lower().strip()
+    for i in order:
+        url = _url_key(articles[i])
         if url and url not in seen:
             seen.add(url)
-            unique.append(a)
+            unique.append(i)
         elif not url:
-            unique.append(a)  # Keep articles without URLs
+            unique.append(i)  # Keep articles without URLs
     return unique
 
 
+def deduplicate(articles: List[Article]) -> List[Article]:
+    """Remove duplicates by URL."""
+    return [articles[i] for i in _dedupe_order(range(len(articles)), articles)]
+
+
+def _simhash_features(article: Article) -> List[str]:
+    text = f"{article.get('title') or ''} {str(article.get('description') or '')[:SIMHASH_SNIPPET_CHARS]}"
+    words = re.findall(r"[a-z0-9]+", text.lower())
+    return [f"{a} {b}" for a, b in zip(words, words[1:])]
+
+
+def simhash(features: Sequence[str]) -> int:
+    """64-bit SimHash of a feature list (each feature weighted 1)."""
+    counts = [0] * SIMHASH_BITS
+    for feature in features:
+        h = int.from_bytes(hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest(), "big")
+        for bit in range(SIMHASH_BITS):
+            counts[bit] += 1 if h >> bit & 1 else -1
+    return sum(1 << bit for bit, c in enumerate(counts) if c > 0)
+
+
+def cluster_near_duplicates(
+    articles: List[Article],
+    max_distance: int = NEAR_DUPLICATE_DISTANCE,
+) -> List[Article]:
+    """
+    Collapse near-duplicate articles (e.g. syndicated wire stories under
+    different URLs) into one representative per cluster.
+    
+    The first article of each cluster in input order is kept (pass ranked
+    articles to keep the best-scored copy), annotated with `_cluster_size`.
+    Articles with too little text to fingerprint stay on their own.
+    """
+    n = len(articles)
+    parent = list(range(n))
+    
+    def find(i: int) -> int:
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+    
+    blocks = max_distance + 1
+    width = SIMHASH_BITS // blocks
+    buckets: Dict[Tuple[int, int], List[int]] = {}
+    hashes: Dict[int, int] = {}
+    for i, article in enumerate(articles):
+        features = _simhash_features(article)
+        if len(features) < MIN_SIMHASH_FEATURES:
+            continue
+        h = hashes[i] = simhash(features)
+        for block in range(blocks):
+            key = (block, (h >> (block * width)) & ((1 << width) - 1))
+            for j in buckets.get(key, ()):
+                if bin(h ^ hashes[j]).count("1") <= max_distance:
+                    ri, rj = find(i), find(j)
+                    if ri != rj:
+                        # Lower index (higher ranked) stays the root
+                        parent[max(ri, rj)] = min(ri, rj)
+            buckets.setdefault(key, []).append(i)
+    
+    sizes: Dict[int, int] = {}
+    for i in range(n):
+        root = find(i)
+        sizes[root] = sizes.get(root, 0) + 1
+    return [{**articles[i], "_cluster_size": sizes[i]} for i in range(n) if find(i) == i]
+
+
+def score_articles(
+    articles: Sequence[Article],
+    query: str = "",
+) -> Tuple[List[float], List[float], List[float], List[float]]:
+    """
+    Batch version of the calculate_* functions: the query is tokenized once,
+    timestamps are parsed with a shared format guess, and recency/score math
+    runs on NumPy arrays when available.
+    
+    Returns:
+        (relevance, recency, quality, score) lists aligned with articles
+    """
+    query_terms = tokenize(query)
+    query_lower = query.lower()
+    parser = TimestampParser()
+    now = _now()
+    
+    relevance, timestamps, quality = [], [], []
+    for article in articles:
+        title = str(article.get("title", ""))
+        relevance.append(relevance_score(query_terms, query_lower, title))
+        timestamps.append(parser.parse(article.get("published_at")))
+        quality.append(calculate_title_quality(title))
+    
+    if np is None:
+        recency = [recency_score(ts, now) for ts in timestamps]
+        scores = [
+            (rel * WEIGHT_RELEVANCE) + (rec * WEIGHT_RECENCY) + (qual * WEIGHT_QUALITY)
+            for rel, rec, qual in zip(relevance, recency, quality)
+        ]
+        return relevance, recency, quality, scores
+    
+    ts = np.asarray(timestamps, dtype=np.float64)
+    age_hours = np.maximum((now - ts) / 3600, 0)
+    rec = np.where(ts <= 0, 0.3, np.power(0.5, age_hours / RECENCY_HALF_LIFE_HOURS))
+    scores = (
+        (np.asarray(relevance) * WEIGHT_RELEVANCE)
+        + (rec * WEIGHT_RECENCY)
+        + (np.asarray(quality) * WEIGHT_QUALITY)
+    )
+    return relevance, rec.tolist(), quality, scores.tolist()
+
+
+def top_indices(scores: Sequence[float], k: int) -> List[int]:
+    """Indices of the k highest scores, ties in input order (same as a stable sort)."""
+    n = len(scores)
+    if k >= n:
+        return sorted(range(n), key=lambda i: -scores[i])
+    if np is not None:
+        neg = -np.asarray(scores, dtype=np.float64)
+        kth = np.partition(neg, k - 1)[k - 1]
+        candidates = np.flatnonzero(neg <= kth)
+        return candidates[np.argsort(neg[candidates], kind="stable")][:k].tolist()
+    return heapq.nsmallest(k, range(n), key=lambda i: (-scores[i], i))
+
+
 def rank_articles(
     articles: List[Article],
     query: str = "",
@@ -170,38 +465,36 @@ def rank_articles(
         return []
     
     # Filter non-English articles
-    articles = [a for a in articles if is_english(str(a.get("title", "")))]
+    articles = filter_english(articles)
+    if not articles:
+        return []
     
-    # Score each article
-    scored = []
-    for article in articles:
-        title = str(article.get("title", ""))
-        desc = str(article.get("description", "") or "")
-        pub = article.get("published_at")
-        
-        rel = calculate_relevance(query, title, desc)
-        rec = calculate_recency(pub)
-        qual = calculate_title_quality(title)
-        
-        score = (rel * WEIGHT_RELEVANCE) + (rec * WEIGHT_RECENCY) + (qual * WEIGHT_QUALITY)
-        
-        scored.append({
-            **article,
-            "_score": round(score, 4),
-            "_relevance": round(rel, 4),
-            "_recency": round(rec, 4),
-            "_quality": round(qual, 4),
-        })
-    
-    # Sort by score descending
-    scored.sort(key=lambda a: a["_score"], reverse=True)
-    
-    # Deduplicate (after sorting so we keep highest-scored version)
-    if dedupe:
-        scored = deduplicate(scored)
+    relevance, recency, quality, scores = score_articles(articles, query)
+    rounded = [round(score, 4) for score in scores]
+    
+    # Highest scores first; with a limit only the top k are ordered, widening
+    # k if deduplication (which keeps the highest-scored copy) drops some
+    n = len(articles)
+    k = min(limit, n) if limit else n
+    while True:
+        order = top_indices(rounded, k)
+        if dedupe:
+            order = _dedupe_order(order, articles)
+        if not limit or len(order) >= limit or k >= n:
+            break
+        k = min(n, k * 2)
     
     # Limit
     if limit:
-        scored = scored[:limit]
+        order = order[:limit]
     
-    return scored
+    return [
+        {
+            **articles[i],
+            "_score": rounded[i],
+            "_relevance": round(relevance[i], 4),
+            "_recency": round(recency[i], 4),
+            "_quality": round(quality[i], 4),
+        }
+        for i in order
+    ]
@@ -0,0 +1,259 @@
+"""
+Cross-platform market pairing service.
+
+Maintains a precomputed Kalshi <-> Polymarket pair table so `/compare` and
+`/related` are dictionary lookups instead of live searches.
+
+Pipeline (runs in the background as markets arrive via StateManager):
+- Block:  candidates on the opposing platform sharing title tokens and sector
+- Score:  SequenceMatcher + token Jaccard, blended with embedding cosine
+          similarity when an EmbeddingService is available
+- Store:  bidirectional market_id -> {other_id: score} table
+"""
+
+import asyncio
+import difflib
+import re
+from collections import Counter
+from typing import Dict, List, Optional, Set, Tuple, TYPE_CHECKING
+
+from app.schemas import Market
+
+if TYPE_CHECKING:
+    from app.ai.embedding_service import EmbeddingService
+    from app.state import StateManager
+
+DEBUG_PAIRING = False
+
+STOP_WORDS = {
+    "will", "the", "a", "an", "in", "on", "at", "by", "to", "of", "for", "is",
+    "be", "and", "or", "vs", "with", "before", "after", "than", "more", "less",
+    "what", "who", "which", "win", "does", "do", "this", "that", "next",
+}
+
+# Tokens shared by more than this many markets are too common to block on
+MAX_POSTING_SIZE = 2000
+
+# Scoring weights
+WEIGHT_RATIO = 0.6
+WEIGHT_JACCARD = 0.4
+WEIGHT_EMBEDDING = 0.5  # Share of the final score given to embeddings
+
+
+def title_tokens(title: str) -> Set[str]:
+    """Informative lowercase tokens used for blocking and Jaccard scoring."""
+    words = re.findall(r"[a-z0-9]+", title.lower())
+    return {w for w in words if w not in STOP_WORDS and (len(w) > 2 or w.isdigit())}
+
+
+def sectors_compatible(a: Market, b: Market) -> bool:
+    """Unknown/Other sectors are compatible with anything."""
+    if not a.sector or not b.sector or a.sector == "Other" or b.sector == "Other":
+        return True
+    return a.sector == b.sector
+
+
+def text_score(a: Market, b: Market) -> float:
+    """Blend of character-level SequenceMatcher ratio and token Jaccard."""
+    ratio = difflib.SequenceMatcher(None, a.title.lower(), b.title.lower()).ratio()
+    ta, tb = title_tokens(a.title), title_tokens(b.title)
+    union = ta | tb
+    jaccard = len(ta & tb) / len(union) if union else 0.0
+    return ratio * WEIGHT_RATIO + jaccard * WEIGHT_JACCARD
+
+
+class MarketPairingService:
+    """
+    Background job maintaining cross-platform market pairs.
+
+    Token postings are updated synchronously when a market is added (cheap),
+    while scoring is deferred to a worker task that drains dirty market ids.
+    """
+
+    def __init__(
+        self,
+        state: "StateManager",
+        embedding_service: Optional["EmbeddingService"] = None,
+        min_score: float = 0.45,
+        max_candidates: int = 25,
+        max_pairs: int = 5,
+    ):
+        self.state = state
+        self.embedding = embedding_service
+        self.min_score = min_score
+        self.max_candidates = max_candidates
+        self.max_pairs = max_pairs
+
+        # source -> token -> market ids
+        self._postings: Dict[str, Dict[str, Set[str]]] = {"polymarket": {}, "kalshi": {}}
+        # market_id -> tokens currently indexed (for re-indexing on update)
+        self._indexed_tokens: Dict[str, Set[str]] = {}
+        # market_id -> {other_market_id: score}
+        self._pairs: Dict[str, Dict[str, float]] = {}
+        # market ids whose pairs were scored with embeddings
+        self._embedding_scored: Set[str] = set()
+
+        self._dirty: Set[str] = set()
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    # ---------- lifecycle ----------
+
+    def start(self):
+        """Index markets already in state and start the background worker."""
+        self.state.add_market_listener(self.on_market)
+        for market in self.state.get_all_markets():
+            self.on_market(market)
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def on_market(self, market: Market):
+        """StateManager listener: index the market and queue it for scoring."""
+        self._index(market)
+        self._dirty.add(market.market_id)
+        self._wakeup.set()
+
+    async def _run(self):
+        while True:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+            while self._dirty:
+                batch = list(self._dirty)[:50]
+                self._dirty.difference_update(batch)
+                try:
+                    await self._score_batch(batch)
+                except Exception as e:
+                    print(f"[Pairing] Scoring error: {e}")
+                await asyncio.sleep(0)  # Yield between batches
+
+    # ---------- blocking ----------
+
+    def _index(self, market: Market):
+        tokens = title_tokens(market.title)
+        postings = self._postings.get(market.source)
+        if postings is None:
+            return
+        old = self._indexed_tokens.get(market.market_id, set())
+        for token in old - tokens:
+            ids = postings.get(token)
+            if ids:
+                ids.discard(market.market_id)
+        for token in tokens - old:
+            postings.setdefault(token, set()).add(market.market_id)
+        self._indexed_tokens[market.market_id] = tokens
+
+    def candidates(self, market: Market) -> List[Market]:
+        """Opposing-platform markets sharing tokens and a compatible sector."""
+        other_source = "kalshi" if market.source == "polymarket" else "polymarket"
+        postings = self._postings[other_source]
+        overlap: Counter = Counter()
+        for token in title_tokens(market.title):
+            ids = postings.get(token)
+            if ids and len(ids) <= MAX_POSTING_SIZE:
+                overlap.update(ids)
+
+        result = []
+        for market_id, _ in overlap.most_common():
+            other = self.state.get_market(market_id)
+            if other and sectors_compatible(market, other):
+                result.append(other)
+                if len(result) >= self.max_candidates:
+                    break
+        return result
+
+    # ---------- scoring ----------
+
+    async def _score_batch(self, market_ids: List[str]):
+        jobs: List[Tuple[Market, List[Market]]] = []
+        for market_id in market_ids:
+            market = self.state.get_market(market_id)
+            if market:
+                jobs.append((market, self.candidates(market)))
+
+        embeddings: Dict[str, List[float]] = {}
+        if self.embedding:
+            titles = sorted({m.title for market, cands in jobs for m in [market, *cands]})
+            if titles:
+                vectors = await self.embedding.embed_batch(titles)
+                embeddings = {t: v for t, v in zip(titles, vectors) if v}
+
+        for market, cands in jobs:
+            scored = []
+            used_embedding = False
+            for other in cands:
+                score = text_score(market, other)
+                a, b = embeddings.get(market.title), embeddings.get(other.title)
+                if a and b:
+                    cosine = self.embedding.cosine_similarity(a, b)
+                    score = score * (1 - WEIGHT_EMBEDDING) + cosine * WEIGHT_EMBEDDING
+                    used_embedding = True
+                scored.append((other.market_id, score))
+            self._store(market.market_id, scored, used_embedding)
+
+        if DEBUG_PAIRING:
+            print(f"[Pairing] Scored {len(jobs)} markets, table size {len(self._pairs)}")
+
+    def _store(self, market_id: str, scored: List[Tuple[str, float]], used_embedding: bool):
+        # Drop stale reverse links before writing the new forward links
+        for other_id in self._pairs.get(market_id, {}):
+            self._pairs.get(other_id, {}).pop(market_id, None)
+
+        forward = {oid: s for oid, s in scored if s >= self.min_score}
+        self._pairs[market_id] = forward
+        if used_embedding:
+            self._embedding_scored.add(market_id)
+        else:
+            self._embedding_scored.discard(market_id)
+
+        for other_id, score in forward.items():
+            self._pairs.setdefault(other_id, {})[market_id] = score
+            if used_embedding:
+                self._embedding_scored.add(other_id)
+
+    # ---------- lookups ----------
+
+    def get_pairs(self, market_id: str, limit: Optional[int] = None) -> List[Tuple[Market, float]]:
+        """Paired markets on the opposing platform, best first."""
+        entries = sorted(self._pairs.get(market_id, {}).items(), key=lambda x: x[1], reverse=True)
+        result = []
+        for other_id, score in entries[: limit or self.max_pairs]:
+            other = self.state.get_market(other_id)
+            if other:
+                result.append((other, score))
+        return result
+
+    def get_best(self, market_id: str) -> Optional[Tuple[Market, float]]:
+        pairs = self.get_pairs(market_id, limit=1)
+        return pairs[0] if pairs else None
+
+    def is_paired(self, market_id: str) -> bool:
+        return market_id in self._pairs
+
+    def method(self, market_id: str) -> str:
+        return "embedding" if market_id in self._embedding_scored else "text"
+
+    async def refresh(self, market_id: str) -> List[Tuple[Market, float]]:
+        """Force an immediate re-score of one market and return its pairs."""
+        market = self.state.get_market(market_id)
+        if not market:
+            return []
+        self._index(market)
+        self._dirty.discard(market_id)
+        await self._score_batch([market_id])
+        return self.get_pairs(market_id)
+
+    def get_stats(self) -> Dict:
+        return {
+            "indexed_markets": len(self._indexed_tokens),
+            "paired_markets": sum(1 for p in self._pairs.values() if p),
+            "pending": len(self._dirty),
+        }
@@ -0,0 +1,145 @@
+"""
+Cached Polymarket price history for charts.
+
+/markets/{id}/history/all needs one CLOB /prices-history series per outcome.
+This service:
+
+- Fetches the outcomes of a market concurrently (bounded)
+- Caches each series per (token_id, CLOB interval); chart ranges that map to
+  the same interval (1D and 5D) share an entry
+- Refreshes a cached series incrementally: only points after the cached tail
+  are requested (startTs) and appended, and points that fell out of the
+  interval's window are dropped
+- Joins concurrent requests for the same series (single-flight)
+"""
+
+import asyncio
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional, Tuple
+
+from app.connectors.polymarket import PRICE_HISTORY_INTERVALS
+
+if TYPE_CHECKING:
+    from app.connectors.polymarket import PolymarketConnector
+
+DEBUG_PRICE_HISTORY = False
+
+# CLOB interval -> seconds of history it covers (None: everything)
+INTERVAL_WINDOWS: Dict[str, Optional[int]] = {
+    "1h": 3600,
+    "6h": 6 * 3600,
+    "1d": 24 * 3600,
+    "1w": 7 * 24 * 3600,
+    "1m": 30 * 24 * 3600,
+    "max": None,
+}
+
+SeriesKey = Tuple[str, str]
+
+
+@dataclass
+class _Series:
+    points: List[Dict]  # {t, p}, ascending by t
+    refreshed_at: float
+
+
+class PriceHistoryService:
+    def __init__(
+        self,
+        poly: "PolymarketConnector",
+        max_concurrency: int = 6,
+        min_refresh_seconds: float = 60.0,
+        max_series: int = 2000,
+    ):
+        """
+        Args:
+            poly: Connector used for CLOB requests
+            max_concurrency: CLOB history requests in flight
+            min_refresh_seconds: A series refreshed more recently is served as is
+            max_series: Cached series kept (least recently used are evicted)
+        """
+        self.poly = poly
+        self.min_refresh = min_refresh_seconds
+        self.max_series = max_series
+        self._sem = asyncio.Semaphore(max(1, max_concurrency))
+        self._series: "OrderedDict[SeriesKey, _Series]" = OrderedDict()
+        self._inflight: Dict[SeriesKey, asyncio.Task] = {}
+
+        # Stats
+        self.hits = 0
+        self.full_fetches = 0
+        self.incremental_fetches = 0
+        self.points_appended = 0
+
+    async def get_history(self, token_id: str, range: str = "1D") -> List[Dict]:
+        """Price history ({t, p} points) of one outcome token for a chart range."""
+        interval = PRICE_HISTORY_INTERVALS.get(range.upper(), "1d")
+        key = (token_id, interval)
+        series = self._series.get(key)
+        if series is not None and time.monotonic() - series.refreshed_at < self.min_refresh:
+            self.hits += 1
+            self._series.move_to_end(key)
+            return list(series.points)
+
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(self._refresh(key, range, series))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        # Shield so one cancelled caller doesn't cancel the shared fetch
+        return list(await asyncio.shield(task))
+
+    async def get_many(self, token_ids: Iterable[str], range: str = "1D") -> Dict[str, List[Dict]]:
+        """Histories of several tokens, fetched concurrently (non-empty only)."""
+        token_ids = list(dict.fromkeys(token_ids))
+        results = await asyncio.gather(
+            *[self.get_history(token_id, range) for token_id in token_ids],
+            return_exceptions=True,
+        )
+        histories = {}
+        for token_id, result in zip(token_ids, results):
+            if isinstance(result, Exception):
+                print(f"[PriceHistory] Error fetching history for {token_id}: {result}")
+            elif result:
+                histories[token_id] = result
+        return histories
+
+    async def _refresh(self, key: SeriesKey, range: str, series: Optional[_Series]) -> List[Dict]:
+        token_id, interval = key
+        async with self._sem:
+            if series is not None and series.points:
+                tail = series.points[-1]["t"]
+                fresh = await self.poly.fetch_price_history(token_id, range, start_ts=tail + 1)
+                self.incremental_fetches += 1
+                new_points = [p for p in fresh if p.get("t", 0) > tail]
+                points = series.points + sorted(new_points, key=lambda p: p["t"])
+                self.points_appended += len(new_points)
+            else:
+                fetched = await self.poly.fetch_price_history(token_id, range)
+                self.full_fetches += 1
+                points = sorted(fetched, key=lambda p: p.get("t", 0))
+
+        window = INTERVAL_WINDOWS.get(interval)
+        if window is not None:
+            cutoff = time.time() - window
+            points = [p for p in points if p.get("t", 0) >= cutoff]
+
+        if DEBUG_PRICE_HISTORY:
+            print(f"[PriceHistory] {token_id[:12]}.. {interval}: {len(points)} points")
+        if points:
+            self._series[key] = _Series(points=points, refreshed_at=time.monotonic())
+            self._series.move_to_end(key)
+            while len(self._series) > self.max_series:
+                self._series.popitem(last=False)
+        return points
+
+    def get_stats(self) -> Dict:
+        return {
+            "series": len(self._series),
+            "hits": self.hits,
+            "full_fetches": self.full_fetches,
+            "incremental_fetches": self.incremental_fetches,
+            "points_appended": self.points_appended,
+        }
@@ -0,0 +1,197 @@
+"""
+Sentiment Report Cache.
+
+Caches ResearchReport results keyed by (market_id, normalized query):
+- Fresh entries (younger than ttl) are served directly
+- Stale entries (younger than stale_ttl) are served immediately while a
+  background refresh runs (stale-while-revalidate)
+- Concurrent callers for the same key share one computation (single-flight)
+- Entries are persisted to SQLite so reports survive restarts
+"""
+
+import asyncio
+import json
+import time
+from dataclasses import asdict, dataclass
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+
+from app.services.researcher import ResearchReport
+from app.storage import connect_sqlite, data_path
+
+# Bump when ResearchReport fields or scoring change; older rows are ignored
+REPORT_CACHE_VERSION = 2
+
+DEBUG_REPORT_CACHE = False
+
+CacheKey = Tuple[str, str]
+
+
+@dataclass
+class CachedReport:
+    report: ResearchReport
+    created_at: float
+
+    @property
+    def age_seconds(self) -> float:
+        return max(time.time() - self.created_at, 0.0)
+
+
+def normalize_query(query: str) -> str:
+    """Case/whitespace-insensitive cache key for a search query."""
+    return " ".join(query.lower().split())
+
+
+class SentimentReportCache:
+    def __init__(
+        self,
+        db_path: Optional[str] = None,
+        ttl_seconds: float = 30 * 60,
+        stale_ttl_seconds: float = 6 * 3600,
+    ):
+        self.ttl = ttl_seconds
+        self.stale_ttl = stale_ttl_seconds
+        self._memory: Dict[CacheKey, CachedReport] = {}
+        self._inflight: Dict[CacheKey, asyncio.Task] = {}
+
+        self._db = connect_sqlite(db_path or data_path("sentiment_reports.db"))
+        self._db.execute(
+            """
+            CREATE TABLE IF NOT EXISTS sentiment_reports (
+                market_id TEXT NOT NULL,
+                query_key TEXT NOT NULL,
+                version INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                payload TEXT NOT NULL,
+                PRIMARY KEY (market_id, query_key)
+            )
+            """
+        )
+        self._db.commit()
+
+    # ---------- storage ----------
+
+    def get(self, market_id: str, query: str) -> Optional[CachedReport]:
+        """Cached report regardless of age (None if missing or expired past stale_ttl)."""
+        key = (market_id, normalize_query(query))
+        entry = self._memory.get(key)
+        if entry is None:
+            entry = self._load(key)
+            if entry is not None:
+                self._memory[key] = entry
+        if entry is not None and entry.age_seconds > self.stale_ttl:
+            self._memory.pop(key, None)
+            return None
+        return entry
+
+    def put(self, market_id: str, query: str, report: ResearchReport) -> CachedReport:
+        key = (market_id, normalize_query(query))
+        entry = CachedReport(report=report, created_at=time.time())
+        self._memory[key] = entry
+        try:
+            self._db.execute(
+                "INSERT OR REPLACE INTO sentiment_reports VALUES (?, ?, ?, ?, ?)",
+                (key[0], key[1], REPORT_CACHE_VERSION, entry.created_at, json.dumps(asdict(report))),
+            )
+            self._db.commit()
+        except Exception as e:
+            print(f"[ReportCache] Persist error: {e}")
+        return entry
+
+    def invalidate(self, market_id: str, query: str) -> None:
+        key = (market_id, normalize_query(query))
+        self._memory.pop(key, None)
+        self._db.execute(
+            "DELETE FROM sentiment_reports WHERE market_id = ? AND query_key = ?", key
+        )
+        self._db.commit()
+
+    def _load(self, key: CacheKey) -> Optional[CachedReport]:
+        try:
+            row = self._db.execute(
+                "SELECT created_at, payload FROM sentiment_reports "
+                "WHERE market_id = ? AND query_key = ? AND version = ?",
+                (key[0], key[1], REPORT_CACHE_VERSION),
+            ).fetchone()
+            if not row:
+                return None
+            return CachedReport(report=ResearchReport(**json.loads(row[1])), created_at=row[0])
+        except Exception as e:
+            print(f"[ReportCache] Load error: {e}")
+            return None
+
+    # ---------- single-flight computation ----------
+
+    def _compute(
+        self,
+        market_id: str,
+        query: str,
+        compute: Callable[[], Awaitable[ResearchReport]],
+    ) -> asyncio.Task:
+        """Start (or join) the computation for a key."""
+        key = (market_id, normalize_query(query))
+        task = self._inflight.get(key)
+        if task is None:
+            async def run() -> CachedReport:
+                try:
+                    return self.put(market_id, query, await compute())
+                finally:
+                    self._inflight.pop(key, None)
+
+            task = asyncio.create_task(run())
+            task.add_done_callback(self._log_failure)
+            self._inflight[key] = task
+        return task
+
+    @staticmethod
+    def _log_failure(task: asyncio.Task) -> None:
+        # Also marks the exception retrieved for background revalidations
+        if not task.cancelled() and task.exception():
+            print(f"[ReportCache] Computation failed: {task.exception()}")
+
+    def is_computing(self, market_id: str, query: str) -> bool:
+        return (market_id, normalize_query(query)) in self._inflight
+
+    def compute_shared(
+        self,
+        market_id: str,
+        query: str,
+        compute: Callable[[], Awaitable[ResearchReport]],
+    ) -> asyncio.Task:
+        """
+        The in-flight computation for a key, started with `compute` if there
+        is none. Await it shielded; the task resolves to a CachedReport.
+        """
+        return self._compute(market_id, query, compute)
+
+    async def get_or_compute(
+        self,
+        market_id: str,
+        query: str,
+        compute: Callable[[], Awaitable[ResearchReport]],
+        force: bool = False,
+    ) -> Tuple[CachedReport, bool]:
+        """
+        Returns (entry, cached). `cached` is False only when this call waited
+        on a fresh computation.
+        """
+        entry = None if force else self.get(market_id, query)
+
+        if entry is not None:
+            if entry.age_seconds > self.ttl:
+                # Stale-while-revalidate: serve now, refresh in the background
+                if DEBUG_REPORT_CACHE:
+                    print(f"[ReportCache] Stale hit {market_id} ({entry.age_seconds:.0f}s), revalidating")
+                self._compute(market_id, query, compute)
+            return entry, True
+
+        # Shield so one cancelled caller doesn't cancel the shared computation
+        task = self._compute(market_id, query, compute)
+        return await asyncio.shield(task), False
+
+    def get_stats(self) -> Dict:
+        return {
+            "memory_entries": len(self._memory),
+            "inflight": len(self._inflight),
+            "ttl_seconds": self.ttl,
+            "stale_ttl_seconds": self.stale_ttl,
+        }
@@ -9,13 +9,17 @@ Uses LLMService (OpenRouter GPT-OSS) for both:
 import asyncio
 import json
 import math
+import os
+import re
+from collections import deque
 from dataclasses import dataclass, field
 from datetime import datetime, timezone
-from typing import Dict, List, Tuple
+from typing import AsyncIterator, Dict, List, Optional, Set, Tuple
 
 from app.ai.llm_service import LLMService
 from app.news.fetcher import news_fetcher
-from app.news.rank import rank_articles
+from app.news.rank import cluster_near_duplicates, lexical_similarity, rank_articles, tokenize
+from app.services.sentiment_store import ArticleSentimentStore, get_article_store
 
 
 # === DATA STRUCTURES ===
@@ -38,6 +42,7 @@ class ResearchReport:
     top_positive_headlines: List[str] = field(default_factory=list)
     top_negative_headlines: List[str] = field(default_factory=list)
     generated_at: str = field(default_factory=lambda: datetime.utcnow().isoformat() + "Z")
+    articles_skipped: int = 0
 
 
 # === PROMPTS ===
@@ -52,6 +57,18 @@ Snippet: {snippet}
 Respond with JSON only:
 {{"score": <int -100 to 100>, "confidence": <float 0.0-1.0>, "reasoning": "<brief explanation>"}}"""
 
+BATCH_SENTIMENT_PROMPT = """You are a financial analyst. Analyze each news item about '{topic}'.
+Score sentiment from -100 (very bearish) to +100 (very bullish).
+Consider source credibility - promotional or extreme price predictions should lower confidence.
+
+{items}
+
+Respond with a JSON array only, one object per item, in the same order:
+[{{"id": <item id>, "score": <int -100 to 100>, "confidence": <float 0.0-1.0>, "reasoning": "<brief explanation>"}}]"""
+
+BATCH_ITEM = """[{id}] Headline: {title}
+Snippet: {snippet}"""
+
 SUMMARY_PROMPT = """Based on aggregated news sentiment for '{topic}':
 - Sentiment Score: {score}/100 ({signal})
 - Bullish factors: {positive}
@@ -70,8 +87,245 @@ def harvest(query: str, max_articles: int = 75) -> List[Dict]:
     return cleaned[:max_articles]
 
 
+# === RELEVANCE GATE ===
+
+# Only stories scoring at least this (max of rank_articles' `_relevance` and
+# lexical similarity to the market title) are sent to the LLM, and at most
+# MAX_LLM_STORIES of them
+MIN_STORY_RELEVANCE = float(os.getenv("SENTIMENT_MIN_RELEVANCE", "0.15"))
+MAX_LLM_STORIES = int(os.getenv("SENTIMENT_MAX_LLM_STORIES", "30"))
+
+
+def relevance_gate(
+    stories: List[Dict],
+    reference: Optional[str] = None,
+    min_relevance: float = MIN_STORY_RELEVANCE,
+    max_stories: int = MAX_LLM_STORIES,
+) -> Tuple[List[Dict], int]:
+    """
+    Keep the top stories (in ranked order) that are relevant enough to be
+    worth an LLM call.
+
+    Returns:
+        (kept stories, number of articles skipped, counting cluster copies)
+    """
+    reference_terms = tokenize(reference) if reference else set()
+    kept: List[Dict] = []
+    skipped = 0
+    for story in stories:
+        signals = []
+        if "_relevance" in story:
+            signals.append(story["_relevance"])
+        if reference_terms:
+            signals.append(lexical_similarity(reference_terms, story))
+        # Unranked articles without a reference have nothing to gate on
+        if len(kept) < max_stories and (not signals or max(signals) >= min_relevance):
+            kept.append(story)
+        else:
+            skipped += story.get("_cluster_size", 1)
+    return kept, skipped
+
+
+def select_stories(articles: List[Dict], reference: Optional[str] = None) -> Tuple[List[Dict], int]:
+    """Collapse syndicated copies, then apply the relevance gate."""
+    # Syndicated copies of a story are scored once, weighted by cluster size
+    stories = cluster_near_duplicates(articles)
+    kept, skipped = relevance_gate(stories, reference)
+    print(
+        f"[Researcher] {len(articles)} articles -> {len(stories)} distinct stories, "
+        f"{len(kept)} sent for scoring ({skipped} articles skipped)"
+    )
+    return kept, skipped
+
+
 # === ANALYST ===
 
+# Batched scoring limits. Token counts are estimated at ~4 chars/token.
+MAX_BATCH_SIZE = 10
+BATCH_INPUT_TOKEN_BUDGET = 3000
+OUTPUT_TOKENS_PER_ARTICLE = 60
+BATCH_OUTPUT_TOKEN_BUDGET = 1000
+SNIPPET_MAX_CHARS = 400
+
+
+def _article_snippet(article: Dict) -> str:
+    return article.get("description", "") or article.get("snippet", "") or ""
+
+
+def _estimate_tokens(text: str) -> int:
+    return len(text) // 4 + 1
+
+
+def plan_batches(articles: List[Dict], max_batch_size: int = MAX_BATCH_SIZE) -> List[List[int]]:
+    """
+    Group article indices into batches that fit both the prompt's input budget
+    and the expected output length (one JSON object per article).
+    """
+    max_by_output = max(BATCH_OUTPUT_TOKEN_BUDGET // OUTPUT_TOKENS_PER_ARTICLE, 1)
+    limit = max(min(max_batch_size, max_by_output), 1)
+    base = _estimate_tokens(BATCH_SENTIMENT_PROMPT)
+
+    batches: List[List[int]] = []
+    current: List[int] = []
+    used = base
+    for i, article in enumerate(articles):
+        cost = _estimate_tokens(str(article.get("title", ""))) + _estimate_tokens(_article_snippet(article)[:SNIPPET_MAX_CHARS]) + 8
+        if current and (len(current) >= limit or used + cost > BATCH_INPUT_TOKEN_BUDGET):
+            batches.append(current)
+            current, used = [], base
+        current.append(i)
+        used += cost
+    if current:
+        batches.append(current)
+    return batches
+
+
+def _parse_batch_response(llm: LLMService, content: str, ids: List[int]) -> Dict[int, SentimentResult]:
+    """
+    Parse a JSON array of per-article scores. If the array is malformed,
+    repair by salvaging every well-formed {...} object individually.
+    """
+    parsed = llm._robust_json_parse(content)
+    if isinstance(parsed, dict):
+        parsed = [parsed]
+    if not isinstance(parsed, list):
+        parsed = []
+        for match in re.finditer(r"\{[^{}]*\}", content):
+            try:
+                parsed.append(json.loads(match.group(0)))
+            except Exception:
+                continue
+
+    wanted = set(ids)
+    results: Dict[int, SentimentResult] = {}
+    for position, item in enumerate(parsed):
+        if not isinstance(item, dict):
+            continue
+        try:
+            item_id = int(item.get("id", ids[position] if position < len(ids) else -1))
+            if item_id not in wanted or "score" not in item:
+                continue
+            results[item_id] = SentimentResult(
+                score=max(-100, min(100, int(item["score"]))),
+                confidence=float(item.get("confidence", 0.5)),
+                reasoning=str(item.get("reasoning", "")),
+            )
+        except (TypeError, ValueError):
+            continue
+    return results
+
+
+async def analyze_article_batch(
+    llm: LLMService,
+    articles: List[Dict],
+    topic: str,
+    ids: List[int],
+) -> Optional[Dict[int, SentimentResult]]:
+    """
+    One LLM request scoring several articles. Returns results by article id,
+    or None if the request itself failed (nothing was received to parse).
+    """
+    items = "\n\n".join(
+        BATCH_ITEM.format(
+            id=i,
+            title=articles[i].get("title", ""),
+            snippet=_article_snippet(articles[i])[:SNIPPET_MAX_CHARS],
+        )
+        for i in ids
+    )
+    prompt = BATCH_SENTIMENT_PROMPT.format(topic=topic, items=items)
+    try:
+        # Cache only responses that score every article in the batch
+        response = await llm._call_openrouter(
+            prompt, call_site="sentiment",
+            validate=lambda r: len(_parse_batch_response(llm, r, ids)) == len(ids),
+        )
+    except Exception as e:
+        print(f"[Researcher] Batch analyze error ({len(ids)} articles): {e}")
+        return None
+    return _parse_batch_response(llm, response, ids)
+
+
+async def analyze_articles_batched(
+    llm: LLMService,
+    articles: List[Dict],
+    topic: str,
+    concurrency: int = 5,
+    max_batch_size: int = MAX_BATCH_SIZE,
+) -> List[SentimentResult]:
+    """
+    Score articles N at a time. Articles missing from a batch response are
+    retried in smaller batches, then individually as a last resort.
+
+    Articles whose request failed outright (timeout, upstream error) are not
+    retried: they are scored as "Error" so an outage costs one request per
+    batch rather than a cascade of smaller ones.
+    """
+    results: Dict[int, SentimentResult] = {}
+    errored: Set[int] = set()
+    sem = asyncio.Semaphore(concurrency)
+
+    async def run(ids: List[int]):
+        async with sem:
+            batch = await analyze_article_batch(llm, articles, topic, ids)
+        if batch is None:
+            errored.update(ids)
+        else:
+            results.update(batch)
+
+    pending = list(range(len(articles)))
+    batch_size = max_batch_size
+    requests_made = 0
+    while pending and batch_size > 1:
+        batches = [[pending[i] for i in b] for b in plan_batches([articles[i] for i in pending], batch_size)]
+        requests_made += len(batches)
+        await asyncio.gather(*[run(b) for b in batches])
+        failed = [i for i in pending if i not in results and i not in errored]
+        if failed:
+            print(f"[Researcher] {len(failed)}/{len(pending)} articles unparsed at batch size {batch_size}, retrying")
+        pending = failed
+        batch_size //= 2
+
+    if errored:
+        print(f"[Researcher] {len(errored)} articles not scored: batch request failed")
+        for i in errored:
+            results[i] = SentimentResult(score=0, confidence=0.0, reasoning="Error")
+
+    if pending:
+        requests_made += len(pending)
+        async def single(i):
+            async with sem:
+                results[i] = await analyze_article(llm, articles[i], topic)
+        await asyncio.gather(*[single(i) for i in pending])
+
+    print(f"[Researcher] Scored {len(articles)} articles in {requests_made} LLM requests")
+    return [results[i] for i in range(len(articles))]
+
+
+def _parse_article_response(response: str) -> SentimentResult:
+    content = response.strip()
+    if "```" in content:
+        start = content.find("```") + 3
+        if content[start:start+4] == "json":
+            start += 4
+        end = content.find("```", start)
+        content = content[start:end].strip()
+    data = json.loads(content)
+    return SentimentResult(
+        score=int(data.get("score", 0)),
+        confidence=float(data.get("confidence", 0.5)),
+        reasoning=str(data.get("reasoning", "")),
+    )
+
+
+def _is_article_response(response: str) -> bool:
+    try:
+        _parse_article_response(response)
+        return True
+    except Exception:
+        return False
+
+
 async def analyze_article(llm: LLMService, article: Dict, topic: str) -> SentimentResult:
     prompt = SENTIMENT_PROMPT.format(
         topic=topic,
@@ -79,31 +333,59 @@ async def analyze_article(llm: LLMService, article: Dict, topic: str) -> Sentime
         snippet=article.get("description", "") or article.get("snippet", "") or "",
     )
     try:
-        response = await llm._call_openrouter(prompt)
-        content = response.strip()
-        if "```" in content:
-            start = content.find("```") + 3
-            if content[start:start+4] == "json":
-                start += 4
-            end = content.find("```", start)
-            content = content[start:end].strip()
-        data = json.loads(content)
-        return SentimentResult(
-            score=int(data.get("score", 0)),
-            confidence=float(data.get("confidence", 0.5)),
-            reasoning=str(data.get("reasoning", "")),
-        )
+        response = await llm._call_openrouter(prompt, call_site="sentiment", validate=_is_article_response)
+        return _parse_article_response(response)
     except Exception as e:
         print(f"[Researcher] Analyze error: {e}")
         return SentimentResult(score=0, confidence=0.0, reasoning="Error")
 
 
-async def analyze_batch(llm: LLMService, articles: List[Dict], topic: str, concurrency: int = 5) -> List[SentimentResult]:
-    sem = asyncio.Semaphore(concurrency)
-    async def limited(a): 
-        async with sem: 
-            return await analyze_article(llm, a, topic)
-    return await asyncio.gather(*[limited(a) for a in articles])
+async def analyze_batch(
+    llm: LLMService,
+    articles: List[Dict],
+    topic: str,
+    concurrency: int = 5,
+    store: Optional[ArticleSentimentStore] = None,
+    batched: bool = True,
+) -> List[SentimentResult]:
+    """
+    Score articles, sending only ones not yet scored for this topic to the LLM.
+    Successful scores are memoized in the article sentiment store.
+
+    With `batched`, several articles share one prompt (see
+    analyze_articles_batched); otherwise each article gets its own request.
+    """
+    store = store or get_article_store()
+    stored = store.get_many(articles, topic)
+    results: List[Optional[SentimentResult]] = [
+        SentimentResult(score=s[0], confidence=s[1], reasoning=s[2]) if s else None
+        for s in stored
+    ]
+    pending = [i for i, r in enumerate(results) if r is None]
+    stats = store.get_stats()
+    print(
+        f"[Researcher] Sentiment memo: {len(articles) - len(pending)}/{len(articles)} hits "
+        f"(hit rate {stats['hit_rate']:.0%}, {stats['articles_reused']} articles reused)"
+    )
+
+    if batched:
+        fresh = await analyze_articles_batched(llm, [articles[i] for i in pending], topic, concurrency)
+    else:
+        sem = asyncio.Semaphore(concurrency)
+        async def limited(a): 
+            async with sem: 
+                return await analyze_article(llm, a, topic)
+        fresh = await asyncio.gather(*[limited(articles[i]) for i in pending])
+
+    # Don't memoize failures from analyze_article
+    scored = [(articles[i], r) for i, r in zip(pending, fresh) if r.reasoning != "Error"]
+    store.put_many(
+        [a for a, _ in scored], topic,
+        [(r.score, r.confidence, r.reasoning) for _, r in scored],
+    )
+    for i, r in zip(pending, fresh):
+        results[i] = r
+    return results
 
 
 # === SYNTHESIZER ===
@@ -125,13 +407,22 @@ def calculate_time_weight(published_at, half_life_hours: float = 24.0) -> float:
     return math.pow(0.5, hours_ago / half_life_hours)
 
 
+def article_weight(article: Dict, sentiment: SentimentResult) -> float:
+    # A cluster representative stands in for every copy of its story
+    return calculate_time_weight(article.get("published_at")) * sentiment.confidence * article.get("_cluster_size", 1)
+
+
+def classify_signal(score: float) -> str:
+    return "bullish" if score >= 30 else "bearish" if score <= -30 else "neutral"
+
+
 def aggregate_scores(articles: List[Dict], sentiments: List[SentimentResult]) -> Tuple[float, List[str], List[str]]:
     if not sentiments:
         return 0.0, [], []
     total_w, weighted_sum = 0.0, 0.0
     scored = []
     for a, s in zip(articles, sentiments):
-        w = calculate_time_weight(a.get("published_at")) * s.confidence
+        w = article_weight(a, s)
         weighted_sum += s.score * w
         total_w += w
         scored.append((a, s))
@@ -150,7 +441,7 @@ async def synthesize_summary(llm: LLMService, topic: str, score: float, signal:
         negative=", ".join(neg[:3]) or "None identified",
     )
     try:
-        response = await llm._call_openrouter(prompt)
+        response = await llm._call_openrouter(prompt, call_site="summary", validate=lambda r: bool(r.strip()))
         summary = response.strip()
         
         # Post-process to remove common instruction leakage
@@ -186,27 +477,206 @@ async def research_market(
     market_id: str,
     query: str,
     max_articles: int = 50,
+    reference: Optional[str] = None,
 ) -> ResearchReport:
     """
-    Full research pipeline: Harvest -> Analyze -> Synthesize.
+    Full research pipeline: Harvest -> Gate -> Analyze -> Synthesize.
     
+    `reference` (the market title) feeds the relevance gate's similarity.
     Uses only LLMService (GPT-OSS) for all LLM operations.
     """
     print(f"[Researcher] Starting: {query}")
     
-    articles = harvest(query, max_articles)
+    articles = await asyncio.to_thread(harvest, query, max_articles)
     if not articles:
         return ResearchReport(market_id=market_id, query=query, aggregate_score=0.0,
                               signal="neutral", summary="Insufficient data.", articles_analyzed=0)
     
-    sentiments = await analyze_batch(llm, articles, query)
-    agg, pos, neg = aggregate_scores(articles, sentiments)
-    signal = "bullish" if agg >= 30 else "bearish" if agg <= -30 else "neutral"
+    stories, skipped = select_stories(articles, reference)
+    if not stories:
+        return ResearchReport(market_id=market_id, query=query, aggregate_score=0.0,
+                              signal="neutral", summary="Insufficient relevant coverage.",
+                              articles_analyzed=0, articles_skipped=skipped)
+    
+    sentiments = await analyze_batch(llm, stories, query)
+    agg, pos, neg = aggregate_scores(stories, sentiments)
+    signal = classify_signal(agg)
     
     summary = await synthesize_summary(llm, query, agg, signal, pos, neg)
     
     return ResearchReport(
         market_id=market_id, query=query, aggregate_score=round(agg, 2),
-        signal=signal, summary=summary, articles_analyzed=len(articles),
-        top_positive_headlines=pos, top_negative_headlines=neg,
+        signal=signal, summary=summary, articles_analyzed=len(articles) - skipped,
+        top_positive_headlines=pos, top_negative_headlines=neg, articles_skipped=skipped,
+    )
+
+
+# === STREAMING ORCHESTRATOR ===
+
+# Stop scoring once the 95% interval of the weighted score is this narrow
+# (half-width, in score points) and at least MIN_STREAM_ARTICLES are scored
+DEFAULT_CI_HALF_WIDTH = 10.0
+MIN_STREAM_ARTICLES = 8
+CI_Z = 1.96
+
+# Smaller batches, sent a couple at a time, so a converged interval leaves
+# later batches unsent
+STREAM_BATCH_SIZE = 5
+STREAM_CONCURRENCY = 2
+
+
+class RunningSentiment:
+    """
+    Weighted mean of article scores with a normal-approximation confidence
+    interval, using Kish's effective sample size for the weights.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self._w = 0.0
+        self._w2 = 0.0
+        self._wx = 0.0
+        self._wx2 = 0.0
+
+    def add(self, article: Dict, sentiment: SentimentResult) -> None:
+        w = article_weight(article, sentiment)
+        if w <= 0:
+            return  # Failed or zero-confidence scores carry no information
+        self.count += 1
+        self._w += w
+        self._w2 += w * w
+        self._wx += w * sentiment.score
+        self._wx2 += w * sentiment.score * sentiment.score
+
+    @property
+    def score(self) -> float:
+        return self._wx / self._w if self._w else 0.0
+
+    @property
+    def half_width(self) -> float:
+        """CI half-width in score points (inf until two weighted scores exist)."""
+        if not self._w:
+            return math.inf
+        n_eff = self._w * self._w / self._w2
+        if n_eff <= 1.0 + 1e-9:
+            return math.inf
+        variance = max(self._wx2 / self._w - self.score ** 2, 0.0) * n_eff / (n_eff - 1)
+        return CI_Z * math.sqrt(variance / n_eff)
+
+    def interval(self) -> Tuple[float, float]:
+        hw = min(self.half_width, 200.0)
+        return max(self.score - hw, -100.0), min(self.score + hw, 100.0)
+
+    def snapshot(self) -> Dict:
+        low, high = self.interval()
+        return {
+            "score": round(self.score, 2),
+            "signal": classify_signal(self.score),
+            "ci_low": round(low, 2),
+            "ci_high": round(high, 2),
+            "scored": self.count,
+        }
+
+
+async def stream_research_market(
+    llm: LLMService,
+    market_id: str,
+    query: str,
+    max_articles: int = 50,
+    ci_half_width: float = DEFAULT_CI_HALF_WIDTH,
+    min_articles: int = MIN_STREAM_ARTICLES,
+    concurrency: int = STREAM_CONCURRENCY,
+    batch_size: int = STREAM_BATCH_SIZE,
+    store: Optional[ArticleSentimentStore] = None,
+    reference: Optional[str] = None,
+) -> AsyncIterator[Tuple[str, object]]:
+    """
+    Research pipeline that reports as it goes.
+
+    Yields ("progress", snapshot) after memoized scores are applied and after
+    each scored batch (most relevant stories first), then ("report", {...})
+    with the ResearchReport under "report" once scoring is done or the
+    confidence interval is narrower than ci_half_width, in which case the
+    remaining batches are never sent ("stopped_early"). Batches are sent
+    `concurrency` at a time, the next one only after one completes.
+    """
+    print(f"[Researcher] Streaming: {query}")
+    articles = await asyncio.to_thread(harvest, query, max_articles)
+    if not articles:
+        report = ResearchReport(market_id=market_id, query=query, aggregate_score=0.0,
+                                signal="neutral", summary="Insufficient data.", articles_analyzed=0)
+        yield "report", {"report": report, "scored": 0, "total": 0, "stopped_early": False}
+        return
+
+    stories, skipped = select_stories(articles, reference)
+    store = store or get_article_store()
+    running = RunningSentiment()
+    scored: Dict[int, SentimentResult] = {}
+
+    def converged() -> bool:
+        return running.count >= min_articles and running.half_width <= ci_half_width
+
+    def progress() -> Dict:
+        return {**running.snapshot(), "total": len(stories)}
+
+    for i, s in enumerate(store.get_many(stories, query)):
+        if s:
+            scored[i] = SentimentResult(score=s[0], confidence=s[1], reasoning=s[2])
+            running.add(stories[i], scored[i])
+    if scored:
+        yield "progress", progress()
+
+    pending = [i for i in range(len(stories)) if i not in scored]
+    stopped_early = False
+    if pending and not converged():
+        async def score(ids: List[int]) -> List[Tuple[int, SentimentResult]]:
+            results = await analyze_articles_batched(
+                llm, [stories[i] for i in ids], query, concurrency=1, max_batch_size=batch_size)
+            return list(zip(ids, results))
+
+        chunks = deque(
+            [pending[i] for i in b] for b in plan_batches([stories[i] for i in pending], batch_size)
+        )
+        in_flight: set = set()
+        try:
+            while chunks or in_flight:
+                while chunks and len(in_flight) < max(1, concurrency):
+                    in_flight.add(asyncio.create_task(score(chunks.popleft())))
+                done, in_flight = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    batch = task.result()
+                    fresh = [(i, r) for i, r in batch if r.reasoning != "Error"]
+                    store.put_many(
+                        [stories[i] for i, _ in fresh], query,
+                        [(r.score, r.confidence, r.reasoning) for _, r in fresh],
+                    )
+                    for i, r in batch:
+                        scored[i] = r
+                        running.add(stories[i], r)
+                yield "progress", progress()
+                if converged() and (chunks or in_flight):
+                    stopped_early = True
+                    break
+        finally:
+            for task in in_flight:
+                task.cancel()
+        if stopped_early:
+            print(f"[Researcher] Converged after {len(scored)}/{len(stories)} stories "
+                  f"(±{running.half_width:.1f}), skipping the rest")
+
+    order = sorted(scored)
+    agg, pos, neg = aggregate_scores([stories[i] for i in order], [scored[i] for i in order])
+    signal = classify_signal(agg)
+    if stories:
+        summary = await synthesize_summary(llm, query, agg, signal, pos, neg)
+    else:
+        summary = "Insufficient relevant coverage."
+
+    report = ResearchReport(
+        market_id=market_id, query=query, aggregate_score=round(agg, 2),
+        signal=signal, summary=summary,
+        # Only stories that were scored, counting their syndicated copies
+        articles_analyzed=sum(stories[i].get("_cluster_size", 1) for i in scored),
+        top_positive_headlines=pos, top_negative_headlines=neg, articles_skipped=skipped,
     )
+    yield "report", {"report": report, "scored": running.count, "total": len(stories), "stopped_early": stopped_early}
@@ -0,0 +1,177 @@
+"""
+Background sentiment refresh for heavily subscribed markets.
+
+Periodically looks at SubscriptionManager.subscriptions, picks the most
+watched markets and recomputes their sentiment reports (keyed by market
+title, like /markets/{id}/sentiment without ?q=) before they go stale, so
+the endpoint answers from cache for popular markets.
+
+- Only the top_n markets with at least min_subscribers are refreshed
+- A report is recomputed once older than refresh_after_seconds (by default
+  a bit under the cache ttl, so it never serves stale)
+- At most max_per_hour reports are computed in the background; research
+  runs as batch-priority LLM work, behind interactive calls
+- Computations go through SentimentReportCache, so a user request for the
+  same market joins the refresh instead of starting its own
+"""
+
+import asyncio
+import os
+import time
+from collections import deque
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional, Sized
+
+from app.ai.llm_scheduler import llm_client
+from app.services.researcher import ResearchReport, research_market
+
+if TYPE_CHECKING:
+    from app.ai.llm_service import LLMService
+    from app.services.report_cache import SentimentReportCache
+    from app.state import StateManager
+
+DEBUG_SENTIMENT_REFRESH = False
+
+
+class SentimentRefresher:
+    def __init__(
+        self,
+        state: "StateManager",
+        llm: "LLMService",
+        report_cache: "SentimentReportCache",
+        subscriptions: Callable[[], Dict[str, Sized]],
+        top_n: Optional[int] = None,
+        max_per_hour: Optional[int] = None,
+        interval_seconds: Optional[float] = None,
+        refresh_after_seconds: Optional[float] = None,
+        min_subscribers: int = 1,
+    ):
+        """
+        Args:
+            state: For resolving market titles
+            llm: LLM service used for research
+            report_cache: Where refreshed reports are stored
+            subscriptions: Returns market_id -> subscribers (e.g. the
+                           SubscriptionManager's subscriptions dict)
+            top_n: Most-watched markets kept warm
+            max_per_hour: Background report computations per hour
+            interval_seconds: Time between passes
+            refresh_after_seconds: Report age that triggers a recompute
+            min_subscribers: Markets with fewer subscribers are ignored
+        """
+        self.state = state
+        self.llm = llm
+        self.cache = report_cache
+        self.subscriptions = subscriptions
+        self.top_n = top_n if top_n is not None else int(os.getenv("SENTIMENT_REFRESH_TOP_N", "5"))
+        self.max_per_hour = (
+            max_per_hour if max_per_hour is not None else int(os.getenv("SENTIMENT_REFRESH_PER_HOUR", "12"))
+        )
+        self.interval = (
+            interval_seconds if interval_seconds is not None
+            else float(os.getenv("SENTIMENT_REFRESH_INTERVAL", "60"))
+        )
+        self.refresh_after = refresh_after_seconds if refresh_after_seconds is not None else report_cache.ttl * 0.8
+        self.min_subscribers = min_subscribers
+
+        self._budget: deque = deque()
+        self._task: Optional[asyncio.Task] = None
+
+        # Stats
+        self.refreshed = 0
+        self.failed = 0
+        self.skipped_fresh = 0
+        self.skipped_budget = 0
+
+    # ---------- lifecycle ----------
+
+    def start(self):
+        if self.top_n <= 0 or self.max_per_hour <= 0:
+            print("[SentimentRefresh] Disabled")
+            return
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        while True:
+            try:
+                await self.refresh_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"[SentimentRefresh] Pass failed: {e}")
+            await asyncio.sleep(self.interval)
+
+    # ---------- refresh ----------
+
+    def _take_budget(self) -> bool:
+        now = time.monotonic()
+        while self._budget and now - self._budget[0] > 3600:
+            self._budget.popleft()
+        if len(self._budget) >= self.max_per_hour:
+            return False
+        self._budget.append(now)
+        return True
+
+    def hot_markets(self) -> List[str]:
+        """Most-subscribed market ids, most watched first."""
+        counts = [(len(subs), market_id) for market_id, subs in list(self.subscriptions().items())]
+        ranked = sorted((c for c in counts if c[0] >= self.min_subscribers), key=lambda c: (-c[0], c[1]))
+        return [market_id for _, market_id in ranked[: self.top_n]]
+
+    async def refresh_once(self) -> int:
+        """One pass over the hot markets. Returns the number of reports recomputed."""
+        refreshed = 0
+        for market_id in self.hot_markets():
+            market = self.state.get_market(market_id)
+            if not market:
+                continue
+            query = market.title
+            entry = self.cache.get(market_id, query)
+            if (entry is not None and entry.age_seconds < self.refresh_after) or self.cache.is_computing(market_id, query):
+                self.skipped_fresh += 1
+                continue
+            if not self._take_budget():
+                self.skipped_budget += 1
+                break
+
+            async def compute(market_id=market_id, query=query) -> ResearchReport:
+                llm_client.set(f"sentiment:{market_id}")
+                return await research_market(
+                    llm=self.llm,
+                    market_id=market_id,
+                    query=query,
+                    max_articles=50,
+                    reference=query,
+                )
+
+            if DEBUG_SENTIMENT_REFRESH:
+                print(f"[SentimentRefresh] Refreshing {market_id} ({query[:40]})")
+            try:
+                # One at a time: background work shouldn't crowd out users
+                await self.cache.get_or_compute(market_id, query, compute, force=True)
+                self.refreshed += 1
+                refreshed += 1
+            except Exception as e:
+                self.failed += 1
+                print(f"[SentimentRefresh] {market_id} failed: {e}")
+        return refreshed
+
+    def get_stats(self) -> Dict:
+        return {
+            "refreshed": self.refreshed,
+            "failed": self.failed,
+            "skipped_fresh": self.skipped_fresh,
+            "skipped_budget": self.skipped_budget,
+            "top_n": self.top_n,
+            "max_per_hour": self.max_per_hour,
+            "interval_seconds": self.interval,
+        }
@@ -0,0 +1,148 @@
+"""
+Per-article sentiment memo.
+
+Persists LLM sentiment scores keyed by (article key, topic key) so repeated
+research runs only send articles the LLM hasn't scored for that topic yet.
+
+- Article key: SHA-1 of the normalized URL, or of title + description when
+  the article has no URL
+- Topic key: sorted, de-duplicated query terms ("BTC price" == "price btc")
+"""
+
+import hashlib
+import re
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+from app.storage import connect_sqlite, data_path
+
+# (score, confidence, reasoning)
+StoredSentiment = Tuple[int, float, str]
+
+TOPIC_STOP_WORDS = {"the", "a", "an", "of", "in", "on", "for", "to", "will", "by", "and", "or"}
+
+
+def article_key(article: Dict) -> str:
+    url = str(article.get("url") or "").strip().lower().rstrip("/")
+    if url:
+        basis = url.split("#")[0]
+    else:
+        basis = f"{article.get('title') or ''}\n{article.get('description') or ''}".strip().lower()
+    return hashlib.sha1(basis.encode("utf-8")).hexdigest()
+
+
+def topic_key(topic: str) -> str:
+    terms = {t for t in re.findall(r"[a-z0-9$]+", topic.lower()) if t not in TOPIC_STOP_WORDS}
+    return " ".join(sorted(terms)) or topic.strip().lower()
+
+
+class ArticleSentimentStore:
+    def __init__(
+        self,
+        db_path: Optional[str] = None,
+        ttl_seconds: float = 7 * 24 * 3600,
+        max_memory_entries: int = 20000,
+    ):
+        self.ttl = ttl_seconds
+        self.max_memory_entries = max_memory_entries
+        # (article key, topic key) -> sentiment; LRU in front of SQLite
+        self._memory: "OrderedDict[Tuple[str, str], StoredSentiment]" = OrderedDict()
+
+        # Stats
+        self.hits = 0
+        self.misses = 0
+
+        self._db = connect_sqlite(db_path or data_path("article_sentiment.db"))
+        self._db.execute(
+            """
+            CREATE TABLE IF NOT EXISTS article_sentiment (
+                article_key TEXT NOT NULL,
+                topic_key TEXT NOT NULL,
+                score INTEGER NOT NULL,
+                confidence REAL NOT NULL,
+                reasoning TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                PRIMARY KEY (article_key, topic_key)
+            )
+            """
+        )
+        self._db.commit()
+
+    def get_many(self, articles: List[Dict], topic: str) -> List[Optional[StoredSentiment]]:
+        """Stored sentiment per article (None where unseen for this topic)."""
+        tkey = topic_key(topic)
+        keys = [article_key(a) for a in articles]
+
+        found: Dict[str, StoredSentiment] = {}
+        for k in set(keys):
+            stored = self._memory.get((k, tkey))
+            if stored is not None:
+                self._memory.move_to_end((k, tkey))
+                found[k] = stored
+
+        missing = [k for k in set(keys) if k not in found]
+        if missing:
+            cutoff = time.time() - self.ttl
+            placeholders = ",".join("?" * len(missing))
+            rows = self._db.execute(
+                f"SELECT article_key, score, confidence, reasoning FROM article_sentiment "
+                f"WHERE topic_key = ? AND created_at >= ? AND article_key IN ({placeholders})",
+                (tkey, cutoff, *missing),
+            ).fetchall()
+            for akey, score, confidence, reasoning in rows:
+                found[akey] = (score, confidence, reasoning)
+                self._remember((akey, tkey), found[akey])
+
+        results = [found.get(k) for k in keys]
+        hits = sum(1 for r in results if r is not None)
+        self.hits += hits
+        self.misses += len(results) - hits
+        return results
+
+    def put_many(self, articles: List[Dict], topic: str, sentiments: List[StoredSentiment]) -> None:
+        tkey = topic_key(topic)
+        now = time.time()
+        rows = []
+        for article, (score, confidence, reasoning) in zip(articles, sentiments):
+            akey = article_key(article)
+            self._remember((akey, tkey), (score, confidence, reasoning))
+            rows.append((akey, tkey, score, confidence, reasoning, now))
+        if not rows:
+            return
+        try:
+            self._db.executemany(
+                "INSERT OR REPLACE INTO article_sentiment VALUES (?, ?, ?, ?, ?, ?)", rows
+            )
+            self._db.commit()
+        except Exception as e:
+            print(f"[SentimentStore] Persist error: {e}")
+
+    def _remember(self, key: Tuple[str, str], sentiment: StoredSentiment) -> None:
+        self._memory[key] = sentiment
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+
+    def get_stats(self) -> Dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            # Articles not re-scored; with batched scoring several share
+            # one LLM request, so this is not a count of requests saved
+            "articles_reused": self.hits,
+            "memory_entries": len(self._memory),
+        }
+
+
+_store: Optional[ArticleSentimentStore] = None
+
+
+def get_article_store() -> ArticleSentimentStore:
+    """Lazy initialization of the shared ArticleSentimentStore."""
+    global _store
+    if _store is None:
+        _store = ArticleSentimentStore()
+    return _store
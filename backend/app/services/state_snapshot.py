@@ -0,0 +1,253 @@
+"""
+Warm-start snapshots of StateManager.
+
+Markets, the latest orderbooks and the tail of each quote history are
+periodically written to a local file, and read back in the background at
+startup, so markets known before a deploy can be opened and subscribed to
+without searching for them again.
+
+File format: MAGIC, a version byte, then zlib-compressed pickle of plain
+tuples/dicts (no model classes, so schema changes only need a version bump).
+The file is only ever read from our own data directory.
+
+Restoring never overwrites live data: markets and orderbooks already in
+state are kept, and restored quotes are only added before the first live
+point.
+"""
+
+import asyncio
+import os
+import pickle
+import time
+import zlib
+from collections import deque
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+from app.schemas import Market, OrderBook, OrderBookLevel, QuotePoint
+from app.state import MAX_HISTORY_POINTS, StateManager
+from app.storage import data_path
+
+# Bump when the payload layout changes; other versions are ignored
+SNAPSHOT_VERSION = 1
+SNAPSHOT_MAGIC = b"OBSNAP"
+
+DEBUG_SNAPSHOT = False
+
+
+def build_snapshot(
+    state: StateManager,
+    quote_tail: int = 300,
+    dump_cache: Optional[Dict[str, Tuple[Market, dict]]] = None,
+) -> dict:
+    """
+    Plain-data payload of the current state. Run on the event loop thread
+    (it iterates live dicts); pickling and writing can happen elsewhere.
+
+    dump_cache (market_id -> (market, dumped dict)) skips re-serializing
+    markets that haven't been replaced since the last snapshot.
+    """
+    markets = []
+    for market_id, market in list(state.markets.items()):
+        cached = dump_cache.get(market_id) if dump_cache is not None else None
+        if cached is None or cached[0] is not market:
+            cached = (market, market.model_dump())
+            if dump_cache is not None:
+                dump_cache[market_id] = cached
+        markets.append(cached[1])
+    if dump_cache is not None and len(dump_cache) > len(state.markets):
+        for market_id in [k for k in dump_cache if k not in state.markets]:
+            del dump_cache[market_id]
+
+    orderbooks = [
+        (ob.market_id, ob.outcome_id, ob.ts,
+         [(l.p, l.s) for l in ob.bids], [(l.p, l.s) for l in ob.asks])
+        for ob in list(state.latest_orderbooks.values())
+    ]
+
+    quotes = {}
+    for key, history in list(state.quote_history.items()):
+        n = len(history)
+        tail = [history[i] for i in range(max(n - quote_tail, 0), n)]
+        if tail:
+            quotes[key] = [(p.ts, p.mid, p.bid, p.ask, p.volume) for p in tail]
+
+    return {"created_at": time.time(), "markets": markets, "orderbooks": orderbooks, "quotes": quotes}
+
+
+def encode_snapshot(payload: dict) -> bytes:
+    body = zlib.compress(pickle.dumps(payload, protocol=pickle.HIGHEST_PROTOCOL), 1)
+    return SNAPSHOT_MAGIC + bytes([SNAPSHOT_VERSION]) + body
+
+
+def decode_snapshot(data: bytes) -> Optional[dict]:
+    """Payload of a snapshot file, None for other formats/versions."""
+    header = len(SNAPSHOT_MAGIC) + 1
+    if len(data) < header or not data.startswith(SNAPSHOT_MAGIC) or data[header - 1] != SNAPSHOT_VERSION:
+        return None
+    return pickle.loads(zlib.decompress(data[header:]))
+
+
+async def restore_snapshot(state: StateManager, payload: dict, chunk_size: int = 500) -> Dict[str, int]:
+    """Merge a snapshot into state without overwriting live data."""
+    restored = {"markets": 0, "orderbooks": 0, "quotes": 0}
+
+    for i, data in enumerate(payload.get("markets", [])):
+        if data["market_id"] not in state.markets:
+            try:
+                # update_market notifies listeners (title index, pairing)
+                state.update_market(Market(**data))
+                restored["markets"] += 1
+            except Exception as e:
+                print(f"[Snapshot] Skipping market {data.get('market_id')}: {e}")
+        if i % chunk_size == chunk_size - 1:
+            await asyncio.sleep(0)  # Don't hold the loop for large snapshots
+
+    for market_id, outcome_id, ts, bids, asks in payload.get("orderbooks", []):
+        key = f"{market_id}:{outcome_id}"
+        if key not in state.latest_orderbooks:
+            state.latest_orderbooks[key] = OrderBook(
+                market_id=market_id, outcome_id=outcome_id, ts=ts,
+                bids=[OrderBookLevel(p=p, s=s) for p, s in bids],
+                asks=[OrderBookLevel(p=p, s=s) for p, s in asks],
+            )
+            restored["orderbooks"] += 1
+
+    for key, points in payload.get("quotes", {}).items():
+        live = state.quote_history.get(key)
+        first_live = live[0].ts if live else float("inf")
+        older = [
+            QuotePoint(ts=ts, mid=mid, bid=bid, ask=ask, volume=volume)
+            for ts, mid, bid, ask, volume in points if ts < first_live
+        ]
+        if older:
+            state.quote_history[key] = deque(older + list(live or ()), maxlen=MAX_HISTORY_POINTS)
+            restored["quotes"] += 1
+
+    return restored
+
+
+class StateSnapshotter:
+    def __init__(
+        self,
+        state: StateManager,
+        path: Optional[Path] = None,
+        interval_seconds: Optional[float] = None,
+        quote_tail: int = 300,
+        max_age_seconds: float = 24 * 3600,
+    ):
+        """
+        Args:
+            state: StateManager to snapshot
+            path: Snapshot file (defaults to data/state_snapshot.bin)
+            interval_seconds: Time between writes (STATE_SNAPSHOT_INTERVAL, <= 0 disables)
+            quote_tail: Most recent quote points kept per outcome
+            max_age_seconds: Older snapshots are not restored
+        """
+        self.state = state
+        self.path = Path(path) if path else data_path("state_snapshot.bin")
+        self.interval = (
+            interval_seconds if interval_seconds is not None
+            else float(os.getenv("STATE_SNAPSHOT_INTERVAL", "60"))
+        )
+        self.quote_tail = quote_tail
+        self.max_age = max_age_seconds
+        self._dump_cache: Dict[str, Tuple[Market, dict]] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._load_task: Optional[asyncio.Task] = None
+
+        # Stats
+        self.writes = 0
+        self.last_write_bytes = 0
+        self.last_write_ms = 0.0
+        self.restored: Dict[str, int] = {}
+
+    # ---------- lifecycle ----------
+
+    def start(self):
+        """Restore the last snapshot in the background and start periodic writes."""
+        if self.interval <= 0:
+            print("[Snapshot] Disabled")
+            return
+        self._load_task = asyncio.create_task(self.load())
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop writing and save a final snapshot."""
+        for task in (self._task, self._load_task):
+            if task and not task.done():
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+        if self._task:
+            self._task = None
+            await self.save()
+
+    async def _run(self):
+        # Don't overwrite the previous snapshot before it has been restored
+        if self._load_task:
+            await asyncio.wait([self._load_task])
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.save()
+            except Exception as e:
+                print(f"[Snapshot] Write failed: {e}")
+
+    # ---------- io ----------
+
+    async def save(self) -> None:
+        start = time.perf_counter()
+        payload = build_snapshot(self.state, self.quote_tail, self._dump_cache)
+        if not payload["markets"]:
+            return  # Nothing worth replacing the last snapshot with
+        size = await asyncio.to_thread(self._write, payload)
+        self.writes += 1
+        self.last_write_bytes = size
+        self.last_write_ms = (time.perf_counter() - start) * 1000
+        if DEBUG_SNAPSHOT:
+            print(f"[Snapshot] Wrote {len(payload['markets'])} markets, {size / 1024:.0f} KB in {self.last_write_ms:.0f}ms")
+
+    def _write(self, payload: dict) -> int:
+        data = encode_snapshot(payload)
+        tmp = self.path.with_suffix(".tmp")
+        tmp.write_bytes(data)
+        os.replace(tmp, self.path)  # Atomic: readers never see a partial file
+        return len(data)
+
+    def _read(self) -> Optional[dict]:
+        if not self.path.exists():
+            return None
+        return decode_snapshot(self.path.read_bytes())
+
+    async def load(self) -> Dict[str, int]:
+        start = time.perf_counter()
+        try:
+            payload = await asyncio.to_thread(self._read)
+        except Exception as e:
+            print(f"[Snapshot] Unreadable snapshot ignored: {e}")
+            return {}
+        if payload is None:
+            return {}
+        age = time.time() - payload.get("created_at", 0)
+        if age > self.max_age:
+            print(f"[Snapshot] Ignoring snapshot from {age / 3600:.1f}h ago")
+            return {}
+        self.restored = await restore_snapshot(self.state, payload)
+        print(
+            f"[Snapshot] Restored {self.restored['markets']} markets, {self.restored['orderbooks']} orderbooks, "
+            f"{self.restored['quotes']} quote histories in {(time.perf_counter() - start) * 1000:.0f}ms"
+        )
+        return self.restored
+
+    def get_stats(self) -> Dict:
+        return {
+            "writes": self.writes,
+            "last_write_bytes": self.last_write_bytes,
+            "last_write_ms": round(self.last_write_ms, 1),
+            "restored": self.restored,
+            "interval_seconds": self.interval,
+        }
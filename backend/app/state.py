@@ -1,6 +1,6 @@
 import asyncio
 from collections import deque
-from typing import Dict, List, Optional
+from typing import Callable, Dict, List, Optional
 from .schemas import Market, OrderBook, QuotePoint, QuoteMessage, OrderBookMessage
 import time
 
@@ -17,8 +17,15 @@ class StateManager:
             cls._instance.quote_history: Dict[str, deque[QuotePoint]] = {}
             cls._instance.latest_orderbooks: Dict[str, OrderBook] = {}
             cls._instance.subscribers = set()
+            # Callbacks run on every market insert/update (indexes, pairing)
+            cls._instance.market_listeners: List[Callable[[Market], None]] = []
         return cls._instance
 
+    def add_market_listener(self, listener: Callable[[Market], None]):
+        """Register a callback invoked with each market passed to update_market."""
+        if listener not in self.market_listeners:
+            self.market_listeners.append(listener)
+
     def get_market(self, market_id: str) -> Optional[Market]:
         return self.markets.get(market_id)
 
@@ -27,6 +34,11 @@ class StateManager:
 
     def update_market(self, market: Market):
         self.markets[market.market_id] = market
+        for listener in self.market_listeners:
+            try:
+                listener(market)
+            except Exception as e:
+                print(f"[State] Market listener error: {e}")
 
     def update_quote(self, market_id: str, outcome_id: str, price_mid: float, price_bid: float, price_ask: float, ts: float = None):
         if ts is None:
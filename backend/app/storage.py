@@ -0,0 +1,26 @@
+"""Local on-disk storage locations (SQLite caches, snapshots)."""
+
+import os
+import sqlite3
+from pathlib import Path
+
+# Override with ODDSBASE_DATA_DIR to move caches out of the source tree
+DATA_DIR = Path(os.getenv("ODDSBASE_DATA_DIR", Path(__file__).parent.parent / "data"))
+
+
+def data_path(filename: str) -> Path:
+    """Path of a file inside the data directory (created on demand)."""
+    DATA_DIR.mkdir(parents=True, exist_ok=True)
+    return DATA_DIR / filename
+
+
+def connect_sqlite(path) -> sqlite3.Connection:
+    """
+    Open a SQLite connection shared by the event loop thread.
+    WAL keeps readers from blocking on the occasional write.
+    """
+    conn = sqlite3.connect(str(path), check_same_thread=False)
+    if str(path) != ":memory:":
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
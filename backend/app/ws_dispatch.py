@@ -0,0 +1,106 @@
+"""
+Per-connection dispatcher for long-running WebSocket ops.
+
+The /ws receive loop hands slow ops (LLM / agent calls) to the dispatcher,
+which runs each as a tracked task so the loop keeps reading messages:
+subscription ops are handled inline and never wait behind an agent step.
+
+- Per-op concurrency caps (requests over the cap get an error frame)
+- Tasks are indexed by the client's request_id so they can be cancelled
+- Every task is cancelled when the connection closes
+"""
+
+import asyncio
+from typing import Awaitable, Callable, Dict, Optional, Set
+
+from fastapi import WebSocket
+
+DEBUG_DISPATCH = False
+
+# Max in-flight tasks per op for one connection
+DEFAULT_OP_LIMITS: Dict[str, int] = {
+    "agent_init": 1,
+    "agent_message": 1,
+    "agent_start": 1,
+    "agent_observation": 1,
+    "agent_track_execution": 4,
+    "agent_suggest_params": 2,
+}
+
+
+class ConnectionDispatcher:
+    def __init__(self, websocket: WebSocket, op_limits: Optional[Dict[str, int]] = None):
+        self.websocket = websocket
+        self.op_limits = op_limits or DEFAULT_OP_LIMITS
+        self._tasks: Set[asyncio.Task] = set()
+        self._by_request: Dict[str, asyncio.Task] = {}
+        self._active: Dict[str, int] = {}
+
+    def active(self, op: Optional[str] = None) -> int:
+        if op is None:
+            return len(self._tasks)
+        return self._active.get(op, 0)
+
+    async def submit(
+        self,
+        op: str,
+        handler: Callable[[], Awaitable[None]],
+        request_id: Optional[str] = None,
+    ) -> bool:
+        """Run `handler` as a tracked task; False if the op is at its cap."""
+        limit = self.op_limits.get(op)
+        if limit is not None and self._active.get(op, 0) >= limit:
+            await self._send_error(f"Too many concurrent {op} requests", request_id)
+            return False
+
+        self._active[op] = self._active.get(op, 0) + 1
+        task = asyncio.create_task(self._run(op, handler, request_id))
+        self._tasks.add(task)
+        if request_id:
+            self._by_request[str(request_id)] = task
+
+        def done(t: asyncio.Task) -> None:
+            self._tasks.discard(t)
+            self._active[op] -= 1
+            if request_id and self._by_request.get(str(request_id)) is t:
+                del self._by_request[str(request_id)]
+
+        task.add_done_callback(done)
+        return True
+
+    async def _run(self, op: str, handler: Callable[[], Awaitable[None]], request_id: Optional[str]) -> None:
+        try:
+            await handler()
+        except asyncio.CancelledError:
+            if DEBUG_DISPATCH:
+                print(f"[Dispatch] Cancelled op={op} request_id={request_id}")
+            raise
+        except Exception as e:
+            # Handlers report their own errors; this catches the rest
+            print(f"[Dispatch] Unhandled error in {op}: {e}")
+            await self._send_error(f"{op} failed: {str(e)}", request_id)
+
+    async def _send_error(self, error: str, request_id: Optional[str]) -> None:
+        try:
+            await self.websocket.send_json({
+                "type": "error",
+                "error": error,
+                "request_id": request_id,
+            })
+        except Exception:
+            pass  # Connection already gone
+
+    def cancel(self, request_id: str) -> bool:
+        task = self._by_request.get(str(request_id))
+        if task is None or task.done():
+            return False
+        task.cancel()
+        return True
+
+    async def close(self) -> None:
+        """Cancel every in-flight task (call on disconnect)."""
+        tasks = list(self._tasks)
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Benchmark: find_related_market full scan vs MinHash/LSH candidate blocking.
+
+Run from backend/:
+    python -m tests.bench_lsh [num_markets]
+"""
+
+import difflib
+import random
+import sys
+import time
+
+from app.lsh import MarketLSHIndex
+from app.matching import find_related_market
+from app.schemas import Market
+
+SUBJECTS = [
+    "Bitcoin", "Ethereum", "Solana", "Trump", "Biden", "Newsom", "Fed", "GDP",
+    "Lakers", "Celtics", "Chiefs", "Eagles", "OpenAI", "Nvidia", "Tesla", "Apple",
+    "Inflation", "Unemployment", "Ukraine", "Taiwan", "Oscars", "Grammys", "SpaceX",
+]
+PREDICATES = [
+    "reach ${n}k", "win the {n} election", "cut rates in {month}", "win the {n} finals",
+    "announce GPT-{n}", "hit {n}% by {month}", "launch Starship {n}", "approve ETF in {month}",
+    "exceed {n} million", "sign ceasefire by {month}", "release new product in {month}",
+]
+MONTHS = ["January", "February", "March", "April", "May", "June", "July",
+          "August", "September", "October", "November", "December"]
+
+
+def make_title(rng: random.Random) -> str:
+    subject = rng.choice(SUBJECTS)
+    predicate = rng.choice(PREDICATES).format(n=rng.randint(1, 500), month=rng.choice(MONTHS))
+    year = rng.choice(["2025", "2026", "2027"])
+    return f"Will {subject} {predicate} {year}?"
+
+
+def make_markets(n: int, seed: int = 7) -> list:
+    rng = random.Random(seed)
+    markets = []
+    for i in range(n):
+        source = "polymarket" if i % 2 else "kalshi"
+        markets.append(Market(
+            market_id=f"{source}-{i}",
+            title=make_title(rng),
+            source=source,
+            source_id=f"{source}-{i}",
+        ))
+    return markets
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    markets = make_markets(n)
+    rng = random.Random(11)
+    queries = [Market(
+        market_id=f"query-{i}",
+        title=make_title(rng),
+        source="polymarket",
+        source_id=f"query-{i}",
+    ) for i in range(20)]
+
+    print(f"Markets: {n}")
+
+    start = time.perf_counter()
+    index = MarketLSHIndex()
+    for m in markets:
+        index.add(m)
+    build = time.perf_counter() - start
+    print(f"LSH build:      {build:.2f}s ({build / n * 1e6:.1f} us/market)")
+
+    start = time.perf_counter()
+    lsh_results = [find_related_market(q, markets, index=index) for q in queries]
+    lsh_time = (time.perf_counter() - start) / len(queries)
+    print(f"LSH query:      {lsh_time * 1000:.2f} ms/query")
+
+    scan_queries = queries[:3]
+    start = time.perf_counter()
+    scan_results = [find_related_market(q, markets) for q in scan_queries]
+    scan_time = (time.perf_counter() - start) / len(scan_queries)
+    print(f"Full scan:      {scan_time * 1000:.2f} ms/query")
+    print(f"Speedup:        {scan_time / lsh_time:.0f}x")
+
+    # Synthetic titles have many near-ties, so compare match quality
+    # (SequenceMatcher ratio of the chosen market) rather than identity.
+    def ratio(q, m):
+        if m is None:
+            return 0.0
+        return difflib.SequenceMatcher(None, q.title.lower(), m.title.lower()).ratio()
+
+    for q, a, b in zip(scan_queries, lsh_results, scan_results):
+        print(f"  '{q.title}': lsh={ratio(q, a):.3f} scan={ratio(q, b):.3f}")
+
+
+if __name__ == "__main__":
+    main()
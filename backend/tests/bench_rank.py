@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Benchmark: news ranking.
+
+1. Language filter (langdetect on every title vs. heuristic + memo),
+   including the SSE pattern of re-ranking a growing list
+2. Scoring throughput: per-article loop vs. batch scoring (with and
+   without NumPy), full sort and top-k
+
+Run from backend/:
+    python -m tests.bench_rank [num_articles] [num_scoring_articles]
+"""
+
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+from langdetect import DetectorFactory, detect, LangDetectException
+
+from app.news import rank
+
+SUBJECTS = ["Bitcoin", "Ethereum", "The Fed", "Trump", "Nvidia", "Tesla", "OpenAI", "Solana", "Lakers", "Oil"]
+ENGLISH = [
+    "{s} rallies as investors weigh the latest inflation data",
+    "{s} falls after regulators open an inquiry into the deal",
+    "What the {s} decision means for markets this week",
+    "{s} Surges Past Record High",
+    "{s} Price Prediction {n}",
+    "Analysts say {s} could rebound by the end of the year",
+]
+FOREIGN = [
+    "{s} sube con fuerza tras la decisión de la Reserva Federal",
+    "{s} chute après les nouvelles données sur l'inflation",
+    "{s} steigt nach der Entscheidung der Notenbank deutlich",
+    "{s} の価格が過去最高を更新",
+]
+
+
+def make_articles(n: int, seed: int = 5) -> list:
+    rng = random.Random(seed)
+    articles = []
+    for i in range(n):
+        template = rng.choice(FOREIGN) if rng.random() < 0.2 else rng.choice(ENGLISH)
+        articles.append({
+            "source": rng.choice(["exa", "cryptopanic", "gdelt2"]),
+            "title": template.format(s=rng.choice(SUBJECTS), n=rng.randint(2025, 2030)),
+            "url": f"https://news.example/{i}",
+            "published_at": "2026-01-17T16:17:47Z",
+        })
+    return articles
+
+
+def langdetect_filter(articles: list) -> list:
+    def english(text):
+        if not text or len(text.strip()) < 10:
+            return True
+        try:
+            return detect(text) == "en"
+        except LangDetectException:
+            return True
+    return [a for a in articles if english(str(a.get("title", "")))]
+
+
+def per_article_rank(articles: list, query: str, limit=None) -> list:
+    """The ranking loop before batch scoring."""
+    scored = []
+    for article in articles:
+        title = str(article.get("title", ""))
+        rel = rank.calculate_relevance(query, title)
+        rec = rank.calculate_recency(article.get("published_at"))
+        qual = rank.calculate_title_quality(title)
+        score = (rel * rank.WEIGHT_RELEVANCE) + (rec * rank.WEIGHT_RECENCY) + (qual * rank.WEIGHT_QUALITY)
+        scored.append({**article, "_score": round(score, 4), "_relevance": round(rel, 4),
+                       "_recency": round(rec, 4), "_quality": round(qual, 4)})
+    scored.sort(key=lambda a: a["_score"], reverse=True)
+    scored = rank.deduplicate(scored)
+    return scored[:limit] if limit else scored
+
+
+def bench_scoring(n: int) -> None:
+    rng = random.Random(9)
+    formats = ["%Y-%m-%dT%H:%M:%SZ", "%Y-%m-%dT%H:%M:%S.%f", "%Y-%m-%d %H:%M:%S", "%Y-%m-%dT%H:%M:%S+00:00"]
+    articles = make_articles(n)
+    for a in articles:
+        a["language"] = "en"  # Isolate scoring from language detection
+        published = datetime(2026, 1, 10) + timedelta(seconds=rng.randint(0, 7 * 86400))
+        a["published_at"] = published.strftime(rng.choice(formats))
+    query = "bitcoin inflation data"
+    print(f"\nScoring {n} articles (articles/s)")
+
+    def run(label, fn, repeat=3):
+        best = min(_timed(fn) for _ in range(repeat))
+        print(f"  {label:<28} {best * 1000:7.0f} ms  {n / best:>10,.0f}/s")
+        return best
+
+    base = run("per-article loop", lambda: per_article_rank(articles, query))
+    numpy_module = rank.np
+    if numpy_module is not None:
+        run("batch (numpy)", lambda: rank.rank_articles(articles, query))
+        run("batch (numpy) top-20", lambda: rank.rank_articles(articles, query, limit=20))
+    rank.np = None
+    try:
+        fast = run("batch (pure python)", lambda: rank.rank_articles(articles, query))
+        run("batch (pure python) top-20", lambda: rank.rank_articles(articles, query, limit=20))
+    finally:
+        rank.np = numpy_module
+    print(f"  speedup vs loop (pure python): {base / fast:.1f}x")
+
+
+def _timed(fn) -> float:
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def main():
+    DetectorFactory.seed = 0
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    scoring_n = int(sys.argv[2]) if len(sys.argv) > 2 else 10_000
+    articles = make_articles(n)
+    print(f"Articles: {n}")
+
+    start = time.perf_counter()
+    baseline = langdetect_filter(articles)
+    base_time = time.perf_counter() - start
+    print(f"langdetect every title:  {base_time * 1000:.0f} ms")
+
+    rank._language_memo.clear()
+    start = time.perf_counter()
+    filtered = rank.filter_english(articles)
+    cold = time.perf_counter() - start
+    print(f"heuristic + memo (cold): {cold * 1000:.0f} ms ({base_time / cold:.1f}x)")
+
+    start = time.perf_counter()
+    rank.filter_english(articles)
+    warm = time.perf_counter() - start
+    print(f"memo (warm):             {warm * 1000:.1f} ms ({base_time / warm:.0f}x)")
+
+    # /news/search SSE: re-rank the accumulated list after each of 4 providers
+    rank._language_memo.clear()
+    chunks = [articles[i * n // 4:(i + 1) * n // 4] for i in range(4)]
+    start = time.perf_counter()
+    accumulated = []
+    for chunk in chunks:
+        accumulated.extend(chunk)
+        rank.rank_articles(accumulated, query="bitcoin inflation")
+    print(f"SSE re-rank x4:          {(time.perf_counter() - start) * 1000:.0f} ms")
+
+    agree = len({a["url"] for a in baseline} & {a["url"] for a in filtered})
+    print(f"Kept: langdetect={len(baseline)} new={len(filtered)} overlap={agree}")
+    print(f"Decisions: {rank.get_language_stats()}")
+
+    bench_scoring(scoring_n)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+import asyncio
+import time
+
+import pytest
+
+from app.ai.agent import AgentService
+from app.ai.agent_actions import ActionContext, run_server_actions, with_server_commands
+from app.ai.local_backboard import LocalBackboardClient
+from app.schemas import Market, Outcome
+from app.state import StateManager
+
+
+class SlowSearchConnector:
+    async def search_markets(self, query):
+        await asyncio.sleep(0.1)
+        return []
+
+
+@pytest.fixture
+def ctx():
+    state = StateManager()
+    state.update_market(Market(
+        market_id="KXAGENTTEST-1",
+        title="Will agent tests pass in 2026?",
+        source="kalshi",
+        source_id="KXAGENTTEST-1",
+        outcomes=[Outcome(outcome_id="yes", name="Yes", price=0.7)],
+    ))
+    return ActionContext(state=state, poly=SlowSearchConnector(), kalshi=SlowSearchConnector())
+
+
+@pytest.mark.asyncio
+async def test_server_actions_run_in_parallel(ctx):
+    actions = [{"command": "search-markets", "params": {"query": q}} for q in ("agent tests", "nothing-xyz", "2026")]
+    start = time.perf_counter()
+    results = await run_server_actions(actions, ctx)
+    assert time.perf_counter() - start < 0.25  # 3 x 0.1s searches overlap
+
+    assert [r["status"] for r in results] == ["success"] * 3
+    assert 'ID: "KXAGENTTEST-1"' in results[0]["result"]
+    assert results[1]["result"] == "No markets found."
+
+    missing = await run_server_actions([{"command": "get-market", "params": {"marketId": "nope"}}], ctx)
+    assert missing[0]["status"] == "error"
+
+    listed = with_server_commands([{"id": "search-markets", "label": "Search"}])
+    assert [c["id"] for c in listed].count("search-markets") == 1
+    assert {"get-market", "get-history", "compare"} <= {c["id"] for c in listed}
+
+
+@pytest.mark.asyncio
+async def test_agent_turn_only_returns_ui_actions(ctx):
+    client = LocalBackboardClient([
+        {"reasoning": "search", "actions": [
+            {"command": "search-markets", "params": {"query": "agent tests"}},
+            {"command": "get-market", "params": {"marketId": "KXAGENTTEST-1"}},
+        ], "done": False},
+        {"reasoning": "open", "actions": [
+            {"command": "open-chart", "params": {"marketId": "KXAGENTTEST-1"}},
+        ], "done": False},
+    ])
+    agent = AgentService(client=client, thread_pool_size=0)
+    await agent.initialize("asst")
+
+    steps = []
+
+    async def on_step(step):
+        steps.append(step)
+
+    result = await agent.run_agent_turn("t1", "chart agent tests", [], action_context=ctx, on_step=on_step)
+
+    # Two planner calls, one client round trip
+    assert len(client.messages) == 2
+    assert "COMMAND RESULTS" in client.messages[1]["content"]
+    assert "KXAGENTTEST-1" in client.messages[1]["content"]
+    assert [len(s["server_results"]) for s in steps] == [2, 0]
+    assert steps[0]["actions"] == []
+    assert result["actions"] == [{"command": "open-chart", "params": {"marketId": "KXAGENTTEST-1"}}]
+    assert not result["done"]
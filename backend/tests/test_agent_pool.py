@@ -0,0 +1,55 @@
+import asyncio
+import time
+
+import pytest
+
+from app.ai.agent import AgentService
+from app.ai.local_backboard import LocalBackboardClient
+
+
+@pytest.mark.asyncio
+async def test_pool_serves_prewarmed_threads_and_refills():
+    client = LocalBackboardClient(latency=0.05)
+    agent = AgentService(client=client, thread_pool_size=2)
+    await agent.initialize("asst-1")
+    agent.refill_thread_pool()
+    await agent._refill_task
+    assert agent.get_pool_stats()["size"] == 2
+
+    start = time.perf_counter()
+    thread = await agent.acquire_thread()
+    assert time.perf_counter() - start < 0.02  # No create_thread on the critical path
+    assert thread.thread_id in client.threads
+
+    # Drain the pool: the next acquire misses and creates inline
+    await agent.acquire_thread()
+    await agent._refill_task
+    stats = agent.get_pool_stats()
+    assert stats["hits"] == 2 and stats["misses"] == 0 and stats["size"] == 2
+
+    agent._thread_pool.clear()
+    await agent.acquire_thread()
+    assert agent.get_pool_stats()["misses"] == 1
+
+    # Re-initializing drops threads of the old assistant
+    await agent.initialize("asst-2")
+    assert agent.get_pool_stats()["size"] == 0
+    await agent.stop_thread_pool()
+
+
+@pytest.mark.asyncio
+async def test_pool_disabled_and_refill_errors():
+    agent = AgentService(client=LocalBackboardClient(), thread_pool_size=0)
+    await agent.initialize("asst")
+    await agent.acquire_thread()
+    assert agent._refill_task is None
+
+    class FailingClient(LocalBackboardClient):
+        async def create_thread(self, assistant_id):
+            raise RuntimeError("backboard down")
+
+    failing = AgentService(client=FailingClient(), thread_pool_size=2)
+    await failing.initialize("asst")
+    failing.refill_thread_pool()
+    await failing._refill_task
+    assert failing.get_pool_stats()["errors"] == 1
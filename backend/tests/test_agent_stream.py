@@ -0,0 +1,90 @@
+import pytest
+
+from app.ai.agent import AgentService
+from app.ai.agent_actions import ActionContext
+from app.ai.local_backboard import LocalBackboardClient
+from app.state import StateManager
+
+
+class TrackingClient(LocalBackboardClient):
+    """Records whether the current reply stream has been fully consumed."""
+
+    async def _stream(self, reply):
+        self.finished = False
+        async for event in super()._stream(reply):
+            yield event
+        self.finished = True
+
+
+class CountingConnector:
+    def __init__(self):
+        self.calls = 0
+
+    async def search_markets(self, query):
+        self.calls += 1
+        return []
+
+
+@pytest.mark.asyncio
+async def test_actions_are_emitted_before_the_reply_finishes():
+    client = TrackingClient([
+        {"actions": [{"command": "open-chart", "params": {"marketId": "m1"}}],
+         "reasoning": "x" * 200, "done": False},
+    ], stream_chunk_size=4)
+    agent = AgentService(client=client, thread_pool_size=0)
+    await agent.initialize("asst")
+
+    events = []
+    async for kind, item in agent.stream_agent_step("t1", "chart m1", []):
+        events.append((kind, client.finished))
+        if kind == "step":
+            step = item
+
+    assert events == [("action", False), ("step", True)]
+    assert client.messages[0]["stream"] is True
+    assert step["actions"] == [{"command": "open-chart", "params": {"marketId": "m1"}}]
+
+
+@pytest.mark.asyncio
+async def test_turn_dispatches_actions_once_as_they_stream():
+    connector = CountingConnector()
+    ctx = ActionContext(state=StateManager(), poly=connector)
+    client = LocalBackboardClient([
+        {"reasoning": "search and open", "actions": [
+            {"command": "search-markets", "params": {"query": "btc"}},
+            {"command": "open-chart", "params": {"marketId": "m1"}},
+        ], "done": False},
+    ], stream_chunk_size=5)
+    agent = AgentService(client=client, thread_pool_size=0)
+    await agent.initialize("asst")
+
+    announced = []
+
+    async def on_action(action):
+        announced.append(action)
+
+    result = await agent.run_agent_turn("t1", "btc", [], action_context=ctx, on_action=on_action)
+
+    assert announced == [{"command": "open-chart", "params": {"marketId": "m1"}}]
+    assert connector.calls == 1  # Started early and reused, not run twice
+    assert result["server_results"][0]["result"] == "No markets found."
+    assert result["actions"] == announced
+
+
+@pytest.mark.asyncio
+async def test_summary_streams_deltas_and_falls_back():
+    client = LocalBackboardClient(["Opened the BTC chart for you."], stream_chunk_size=6)
+    agent = AgentService(client=client, thread_pool_size=0)
+    await agent.initialize("asst")
+
+    deltas = [d async for d in agent.stream_summary("t1", "btc", [])]
+    assert len(deltas) > 1
+    assert "".join(deltas) == "Opened the BTC chart for you."
+
+    class FailingClient(LocalBackboardClient):
+        async def add_message(self, *args, **kwargs):
+            raise RuntimeError("backboard down")
+
+    failing = AgentService(client=FailingClient(), thread_pool_size=0)
+    await failing.initialize("asst")
+    assert [d async for d in failing.stream_summary("t1", "btc", [])] == ["Completed your request."]
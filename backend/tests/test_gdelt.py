@@ -0,0 +1,85 @@
+import threading
+import time
+
+from app.news import gd
+
+
+class FakeResponse:
+    def __init__(self, articles):
+        self._articles = articles
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return {"articles": self._articles}
+
+
+def fake_gdelt(monkeypatch, total, delay=0.05, failing=()):
+    """Serve `total` fake results, tracking requested pages and peak concurrency."""
+    seen = {"starts": [], "active": 0, "peak": 0}
+    lock = threading.Lock()
+
+    def get(url, params=None, timeout=None):
+        with lock:
+            seen["starts"].append(params["startrecord"])
+            seen["active"] += 1
+            seen["peak"] = max(seen["peak"], seen["active"])
+        try:
+            time.sleep(delay)
+            start, size = params["startrecord"], params["maxrecords"]
+            if start in failing:
+                raise RuntimeError("timeout")
+            items = [
+                {"title": f"Article {i}", "url": f"https://x/{i}", "seendate": "20250101120000"}
+                for i in range(start, min(start + size, total))
+            ]
+            return FakeResponse(items)
+        finally:
+            with lock:
+                seen["active"] -= 1
+
+    monkeypatch.setattr(gd.requests, "get", get)
+    return seen
+
+
+def test_pages_are_fetched_concurrently_in_order(monkeypatch):
+    seen = fake_gdelt(monkeypatch, total=2000, delay=0.1)
+
+    start = time.perf_counter()
+    articles = gd.fetch_gdelt2("btc", limit=1000)
+    elapsed = time.perf_counter() - start
+
+    assert [a["url"] for a in articles] == [f"https://x/{i}" for i in range(1000)]
+    assert sorted(seen["starts"]) == [0, 250, 500, 750]
+    assert 1 < seen["peak"] <= gd.MAX_PARALLEL_PAGES
+    assert elapsed < 0.3  # Sequential paging would take ~0.4s
+    assert articles[0]["published_at"] == "2025-01-01T12:00:00"
+
+
+def test_stops_at_short_or_failed_page(monkeypatch):
+    fake_gdelt(monkeypatch, total=300)
+    articles = gd.fetch_gdelt2("btc", limit=1000)
+    assert len(articles) == 300
+
+    fake_gdelt(monkeypatch, total=2000, failing={250})
+    articles = gd.fetch_gdelt2("btc", limit=1000)
+    assert len(articles) == 250  # Later pages are dropped, as with sequential paging
+
+
+def test_typical_limits_are_split_into_concurrent_pages(monkeypatch):
+    seen = fake_gdelt(monkeypatch, total=500, delay=0.1)
+    articles = gd.fetch_gdelt2("btc", limit=100)
+    assert [a["url"] for a in articles] == [f"https://x/{i}" for i in range(100)]
+    assert sorted(seen["starts"]) == [0, 25, 50, 75]
+    assert seen["peak"] > 1
+
+    seen = fake_gdelt(monkeypatch, total=500)
+    assert len(gd.fetch_gdelt2("btc", limit=30)) == 30
+    assert sorted(seen["starts"]) == [0, 25]
+
+
+def test_small_limit_is_one_request(monkeypatch):
+    seen = fake_gdelt(monkeypatch, total=100)
+    assert len(gd.fetch_gdelt2("btc", limit=20)) == 20
+    assert seen["starts"] == [0]
@@ -0,0 +1,89 @@
+import json
+import time
+
+import httpx
+import pytest
+
+from app.connectors.kalshi import KalshiConnector, merge_history
+from app.schemas import Market, Outcome, QuotePoint
+from app.state import StateManager
+
+
+def make_market(ticker="KXBTC-25DEC31-T100"):
+    return Market(
+        market_id=ticker, title="BTC above 100k", category="KXBTC", ticker=ticker,
+        source="kalshi", source_id=ticker,
+        outcomes=[Outcome(outcome_id=f"{ticker}_yes", name="Yes", price=0.5),
+                  Outcome(outcome_id=f"{ticker}_no", name="No", price=0.5)],
+    )
+
+
+def candles_endpoint(calls):
+    """Hourly candles over the requested range, yes bid/ask 40/44 cents."""
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        params = dict(request.url.params)
+        calls.append((request.url.path, params))
+        start, end, period = int(params["start_ts"]), int(params["end_ts"]), int(params["period_interval"])
+        step = period * 60
+        candles = [
+            {"end_period_ts": t, "yes_bid": {"close": 40}, "yes_ask": {"close": 44}, "price": {"close": 42}, "volume": 3}
+            for t in range(start - start % step + step, end + 1, step)
+        ]
+        return httpx.Response(200, content=json.dumps({"candlesticks": candles}).encode())
+
+    return handler
+
+
+def test_merge_prefers_local_ticks():
+    backfill = [QuotePoint(ts=t, mid=0.4) for t in (100, 200, 300)]
+    local = [QuotePoint(ts=t, mid=0.5) for t in (250, 251)]
+    assert [p.ts for p in merge_history(backfill, local)] == [100, 200, 250, 251]
+    assert merge_history(backfill, []) == backfill
+
+
+@pytest.mark.asyncio
+async def test_backfill_is_fetched_once_and_merged():
+    state = StateManager()
+    market = make_market()
+    state.update_market(market)
+    now = time.time()
+    state.update_quote(market.market_id, f"{market.market_id}_yes", 0.6, 0.59, 0.61, ts=now)
+
+    connector = KalshiConnector(state)
+    calls = []
+    connector.client = httpx.AsyncClient(base_url="https://kalshi.test", transport=httpx.MockTransport(candles_endpoint(calls)))
+
+    history = await connector.get_backfilled_history(market.market_id, "1D")
+    points = history[f"{market.market_id}_yes"]
+    assert calls[0][0] == "/series/KXBTC/markets/KXBTC-25DEC31-T100/candlesticks"
+    assert calls[0][1]["period_interval"] == "60"
+    assert len(points) >= 24
+    assert points[0].mid == pytest.approx(0.42) and points[0].bid == pytest.approx(0.40)
+    assert points[-1].mid == 0.6  # Local tick wins over the overlapping candle
+    assert all(a.ts < b.ts for a, b in zip(points, points[1:]))
+
+    # Served from the cache until the candle period has passed
+    await connector.get_backfilled_history(market.market_id, "1D")
+    assert len(calls) == 1
+    await connector.client.aclose()
+
+
+@pytest.mark.asyncio
+async def test_candle_cache_is_lru_bounded():
+    state = StateManager()
+    markets = [make_market(f"KXBTC-25DEC31-T{i}") for i in range(3)]
+    for market in markets:
+        state.update_market(market)
+
+    connector = KalshiConnector(state, max_candle_series=2)
+    calls = []
+    connector.client = httpx.AsyncClient(base_url="https://kalshi.test", transport=httpx.MockTransport(candles_endpoint(calls)))
+
+    await connector.get_backfilled_history(markets[0].market_id, "1D")
+    await connector.get_backfilled_history(markets[1].market_id, "1D")
+    await connector.get_backfilled_history(markets[0].market_id, "1D")  # Hit keeps it recent
+    await connector.get_backfilled_history(markets[2].market_id, "1D")
+    assert list(connector._candles) == [(markets[0].source_id, "1D"), (markets[2].source_id, "1D")]
+    assert len(calls) == 3
+    await connector.client.aclose()
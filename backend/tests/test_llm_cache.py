@@ -0,0 +1,98 @@
+import asyncio
+
+import pytest
+
+from app.ai.llm_cache import LLMResponseCache
+from app.ai.llm_service import LLMService
+
+
+class CountingLLM(LLMService):
+    def __init__(self, cache=None):
+        super().__init__(api_key="test", cache=cache or LLMResponseCache())
+        self.posts = 0
+
+    async def _post_openrouter(self, prompt: str, route=None) -> str:
+        self.posts += 1
+        await asyncio.sleep(0.01)
+        return f"answer to {prompt}"
+
+
+@pytest.mark.asyncio
+async def test_identical_prompts_hit_cache_and_share_inflight():
+    llm = CountingLLM()
+    results = await asyncio.gather(*[llm._call_openrouter("p1", call_site="sentiment") for _ in range(4)])
+    assert results == ["answer to p1"] * 4
+    assert llm.posts == 1
+
+    await llm._call_openrouter("p1", call_site="sentiment")
+    assert llm.posts == 1
+
+    stats = llm.get_cache_stats()
+    assert stats["misses"] == 1
+    assert stats["inflight_joins"] == 3
+    assert stats["hits"] == 1
+    assert stats["estimated_latency_saved_seconds"] > 0
+
+
+@pytest.mark.asyncio
+async def test_opt_out_and_lru_bound():
+    llm = CountingLLM(cache=LLMResponseCache(max_entries=2))
+    await llm._call_openrouter("p1", cache=False)
+    await llm._call_openrouter("p1", cache=False)
+    assert llm.posts == 2
+
+    for prompt in ("a", "b", "c"):
+        await llm._call_openrouter(prompt)
+    await llm._call_openrouter("a")  # Evicted by LRU
+    assert llm.posts == 6
+
+
+@pytest.mark.asyncio
+async def test_disk_tier_survives_new_instance(tmp_path):
+    db = tmp_path / "llm.db"
+    first = CountingLLM(cache=LLMResponseCache(db_path=db))
+    await first._call_openrouter("p1", call_site="search_queries")
+
+    second = CountingLLM(cache=LLMResponseCache(db_path=db))
+    assert await second._call_openrouter("p1", call_site="search_queries") == "answer to p1"
+    assert second.posts == 0
+    assert second.get_cache_stats()["disk_hits"] == 1
+
+
+@pytest.mark.asyncio
+async def test_cancelled_leader_does_not_cancel_joiners():
+    llm = CountingLLM()
+
+    async def slow_post(prompt: str, route=None) -> str:
+        llm.posts += 1
+        await asyncio.sleep(0.05)
+        return "done"
+
+    llm._post_openrouter = slow_post
+    leader = asyncio.create_task(asyncio.wait_for(llm._call_openrouter("p1"), timeout=0.01))
+    await asyncio.sleep(0)
+    joiner = asyncio.create_task(llm._call_openrouter("p1"))
+
+    with pytest.raises(asyncio.TimeoutError):
+        await leader
+    assert await joiner == "done"
+    assert llm.posts == 1
+
+    # Once every waiter is gone the upstream call is cancelled
+    lonely = asyncio.create_task(llm._call_openrouter("p2"))
+    await asyncio.sleep(0.01)
+    lonely.cancel()
+    await asyncio.sleep(0.06)
+    assert llm.cache.get(llm.cache.make_key(llm.model, "p2")) is None
+
+
+@pytest.mark.asyncio
+async def test_rejected_responses_are_not_cached():
+    llm = CountingLLM()
+    assert await llm._call_openrouter("p1", call_site="sentiment", validate=lambda r: False) == "answer to p1"
+    await llm._call_openrouter("p1", call_site="sentiment", validate=lambda r: False)
+    assert llm.posts == 2
+
+    await llm._call_openrouter("p1", call_site="sentiment", validate=lambda r: r.startswith("answer"))
+    await llm._call_openrouter("p1", call_site="sentiment")
+    assert llm.posts == 3
@@ -0,0 +1,127 @@
+import asyncio
+import json
+import time
+
+import httpx
+import pytest
+
+from app.ai.llm_router import LLMRouter, Route, parse_routes
+from app.ai.llm_service import LLMService
+
+FAST = Route("model-a", "fast")
+SLOW = Route("model-b", "slow")
+
+
+def stub_endpoint(delays, failing=(), calls=None):
+    """OpenRouter stand-in: per-provider latency and failures, replies with the provider name."""
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        body = json.loads(request.content)
+        provider = body["provider"]["order"][0]
+        if calls is not None:
+            calls.append(provider)
+        await asyncio.sleep(delays.get(provider, 0))
+        if provider in failing:
+            return httpx.Response(500, content=b"boom")
+        if body.get("stream"):
+            delta = {"choices": [{"delta": {"content": provider}}]}
+            return httpx.Response(200, content=f"data: {json.dumps(delta)}\n\ndata: [DONE]\n\n".encode())
+        return httpx.Response(200, json={"choices": [{"message": {"content": provider}}]})
+
+    return handler
+
+
+def make_llm(handler, routes, hedge=()) -> LLMService:
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    router = LLMRouter({"default": routes}, hedge_classes=hedge, min_samples=2)
+    return LLMService(api_key="test", http_client=client, router=router)
+
+
+def test_parse_routes():
+    assert parse_routes("a/m@groq, b/m ,") == [Route("a/m", "groq"), Route("b/m")]
+
+
+@pytest.mark.asyncio
+async def test_routes_to_fastest_and_fails_over():
+    calls = []
+    llm = make_llm(stub_endpoint({"slow": 0.03}, calls=calls), [SLOW, FAST])
+
+    # Unmeasured routes are tried first, then the faster one wins
+    for _ in range(6):
+        await llm._call_openrouter("p", cache=False)
+    assert calls[-2:] == ["fast", "fast"]
+    assert llm.router.rank("default") == [FAST, SLOW]
+    await llm.aclose()
+
+    failing = make_llm(stub_endpoint({}, failing={"fast"}), [FAST, SLOW])
+    for _ in range(3):
+        assert await failing._call_openrouter("p", cache=False) == "slow"
+    assert failing.router.rank("default") == [SLOW, FAST]  # Unhealthy route goes last
+    assert failing.router.failovers >= 2
+    await failing.aclose()
+
+
+@pytest.mark.asyncio
+async def test_hedges_after_p95():
+    llm = make_llm(stub_endpoint({"fast": 1.0}), [FAST, SLOW], hedge=["all"])
+    for _ in range(3):
+        llm.router.record("default", FAST, 0.01, True)
+        llm.router.record("default", SLOW, 0.02, True)
+
+    start = time.perf_counter()
+    assert await llm._call_openrouter("p", cache=False) == "slow"
+    chunks = [c async for c in llm.astream("p2", cache=False)]
+    assert time.perf_counter() - start < 0.5
+    assert chunks == ["slow"]
+
+    stats = llm.router.get_stats()
+    assert stats["hedges"] == 2 and stats["hedge_wins"] == 2
+    assert stats["routes"]["default"]["model-b@slow"]["samples"] == 5
+    await llm.aclose()
+
+
+@pytest.mark.asyncio
+async def test_hedged_request_takes_its_own_scheduler_slot():
+    from app.ai.llm_scheduler import LLMScheduler
+
+    scheduler = LLMScheduler(max_concurrency=4, interactive_reserve=0)
+    in_flight = {}
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        provider = json.loads(request.content)["provider"]["order"][0]
+        in_flight[provider] = scheduler.in_flight
+        await asyncio.sleep(0.3 if provider == "fast" else 0)
+        return httpx.Response(200, json={"choices": [{"message": {"content": provider}}]})
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    router = LLMRouter({"default": [FAST, SLOW]}, hedge_classes=["all"], min_samples=2)
+    llm = LLMService(api_key="test", http_client=client, router=router, scheduler=scheduler)
+    for _ in range(3):
+        router.record("default", FAST, 0.01, True)
+        router.record("default", SLOW, 0.02, True)
+
+    assert await llm._call_openrouter("p", cache=False) == "slow"
+    assert in_flight == {"fast": 1, "slow": 2}  # The hedge is counted
+    await asyncio.sleep(0)
+    assert scheduler.in_flight == 0 and scheduler.inflight_tokens == 0
+    await llm.aclose()
+
+
+@pytest.mark.asyncio
+async def test_cache_entries_are_keyed_by_call_site_routes():
+    from app.ai.llm_cache import LLMResponseCache
+
+    cache = LLMResponseCache()
+    calls = []
+    fast = make_llm(stub_endpoint({}, calls=calls), [FAST])
+    slow = make_llm(stub_endpoint({}, calls=calls), [SLOW])
+    fast.cache = slow.cache = cache
+
+    assert await fast._call_openrouter("p") == "fast"
+    assert await fast._call_openrouter("p") == "fast"
+    # Another route set doesn't get the first one's answer
+    assert await slow._call_openrouter("p") == "slow"
+    assert calls == ["fast", "slow"]
+    assert fast._cache_model("default") == "model-a@fast"
+    await fast.aclose()
+    await slow.aclose()
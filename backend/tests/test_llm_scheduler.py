@@ -0,0 +1,113 @@
+import asyncio
+
+import httpx
+import pytest
+
+from app.ai.llm_scheduler import AGENT, BATCH, INTERACTIVE, LLMScheduler, llm_client
+from app.ai.llm_service import LLMService
+
+
+async def take(scheduler, order, name, priority, tokens=0, client=None, hold=None):
+    async with scheduler.slot(priority, tokens, client=client):
+        order.append(name)
+        if hold is not None:
+            await hold.wait()
+
+
+async def settle():
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+@pytest.mark.asyncio
+async def test_priority_order_and_per_client_round_robin():
+    scheduler = LLMScheduler(max_concurrency=1, interactive_reserve=0)
+    order = []
+    gate = asyncio.Event()
+    holder = asyncio.create_task(take(scheduler, order, "holder", BATCH, hold=gate))
+    await settle()
+
+    tasks = [
+        asyncio.create_task(take(scheduler, order, "batch", BATCH)),
+        asyncio.create_task(take(scheduler, order, "agent", AGENT)),
+        asyncio.create_task(take(scheduler, order, "a1", INTERACTIVE, client="a")),
+        asyncio.create_task(take(scheduler, order, "a2", INTERACTIVE, client="a")),
+        asyncio.create_task(take(scheduler, order, "a3", INTERACTIVE, client="a")),
+        asyncio.create_task(take(scheduler, order, "b1", INTERACTIVE, client="b")),
+    ]
+    await settle()
+    assert scheduler.queued() == 6
+
+    gate.set()
+    await asyncio.gather(holder, *tasks)
+    assert order == ["holder", "a1", "b1", "a2", "a3", "agent", "batch"]
+
+    stats = scheduler.get_stats()
+    assert stats["in_flight"] == 0
+    assert stats["classes"]["interactive"]["admitted"] == 4
+    assert stats["classes"]["interactive"]["avg_wait_ms"] > 0
+
+
+@pytest.mark.asyncio
+async def test_reserve_token_budget_and_cancellation():
+    scheduler = LLMScheduler(max_concurrency=3, max_inflight_tokens=100, interactive_reserve=1)
+    order = []
+    gate = asyncio.Event()
+    held = [asyncio.create_task(take(scheduler, order, f"batch{i}", BATCH, tokens=10, hold=gate)) for i in range(3)]
+    await settle()
+    # Batch may not use the reserved slot; interactive can
+    assert order == ["batch0", "batch1"]
+    interactive = asyncio.create_task(take(scheduler, order, "interactive", INTERACTIVE, tokens=90, hold=gate))
+    await settle()
+    assert order[-1] == "batch1"  # 20 + 90 tokens exceeds the budget
+
+    # A queued request that gives up leaves the queue
+    held[2].cancel()
+    await settle()
+    assert scheduler.get_stats()["classes"]["batch"]["abandoned"] == 1
+
+    gate.set()
+    await asyncio.gather(interactive, *held[:2])
+    assert order == ["batch0", "batch1", "interactive"]
+
+    # Oversized requests still run when nothing else is in flight
+    await take(scheduler, order, "huge", BATCH, tokens=500)
+    assert scheduler.in_flight == 0 and scheduler.inflight_tokens == 0
+
+
+@pytest.mark.asyncio
+async def test_waiter_cancelled_during_release_doesnt_leak_slot():
+    scheduler = LLMScheduler(max_concurrency=1, interactive_reserve=0)
+    order = []
+    release = asyncio.Event()
+    holder = asyncio.create_task(take(scheduler, order, "holder", BATCH, hold=release))
+    await settle()
+    waiter = asyncio.create_task(take(scheduler, order, "waiter", BATCH))
+    await settle()
+
+    release.set()
+    waiter.cancel()
+    await holder  # Must not raise InvalidStateError
+    with pytest.raises(asyncio.CancelledError):
+        await waiter
+    assert scheduler.in_flight == 0 and scheduler.queued() == 0
+
+    await asyncio.wait_for(take(scheduler, order, "next", BATCH), timeout=1)
+    assert order == ["holder", "next"]
+
+
+@pytest.mark.asyncio
+async def test_llm_calls_are_scheduled_by_call_site():
+    transport = httpx.MockTransport(lambda request: httpx.Response(200, json={"choices": [{"message": {"content": "ok"}}]}))
+    scheduler = LLMScheduler()
+    llm = LLMService(api_key="test", http_client=httpx.AsyncClient(transport=transport), scheduler=scheduler)
+
+    llm_client.set("ws:test")
+    await llm._call_openrouter("score this", call_site="sentiment")
+    await llm._call_openrouter("score this", call_site="sentiment")  # Cache hit skips the queue
+    await llm._call_openrouter("suggest", call_site="suggestions")
+
+    classes = scheduler.get_stats()["classes"]
+    assert classes["batch"]["admitted"] == 1
+    assert classes["interactive"]["admitted"] == 1
+    await llm.aclose()
@@ -0,0 +1,143 @@
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from app.ai.json_stream import StreamingJSONParser
+from app.ai.llm_service import LLMService
+
+
+def sse_body(text: str, chunk_size: int = 4) -> bytes:
+    lines = [": OPENROUTER PROCESSING", ""]
+    for i in range(0, len(text), chunk_size):
+        delta = {"choices": [{"delta": {"content": text[i:i + chunk_size]}}]}
+        lines += [f"data: {json.dumps(delta)}", ""]
+    lines += ["data: [DONE]", ""]
+    return "\n".join(lines).encode("utf-8")
+
+
+def make_llm(handler) -> LLMService:
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return LLMService(api_key="test", http_client=client)
+
+
+def test_parser_emits_items_as_they_complete():
+    parser = StreamingJSONParser()
+    text = '```json\n{"a": {"type": "direct", "value": "x}"}, "n": 1, "b": [1, 2]}\n```'
+    emitted = []
+    for ch in text:
+        emitted.append(parser.feed(ch))
+    flat = [item for items in emitted for item in items]
+    assert flat == [("a", {"type": "direct", "value": "x}"}), ("n", 1), ("b", [1, 2])]
+    # "a" is available before the rest of the object has arrived
+    assert emitted.index([("a", {"type": "direct", "value": "x}"})]) < text.index('"n"')
+    assert parser.done
+
+    nested = StreamingJSONParser(("actions",))
+    items = nested.feed('{"reasoning": "r", "actions": [{"command": "c"}, "s"], "done": false}')
+    assert items == [{"command": "c"}, "s"]
+
+
+@pytest.mark.asyncio
+async def test_astream_yields_deltas_and_caches():
+    calls = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(json.loads(request.content))
+        return httpx.Response(200, content=sse_body('["a", "b", "c"]'))
+
+    llm = make_llm(handler)
+    chunks = [c async for c in llm.astream("p", call_site="search_queries")]
+    assert len(chunks) > 1
+    assert "".join(chunks) == '["a", "b", "c"]'
+    assert calls[0]["stream"] is True
+
+    # Second call is served from the response cache in one chunk
+    assert [c async for c in llm.astream("p", call_site="search_queries")] == ['["a", "b", "c"]']
+    assert len(calls) == 1
+    await llm.aclose()
+
+
+@pytest.mark.asyncio
+async def test_search_queries_stream_and_error_status():
+    calls = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request)
+        return httpx.Response(200, content=sse_body('["q1", "q2", "q3", "q4"]'))
+
+    llm = make_llm(handler)
+    assert await llm.generate_market_search_queries("Will X happen?", "Kalshi") == ["q1", "q2", "q3"]
+    # Stopping after the third query still fills the cache
+    assert await llm.generate_market_search_queries("Will X happen?", "Kalshi") == ["q1", "q2", "q3"]
+    assert len(calls) == 1
+    await llm.aclose()
+
+    # Truncated replies are parsed for what they hold but not cached
+    truncated = []
+
+    def cut_off(request: httpx.Request) -> httpx.Response:
+        truncated.append(request)
+        return httpx.Response(200, content=sse_body('["q1", "q2'))
+
+    partial = make_llm(cut_off)
+    for _ in range(2):
+        assert await partial.generate_market_search_queries("Will Y happen?", "Kalshi") == ["q1"]
+    assert len(truncated) == 2
+    await partial.aclose()
+
+    failing = make_llm(lambda request: httpx.Response(500, content=b"boom"))
+    assert await failing.generate_market_search_queries("Will X happen?", "Kalshi") == []
+    await failing.aclose()
+
+
+@pytest.mark.asyncio
+async def test_timeout_cancels_request():
+    started = asyncio.Event()
+    cancelled = asyncio.Event()
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        started.set()
+        try:
+            await asyncio.sleep(5)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+        return httpx.Response(200, json={})
+
+    llm = make_llm(handler)
+    with pytest.raises(asyncio.TimeoutError):
+        await asyncio.wait_for(llm._call_openrouter("slow"), timeout=0.05)
+    assert started.is_set() and cancelled.is_set()
+    await llm.aclose()
+
+
+@pytest.mark.asyncio
+async def test_candidate_search_uses_streamed_queries():
+    from app.matching import search_candidate_markets
+    from app.schemas import Market
+
+    def market(market_id, source):
+        return Market(market_id=market_id, title=market_id, source=source, source_id=market_id)
+
+    class Connector:
+        def __init__(self, source):
+            self.source = source
+            self.queries = []
+
+        async def search_markets(self, query):
+            self.queries.append(query)
+            return [market(f"{self.source}:{query}", self.source)]
+
+    kalshi, poly = Connector("kalshi"), Connector("polymarket")
+    llm = make_llm(lambda request: httpx.Response(200, content=sse_body('["fed rates", "FOMC"]')))
+    target = Market(market_id="p1", title="Will the Fed cut rates?", source="polymarket", source_id="p1")
+
+    candidates = await search_candidate_markets(target, kalshi, poly, llm_service=llm)
+    assert kalshi.queries == ["Fed cut rates?", "fed rates", "FOMC"]
+    assert poly.queries == ["Fed cut rates?"]
+    assert {m.market_id for m in candidates} == {
+        "kalshi:Fed cut rates?", "kalshi:fed rates", "kalshi:FOMC", "polymarket:Fed cut rates?"
+    }
+    await llm.aclose()
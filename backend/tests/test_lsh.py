@@ -0,0 +1,43 @@
+from app.lsh import MarketLSHIndex, estimate_jaccard, minhash_signature, title_shingles
+from app.matching import find_related_market
+from app.schemas import Market
+
+
+def make_market(market_id, title, source):
+    return Market(market_id=market_id, title=title, source=source, source_id=market_id)
+
+
+def test_signature_is_deterministic():
+    shingles = title_shingles("Will Bitcoin reach $150k by December 2026?")
+    assert minhash_signature(shingles) == minhash_signature(set(shingles))
+    assert estimate_jaccard(minhash_signature(shingles), minhash_signature(shingles)) == 1.0
+
+
+def test_find_related_market_with_index():
+    markets = [
+        make_market("KXBTC-26", "Bitcoin above $150k by December 2026?", "kalshi"),
+        make_market("KXFED-1", "Fed cuts rates in March", "kalshi"),
+        make_market("0xother", "Will Bitcoin reach $150k by December 2026?", "polymarket"),
+    ]
+    index = MarketLSHIndex()
+    for m in markets:
+        index.add(m)
+
+    target = make_market("0xbtc", "Will Bitcoin reach $150k in December 2026?", "polymarket")
+    index.add(target)
+
+    candidates = index.query(target, exclude_source="polymarket")
+    assert [m.market_id for m in candidates] == ["KXBTC-26"]
+
+    match = find_related_market(target, markets, index=index)
+    assert match.market_id == find_related_market(target, markets).market_id == "KXBTC-26"
+
+
+def test_index_update_replaces_buckets():
+    index = MarketLSHIndex()
+    index.add(make_market("KX-1", "Lakers win the NBA Finals", "kalshi"))
+    index.add(make_market("KX-1", "Fed cuts rates in March", "kalshi"))
+
+    target = make_market("0x1", "Lakers win the NBA Finals", "polymarket")
+    assert index.query(target) == []
+    assert len(index) == 1
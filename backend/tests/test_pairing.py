@@ -0,0 +1,103 @@
+import asyncio
+
+import pytest
+
+from app.schemas import Market
+from app.state import StateManager
+from app.services.pairing import MarketPairingService
+
+
+def make_market(market_id, title, source, sector=None):
+    return Market(market_id=market_id, title=title, source=source, source_id=market_id, sector=sector)
+
+
+@pytest.fixture
+def state():
+    StateManager._instance = None
+    yield StateManager()
+    StateManager._instance = None
+
+
+@pytest.mark.asyncio
+async def test_pairs_update_incrementally(state):
+    pairing = MarketPairingService(state)
+    pairing.start()
+
+    state.update_market(make_market("0xbtc", "Will Bitcoin reach $150k by December 2026?", "polymarket", "Crypto"))
+    state.update_market(make_market("0xfed", "Will the Fed cut rates in March?", "polymarket", "Economics"))
+    state.update_market(make_market("KXBTC-26", "Bitcoin above $150k by December 2026", "kalshi", "Crypto"))
+    state.update_market(make_market("KXNBA-1", "Lakers win the NBA Finals", "kalshi", "Sports"))
+
+    for _ in range(10):
+        await asyncio.sleep(0)
+
+    best = pairing.get_best("0xbtc")
+    assert best is not None
+    assert best[0].market_id == "KXBTC-26"
+
+    # Bidirectional: the Kalshi side sees the Polymarket market
+    assert pairing.get_best("KXBTC-26")[0].market_id == "0xbtc"
+    assert pairing.get_best("0xfed") is None
+    assert pairing.method("0xbtc") == "text"
+
+    await pairing.stop()
+
+
+@pytest.mark.asyncio
+async def test_blocking_respects_sector(state):
+    pairing = MarketPairingService(state)
+    poly = make_market("0xlakers", "Lakers win the NBA Finals", "polymarket", "Sports")
+    state.update_market(poly)
+    state.update_market(make_market("KXPOL-1", "Lakers win the NBA Finals", "kalshi", "Politics"))
+    state.update_market(make_market("KXNBA-1", "Lakers win NBA Finals 2026", "kalshi", "Sports"))
+    pairing.start()
+
+    ids = [m.market_id for m in pairing.candidates(poly)]
+    assert ids == ["KXNBA-1"]
+
+    pairs = await pairing.refresh("0xlakers")
+    assert [m.market_id for m, _ in pairs] == ["KXNBA-1"]
+
+    await pairing.stop()
+
+
+@pytest.mark.asyncio
+async def test_related_and_compare_refresh_the_same_way(monkeypatch):
+    import httpx
+    from fastapi import FastAPI
+
+    from app import api, matching
+
+    market = make_market("p-refresh", "Fed cuts rates in March", "polymarket")
+    api.state.update_market(market)
+    searched, refreshed = [], []
+
+    async def fake_search(target, kalshi, poly, **kwargs):
+        searched.append(target.market_id)
+        return []
+
+    class Pairing:
+        def is_paired(self, market_id):
+            return True
+
+        async def refresh(self, market_id):
+            refreshed.append(market_id)
+
+        def get_best(self, market_id):
+            return None
+
+        def get_pairs(self, market_id):
+            return []
+
+    monkeypatch.setattr(matching, "search_candidate_markets", fake_search)
+    app = FastAPI()
+    app.include_router(api.router)
+    app.state.pairing, app.state.poly, app.state.kalshi = Pairing(), object(), object()
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        for endpoint in ("related", "compare"):
+            await client.get(f"/markets/p-refresh/{endpoint}")
+            await client.get(f"/markets/p-refresh/{endpoint}?refresh=true")
+
+    assert searched == ["p-refresh", "p-refresh"]
+    assert refreshed == ["p-refresh", "p-refresh"]
@@ -0,0 +1,59 @@
+import asyncio
+import time
+
+import pytest
+
+from app.services.price_history import PriceHistoryService
+
+
+class FakeClob:
+    """fetch_price_history stand-in: hourly points up to `now`, tracks calls and concurrency."""
+
+    def __init__(self, delay=0.02):
+        self.delay = delay
+        self.calls = []
+        self.active = 0
+        self.peak = 0
+        self.now = int(time.time())
+
+    async def fetch_price_history(self, token_id, interval="1d", start_ts=None):
+        self.calls.append((token_id, interval, start_ts))
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        try:
+            await asyncio.sleep(self.delay)
+        finally:
+            self.active -= 1
+        start = start_ts if start_ts is not None else self.now - 23 * 3600
+        return [{"t": t, "p": 0.5} for t in range(self.now - 23 * 3600, self.now + 1, 3600) if t >= start]
+
+
+@pytest.mark.asyncio
+async def test_outcomes_fetched_concurrently_with_a_bound():
+    clob = FakeClob()
+    service = PriceHistoryService(clob, max_concurrency=4)
+    tokens = [f"{i:030d}" for i in range(12)]
+
+    histories = await service.get_many(tokens, "1D")
+
+    assert set(histories) == set(tokens)
+    assert all(len(points) == 24 for points in histories.values())
+    assert clob.peak == 4
+
+
+@pytest.mark.asyncio
+async def test_cached_series_is_extended_incrementally():
+    clob = FakeClob()
+    service = PriceHistoryService(clob, min_refresh_seconds=60)
+
+    first = await service.get_history("tok", "1D")
+    await asyncio.gather(*[service.get_history("tok", "5D") for _ in range(3)])  # Same interval, cached
+    assert len(clob.calls) == 1
+
+    # Past min_refresh only points after the cached tail are requested
+    service.min_refresh = 0
+    clob.now += 2 * 3600
+    extended = await service.get_history("tok", "1D")
+    assert clob.calls[-1] == ("tok", "1D", first[-1]["t"] + 1)
+    assert [p["t"] for p in extended[-3:]] == [first[-1]["t"], first[-1]["t"] + 3600, first[-1]["t"] + 7200]
+    assert service.get_stats()["points_appended"] == 2
@@ -0,0 +1,106 @@
+import pytest
+
+from app.news import rank
+
+
+@pytest.fixture
+def detect_calls(monkeypatch):
+    calls = []
+
+    def fake_detect(text):
+        calls.append(text)
+        return "en"
+
+    monkeypatch.setattr(rank, "detect", fake_detect)
+    monkeypatch.setattr(rank, "_language_memo", rank.OrderedDict())
+    return calls
+
+
+def test_heuristic_decides_clear_titles():
+    assert rank.guess_english("Fed expected to cut rates after the June meeting") is True
+    assert rank.guess_english("El banco central recorta las tasas de interés por la inflación") is False
+    assert rank.guess_english("ビットコインが過去最高値を更新") is False
+    assert rank.guess_english("Bitcoin Surges Past $100K") is None  # No function words: ambiguous
+
+
+def test_langdetect_only_for_ambiguous_titles_and_memoized(detect_calls):
+    articles = [
+        {"title": "Fed expected to cut rates after the June meeting", "url": "a"},
+        {"title": "Bitcoin Surges Past $100K", "url": "b"},
+        {"title": "Die Notenbank senkt die Zinsen und der Markt reagiert", "url": "c"},
+        {"title": "Ethereum ETF Approval Odds Climb", "url": "d", "language": "en"},
+        {"title": "Ethereum ETF Approval Odds Climb", "url": "e", "language": "es"},
+    ]
+    for _ in range(3):  # The SSE path re-ranks the same titles repeatedly
+        ranked = rank.rank_articles(articles, query="bitcoin")
+    assert sorted(a["url"] for a in ranked) == ["a", "b", "d"]
+    assert detect_calls == ["Bitcoin Surges Past $100K"]
+
+
+def reference_rank(articles, query="", dedupe=True, limit=None):
+    """Per-article ranking loop as it was before batch scoring."""
+    scored = []
+    for article in rank.filter_english(articles):
+        title = str(article.get("title", ""))
+        rel = rank.calculate_relevance(query, title)
+        rec = rank.calculate_recency(article.get("published_at"))
+        qual = rank.calculate_title_quality(title)
+        score = (rel * rank.WEIGHT_RELEVANCE) + (rec * rank.WEIGHT_RECENCY) + (qual * rank.WEIGHT_QUALITY)
+        scored.append({**article, "_score": round(score, 4), "_relevance": round(rel, 4),
+                       "_recency": round(rec, 4), "_quality": round(qual, 4)})
+    scored.sort(key=lambda a: a["_score"], reverse=True)
+    if dedupe:
+        scored = rank.deduplicate(scored)
+    return scored[:limit] if limit else scored
+
+
+def make_articles(n, seed=3):
+    import random
+    rng = random.Random(seed)
+    subjects = ["Bitcoin", "Fed rates", "Election", "Nvidia earnings", "Oil"]
+    stamps = [
+        "2026-01-15T10:00:00Z", "2026-01-16T08:30:00.123456", "2026-01-14 12:00:00",
+        "2026-01-10", "2026-01-16T09:00:00+00:00", 1768557600000, 1768557600, None, "garbage",
+    ]
+    return [{
+        "title": f"{rng.choice(subjects)} outlook for the week {'!!!' if i % 7 == 0 else ''}".strip(),
+        "url": f"https://news.example/{rng.randint(0, n // 2)}" if i % 5 else "",
+        "published_at": rng.choice(stamps),
+        "language": "en",
+    } for i in range(n)]
+
+
+@pytest.mark.parametrize("vectorized", [True, False])
+def test_batch_ranking_matches_per_article_scoring(monkeypatch, vectorized):
+    if vectorized and rank.np is None:
+        pytest.skip("numpy not installed")
+    if not vectorized:
+        monkeypatch.setattr(rank, "np", None)
+    monkeypatch.setattr(rank, "_now", lambda: 1768600000.0)
+
+    articles = make_articles(300)
+    for query in ("bitcoin outlook", "fed rates", ""):
+        for dedupe in (True, False):
+            for limit in (None, 1, 10, 200):
+                assert rank.rank_articles(articles, query, dedupe, limit) == reference_rank(articles, query, dedupe, limit)
+
+    parser = rank.TimestampParser()
+    for ts in ("2026-01-10", "2026-01-14 12:00:00", "2026-1-5", "2026-01-10", "2026-02-30",
+               "2026-01-16T24:00:00", "2026-01-16T08:30", "2026-01-16T08:30:00.5Z", "bad", 1768557600000):
+        assert parser.parse(ts) == rank.parse_timestamp(ts)
+
+
+def test_near_duplicates_cluster_to_first_copy():
+    story = {"title": "Fed holds rates steady as inflation cools, Powell signals patience",
+             "description": "The Federal Reserve left its benchmark rate unchanged on Wednesday, "
+                            "citing cooling inflation and a resilient labor market."}
+    articles = [
+        {**story, "url": "a"},
+        {"title": "Bitcoin slides below $90k as ETF outflows mount", "url": "b"},
+        {**story, "title": story["title"] + " - Reuters", "url": "c"},
+        {"title": "Short", "url": "d"},
+        {"title": "Short", "url": "e"},  # Too little text to fingerprint
+    ]
+    clustered = rank.cluster_near_duplicates(articles)
+    assert [(a["url"], a["_cluster_size"]) for a in clustered] == [("a", 2), ("b", 1), ("d", 1), ("e", 1)]
+    assert bin(rank.simhash(["x y"]) ^ rank.simhash(["x y"])).count("1") == 0
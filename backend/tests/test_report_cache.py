@@ -0,0 +1,58 @@
+import asyncio
+
+import pytest
+
+from app.services.report_cache import SentimentReportCache
+from app.services.researcher import ResearchReport
+
+
+def make_report(market_id="0xabc", score=42.0):
+    return ResearchReport(
+        market_id=market_id, query="Bitcoin", aggregate_score=score,
+        signal="bullish", summary="Up.", articles_analyzed=3,
+    )
+
+
+@pytest.mark.asyncio
+async def test_single_flight_and_persistence(tmp_path):
+    db = tmp_path / "reports.db"
+    cache = SentimentReportCache(db_path=db)
+    calls = 0
+
+    async def compute():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return make_report()
+
+    results = await asyncio.gather(*[
+        cache.get_or_compute("0xabc", "Bitcoin", compute) for _ in range(5)
+    ])
+    assert calls == 1
+    assert all(not cached for _, cached in results)
+
+    # Normalized query hits the same entry
+    entry, cached = await cache.get_or_compute("0xabc", "  bitcoin ", compute)
+    assert cached and calls == 1
+
+    # A new instance reads the report back from SQLite
+    reloaded = SentimentReportCache(db_path=db)
+    entry = reloaded.get("0xabc", "BITCOIN")
+    assert entry is not None
+    assert entry.report.aggregate_score == 42.0
+
+
+@pytest.mark.asyncio
+async def test_stale_while_revalidate(tmp_path):
+    cache = SentimentReportCache(db_path=tmp_path / "reports.db", ttl_seconds=0)
+    cache.put("0xabc", "Bitcoin", make_report(score=1.0))
+
+    async def compute():
+        return make_report(score=2.0)
+
+    entry, cached = await cache.get_or_compute("0xabc", "Bitcoin", compute)
+    assert cached and entry.report.aggregate_score == 1.0
+    assert cache.is_computing("0xabc", "Bitcoin")
+
+    await asyncio.sleep(0.01)
+    assert cache.get("0xabc", "Bitcoin").report.aggregate_score == 2.0
@@ -0,0 +1,215 @@
+import json
+import re
+
+import pytest
+
+from app.ai.llm_service import LLMService
+from app.services import researcher
+from app.services.sentiment_store import ArticleSentimentStore
+
+
+class BatchLLM(LLMService):
+    """Answers batch prompts with a JSON array; can drop ids to force retries."""
+
+    def __init__(self, drop_ids=(), garble=False):
+        super().__init__(api_key="test")
+        self.requests = []
+        self.drop_ids = set(drop_ids)
+        self.garble = garble
+
+    async def _call_openrouter(self, prompt: str, **kwargs) -> str:
+        ids = [int(i) for i in re.findall(r"^\[(\d+)\] Headline:", prompt, re.M)]
+        self.requests.append(ids)
+        if not ids:
+            return '{"score": -10, "confidence": 0.5, "reasoning": "single"}'
+        items = [
+            {"id": i, "score": i, "confidence": 0.9, "reasoning": "batch"}
+            for i in ids if i not in self.drop_ids
+        ]
+        self.drop_ids.clear()  # Only fail the first attempt
+        text = json.dumps(items)
+        if self.garble:
+            text = "Here you go:\n" + text.replace("}, {", "},, {")
+        return text
+
+
+def make_articles(n):
+    return [{"title": f"Headline {i}", "url": f"https://example.com/{i}"} for i in range(n)]
+
+
+@pytest.mark.asyncio
+async def test_batches_articles_into_few_requests():
+    llm = BatchLLM()
+    results = await researcher.analyze_articles_batched(llm, make_articles(25), "Bitcoin")
+    assert len(llm.requests) == 3
+    assert [r.score for r in results] == list(range(25))
+
+
+@pytest.mark.asyncio
+async def test_retries_only_unparsed_articles():
+    llm = BatchLLM(drop_ids={3, 7})
+    results = await researcher.analyze_articles_batched(llm, make_articles(10), "Bitcoin")
+    assert llm.requests[0] == list(range(10))
+    assert sorted(i for batch in llm.requests[1:] for i in batch) == [3, 7]
+    assert [r.score for r in results] == list(range(10))
+
+
+@pytest.mark.asyncio
+async def test_repairs_malformed_array():
+    llm = BatchLLM(garble=True)
+    results = await researcher.analyze_articles_batched(llm, make_articles(4), "Bitcoin")
+    assert len(llm.requests) == 1
+    assert [r.reasoning for r in results] == ["batch"] * 4
+
+
+@pytest.mark.asyncio
+async def test_request_errors_are_not_retried():
+    class DownLLM(BatchLLM):
+        async def _call_openrouter(self, prompt: str, **kwargs) -> str:
+            await super()._call_openrouter(prompt, **kwargs)
+            raise RuntimeError("upstream unavailable")
+
+    llm = DownLLM()
+    results = await researcher.analyze_articles_batched(llm, make_articles(25), "Bitcoin")
+    assert len(llm.requests) == 3  # One per batch, no smaller retries
+    assert {r.reasoning for r in results} == {"Error"}
+
+
+def test_plan_batches_respects_token_budget():
+    long_snippet = "x" * 4000
+    articles = [{"title": "t", "description": long_snippet} for _ in range(12)]
+    batches = researcher.plan_batches(articles)
+    # Snippets are truncated, so input budget allows several per batch
+    assert all(len(b) <= researcher.MAX_BATCH_SIZE for b in batches)
+    assert sum(len(b) for b in batches) == 12
+    assert researcher.plan_batches(articles, max_batch_size=1) == [[i] for i in range(12)]
+
+
+@pytest.mark.asyncio
+async def test_analyze_batch_uses_batching(tmp_path):
+    llm = BatchLLM()
+    store = ArticleSentimentStore(db_path=tmp_path / "s.db")
+    await researcher.analyze_batch(llm, make_articles(20), "Bitcoin", store=store)
+    assert len(llm.requests) == 2
+
+
+@pytest.mark.asyncio
+async def test_research_scores_one_copy_per_syndicated_story(tmp_path, monkeypatch):
+    wire = {
+        "title": "Fed holds rates steady as inflation cools, Powell signals patience",
+        "description": "The Federal Reserve left its benchmark rate unchanged on Wednesday, "
+                       "citing cooling inflation and a resilient labor market.",
+    }
+    articles = [
+        {**wire, "url": "https://a.example/fed"},
+        {**wire, "title": wire["title"] + " - Reuters", "url": "https://b.example/fed"},
+        {**wire, "url": "https://c.example/fed"},
+        {"title": "Bitcoin slides below $90k as ETF outflows mount for a third day",
+         "description": "Spot ETFs recorded heavy outflows.", "url": "https://d.example/btc"},
+    ]
+    monkeypatch.setattr(researcher, "harvest", lambda query, max_articles: articles)
+    monkeypatch.setattr(researcher, "get_article_store", lambda: ArticleSentimentStore(db_path=tmp_path / "s.db"))
+
+    llm = BatchLLM()
+    report = await researcher.research_market(llm, "m1", "fed rates")
+
+    assert llm.requests[0] == [0, 1]  # Two distinct stories in the scoring prompt
+    assert report.articles_analyzed == 4
+    # Story 0 (score 0) carries 3x the weight of story 1 (score 1)
+    assert report.aggregate_score == pytest.approx(0.25, abs=0.01)
+
+
+class SteadyLLM(BatchLLM):
+    """Scores articles 40/50/60 in turn, so the interval narrows steadily."""
+
+    async def _call_openrouter(self, prompt: str, **kwargs) -> str:
+        ids = [int(i) for i in re.findall(r"^\[(\d+)\] Headline:", prompt, re.M)]
+        self.requests.append(ids)
+        if not ids:
+            return "Steady coverage."
+        return json.dumps([{"id": i, "score": 40 + 10 * (i % 3), "confidence": 0.9, "reasoning": "r"} for i in ids])
+
+
+def stream_articles(n):
+    return [
+        {"title": f"Story number {i} about the election", "url": f"https://example.com/{i}",
+         "description": f"Distinct coverage item {i} " + " ".join(f"w{i}x{j}" for j in range(12))}
+        for i in range(n)
+    ]
+
+
+@pytest.mark.asyncio
+async def test_stream_research_reports_progress_and_stops_early(tmp_path, monkeypatch):
+    monkeypatch.setattr(researcher, "harvest", lambda query, max_articles: stream_articles(40))
+    store = ArticleSentimentStore(db_path=tmp_path / "s.db")
+    llm = SteadyLLM()
+
+    events = [e async for e in researcher.stream_research_market(
+        llm, "m1", "election", ci_half_width=5.0, concurrency=1, store=store)]
+
+    progress = [item for kind, item in events if kind == "progress"]
+    kind, final = events[-1]
+    assert kind == "report" and final["stopped_early"]
+    assert progress[0]["scored"] < progress[-1]["scored"] == final["scored"] < 40
+    assert progress[-1]["ci_low"] <= progress[-1]["score"] <= progress[-1]["ci_high"]
+    assert final["report"].signal == "bullish"
+    assert final["report"].aggregate_score == pytest.approx(50, abs=2)
+    # 30 stories pass the gate (6 batches of 5); the rest were never sent
+    scoring_requests = llm.requests[:-1]  # Minus the summary
+    assert len(scoring_requests) <= 4
+    assert sum(len(ids) for ids in scoring_requests) == final["report"].articles_analyzed
+
+
+def test_running_sentiment_interval_narrows():
+    running = researcher.RunningSentiment()
+    article = {"published_at": None}
+    running.add(article, researcher.SentimentResult(50, 1.0, ""))
+    running.add(article, researcher.SentimentResult(0, 0.0, "Error"))
+    assert running.count == 1  # Failed scores don't count
+    assert running.half_width == float("inf")
+    for score in (30, 70, 50, 40, 60):
+        running.add(article, researcher.SentimentResult(score, 1.0, ""))
+    wide = running.half_width
+    for score in (45, 55, 50, 50, 48, 52):
+        running.add(article, researcher.SentimentResult(score, 1.0, ""))
+    assert running.score == pytest.approx(50)
+    assert running.half_width < wide
+
+
+def test_relevance_gate_skips_loosely_related_stories():
+    stories = [
+        {"title": "Fed cuts rates", "_relevance": 0.9},
+        {"title": "Celebrity wedding photos", "_relevance": 0.0},
+        # Weak title match, but the snippet is about the market
+        {"title": "Markets today", "_relevance": 0.05, "_cluster_size": 2,
+         "description": "Traders price a Federal Reserve rate cut in December."},
+        {"title": "Weather forecast", "_relevance": 0.05, "_cluster_size": 3},
+    ]
+    kept, skipped = researcher.relevance_gate(stories, min_relevance=0.2)
+    assert [s["title"] for s in kept] == ["Fed cuts rates"]
+    assert skipped == 6  # Cluster copies count
+
+    kept, skipped = researcher.relevance_gate(
+        stories, reference="Will the Federal Reserve cut rates in December?", min_relevance=0.2)
+    assert [s["title"] for s in kept] == ["Fed cuts rates", "Markets today"]
+    assert skipped == 4
+
+    kept, skipped = researcher.relevance_gate(stories, min_relevance=0.0, max_stories=2)
+    assert len(kept) == 2 and skipped == 5
+
+
+@pytest.mark.asyncio
+async def test_research_reports_skipped_articles(tmp_path, monkeypatch):
+    articles = [
+        {"title": f"Bitcoin rallies on ETF inflows, day {i}", "url": f"https://a.example/{i}",
+         "_relevance": 0.8, "description": f"Report {i}"} for i in range(3)
+    ] + [{"title": "Local bakery wins award", "url": "https://b.example/x", "_relevance": 0.0}]
+    monkeypatch.setattr(researcher, "harvest", lambda query, max_articles: articles)
+    monkeypatch.setattr(researcher, "get_article_store", lambda: ArticleSentimentStore(db_path=tmp_path / "s.db"))
+
+    llm = BatchLLM()
+    report = await researcher.research_market(llm, "m1", "bitcoin")
+
+    assert llm.requests[0] == [0, 1, 2]
+    assert report.articles_analyzed == 3
+    assert report.articles_skipped == 1
@@ -0,0 +1,51 @@
+from types import SimpleNamespace
+
+import pytest
+
+from app.services import sentiment_refresher
+from app.services.report_cache import SentimentReportCache
+from app.services.researcher import ResearchReport
+from app.services.sentiment_refresher import SentimentRefresher
+
+
+class FakeState:
+    def get_market(self, market_id):
+        return SimpleNamespace(title=f"Market {market_id}")
+
+
+@pytest.fixture
+def researched(monkeypatch):
+    calls = []
+
+    async def fake_research(llm, market_id, query, max_articles=50, reference=None):
+        calls.append(market_id)
+        return ResearchReport(market_id=market_id, query=query, aggregate_score=10.0,
+                              signal="neutral", summary="Flat.", articles_analyzed=5)
+
+    monkeypatch.setattr(sentiment_refresher, "research_market", fake_research)
+    return calls
+
+
+@pytest.mark.asyncio
+async def test_refreshes_most_watched_markets_within_budget(tmp_path, researched):
+    cache = SentimentReportCache(db_path=tmp_path / "r.db")
+    subs = {"a": {1}, "b": {1, 2, 3}, "c": {1, 2}, "d": set()}
+    refresher = SentimentRefresher(FakeState(), llm=None, report_cache=cache,
+                                   subscriptions=lambda: subs, top_n=2, max_per_hour=3)
+
+    assert refresher.hot_markets() == ["b", "c"]
+    assert await refresher.refresh_once() == 2
+    assert researched == ["b", "c"]
+
+    # The endpoint's cache lookup (market title as query) is now warm
+    assert cache.get("b", "Market b").report.summary == "Flat."
+
+    # Fresh reports aren't recomputed
+    assert await refresher.refresh_once() == 0
+    assert refresher.skipped_fresh == 2
+
+    # Once stale, the hourly budget caps recomputation
+    refresher.refresh_after = 0
+    assert await refresher.refresh_once() == 1
+    assert refresher.skipped_budget == 1
+    assert researched == ["b", "c", "b"]
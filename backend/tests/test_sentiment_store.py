@@ -0,0 +1,67 @@
+import pytest
+
+from app.ai.llm_service import LLMService
+from app.services import researcher
+from app.services.sentiment_store import ArticleSentimentStore, topic_key
+
+
+class FakeLLM(LLMService):
+    """Scores every article 40 (single-article prompts only)."""
+
+    def __init__(self):
+        super().__init__(api_key="test")
+        self.calls = 0
+
+    async def _call_openrouter(self, prompt: str, **kwargs) -> str:
+        self.calls += 1
+        return '{"score": 40, "confidence": 0.8, "reasoning": "ok"}'
+
+
+ARTICLES = [
+    {"title": "Bitcoin rallies", "url": "https://example.com/a", "description": ""},
+    {"title": "ETF inflows surge", "url": "https://example.com/b/", "description": ""},
+    {"title": "No link article", "url": None, "description": "Miners sell"},
+]
+
+
+def test_topic_key_normalizes_terms():
+    assert topic_key("BTC price") == topic_key("price of btc")
+
+
+@pytest.mark.asyncio
+async def test_analyze_batch_only_scores_unseen(tmp_path):
+    db = tmp_path / "sentiment.db"
+    store = ArticleSentimentStore(db_path=db)
+    llm = FakeLLM()
+
+    first = await researcher.analyze_batch(llm, ARTICLES, "Bitcoin", store=store, batched=False)
+    assert llm.calls == 3
+    assert [r.score for r in first] == [40, 40, 40]
+
+    # Same news again (trailing slash differs) -> no LLM calls
+    again = [dict(a) for a in ARTICLES]
+    again[1]["url"] = "https://example.com/b"
+    second = await researcher.analyze_batch(llm, again, "bitcoin", store=store, batched=False)
+    assert llm.calls == 3
+    assert [r.score for r in second] == [40, 40, 40]
+
+    # Persisted: a fresh store only scores the new article
+    reloaded = ArticleSentimentStore(db_path=db)
+    extra = ARTICLES + [{"title": "New story", "url": "https://example.com/c"}]
+    await researcher.analyze_batch(llm, extra, "Bitcoin", store=reloaded, batched=False)
+    assert llm.calls == 4
+
+    stats = store.get_stats()
+    assert stats["articles_reused"] == 3
+    assert stats["hit_rate"] == 0.5
+
+
+def test_memory_tier_is_lru_bounded(tmp_path):
+    store = ArticleSentimentStore(db_path=tmp_path / "s.db", max_memory_entries=2)
+    articles = [{"title": f"Story {i}", "url": f"https://example.com/{i}"} for i in range(3)]
+    store.put_many(articles, "Bitcoin", [(i, 0.5, "r") for i in range(3)])
+    assert store.get_stats()["memory_entries"] == 2
+
+    # The evicted entry is still served from disk
+    assert [s[0] for s in store.get_many(articles, "Bitcoin")] == [0, 1, 2]
+    assert store.get_stats()["memory_entries"] == 2
@@ -0,0 +1,98 @@
+import asyncio
+import json
+
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from app import api
+from app.services.report_cache import SentimentReportCache
+from app.services.researcher import ResearchReport
+
+
+def fake_research(stopped_early, calls):
+    async def stream(llm, market_id, query, **kwargs):
+        calls.append(market_id)
+        for scored in (5, 10):
+            await asyncio.sleep(0.02)
+            yield "progress", {"score": 40.0, "scored": scored, "total": 20}
+        report = ResearchReport(market_id=market_id, query=query, aggregate_score=40.0,
+                                signal="bullish", summary="Up.", articles_analyzed=10)
+        yield "report", {"report": report, "scored": 10, "total": 20, "stopped_early": stopped_early}
+    return stream
+
+
+def make_app(tmp_path):
+    app = FastAPI()
+    app.include_router(api.router)
+    app.state.llm = object()
+    app.state.sentiment_cache = SentimentReportCache(db_path=tmp_path / "r.db")
+    return app
+
+
+def events(body: str):
+    return [
+        (chunk.split("\n")[0][len("event: "):], json.loads(chunk.split("\n")[1][len("data: "):]))
+        for chunk in body.strip().split("\n\n")
+    ]
+
+
+@pytest.mark.asyncio
+async def test_concurrent_streams_share_one_run_and_early_stops_arent_cached(tmp_path, monkeypatch):
+    calls = []
+    monkeypatch.setattr(api, "stream_research_market", fake_research(True, calls))
+    app = make_app(tmp_path)
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        url = "/markets/m1/sentiment/stream?q=bitcoin"
+        responses = await asyncio.gather(client.get(url), client.get(url))
+
+    assert calls == ["m1"]
+    for response in responses:
+        kinds = [kind for kind, _ in events(response.text)]
+        assert kinds[-1] == "done" and "progress" in kinds
+        assert events(response.text)[-1][1]["stopped_early"] is True
+    assert app.state.sentiment_cache.get("m1", "bitcoin") is None
+
+
+@pytest.mark.asyncio
+async def test_complete_stream_is_cached(tmp_path, monkeypatch):
+    calls = []
+    monkeypatch.setattr(api, "stream_research_market", fake_research(False, calls))
+    app = make_app(tmp_path)
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        await client.get("/markets/m1/sentiment/stream?q=bitcoin")
+        cached = await client.get("/markets/m1/sentiment/stream?q=bitcoin")
+
+    assert calls == ["m1"]
+    assert events(cached.text) == [("done", events(cached.text)[0][1])]
+    assert events(cached.text)[0][1]["cached"] is True
+
+
+@pytest.mark.asyncio
+async def test_plain_sentiment_does_not_join_a_streaming_run(tmp_path, monkeypatch):
+    calls, full = [], []
+
+    async def research(llm, market_id, query, **kwargs):
+        full.append(market_id)
+        return ResearchReport(market_id=market_id, query=query, aggregate_score=10.0,
+                              signal="neutral", summary="Full.", articles_analyzed=20)
+
+    monkeypatch.setattr(api, "stream_research_market", fake_research(True, calls))
+    monkeypatch.setattr(api, "research_market", research)
+    app = make_app(tmp_path)
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        async def plain():
+            await asyncio.sleep(0.01)  # While the stream run is in progress
+            return await client.get("/markets/m1/sentiment?q=bitcoin")
+
+        streamed, plain_response = await asyncio.gather(
+            client.get("/markets/m1/sentiment/stream?q=bitcoin"), plain(),
+        )
+
+    assert calls == ["m1"] and full == ["m1"]
+    assert events(streamed.text)[-1][1]["stopped_early"] is True
+    assert plain_response.json()["articles_analyzed"] == 20
+    assert app.state.sentiment_cache.get("m1", "bitcoin").report.summary == "Full."
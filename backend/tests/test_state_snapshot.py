@@ -0,0 +1,63 @@
+import pytest
+
+from app.schemas import Market, Outcome
+from app.services.state_snapshot import (
+    SNAPSHOT_MAGIC,
+    StateSnapshotter,
+    build_snapshot,
+    decode_snapshot,
+    encode_snapshot,
+)
+from app.state import StateManager
+
+
+def make_market(market_id):
+    return Market(
+        market_id=market_id, title=f"Market {market_id}", source="polymarket", source_id=market_id,
+        outcomes=[Outcome(outcome_id=f"{market_id}-yes", name="Yes", price=0.4)],
+    )
+
+
+@pytest.fixture
+def fresh_state(monkeypatch):
+    """A new StateManager per call (the singleton is restored after the test)."""
+    def make():
+        monkeypatch.setattr(StateManager, "_instance", None)
+        return StateManager()
+    return make
+
+
+@pytest.mark.asyncio
+async def test_snapshot_round_trip_without_overwriting_live_data(tmp_path, fresh_state):
+    old = fresh_state()
+    for i in range(3):
+        old.update_market(make_market(f"m{i}"))
+    for ts in range(100, 110):
+        old.update_quote("m0", "m0-yes", 0.4, 0.39, 0.41, ts=ts)
+    old.update_orderbook("m0", "m0-yes", [], [], ts=109)
+
+    path = tmp_path / "state.bin"
+    await StateSnapshotter(old, path=path, quote_tail=5).save()
+
+    new = fresh_state()
+    live = make_market("m1").model_copy(update={"title": "Live title"})
+    new.update_market(live)
+    new.update_quote("m0", "m0-yes", 0.5, 0.49, 0.51, ts=108)
+
+    restored = await StateSnapshotter(new, path=path).load()
+
+    assert restored == {"markets": 2, "orderbooks": 1, "quotes": 1}
+    assert sorted(new.markets) == ["m0", "m1", "m2"]
+    assert new.get_market("m1").title == "Live title"
+    # Snapshot tail (105-109) only fills in before the first live point
+    assert [p.ts for p in new.get_history("m0", "m0-yes")] == [105, 106, 107, 108]
+    assert new.get_orderbook("m0", "m0-yes").ts == 109
+
+
+def test_other_versions_are_ignored(fresh_state):
+    state = fresh_state()
+    state.update_market(make_market("m0"))
+    data = encode_snapshot(build_snapshot(state))
+    assert decode_snapshot(data)["markets"][0]["market_id"] == "m0"
+    assert decode_snapshot(data[:len(SNAPSHOT_MAGIC)] + bytes([data[len(SNAPSHOT_MAGIC)] + 1]) + data[len(SNAPSHOT_MAGIC) + 1:]) is None
+    assert decode_snapshot(b"garbage") is None
@@ -0,0 +1,115 @@
+import asyncio
+
+import pytest
+
+from app.ai.suggestion_cache import SuggestionCache
+
+PARAMS = [{"name": "marketId", "type": "market"}, {"name": "range", "type": "select"}]
+
+
+def test_key_covers_prompt_inputs():
+    base = SuggestionCache.make_key("chart", PARAMS, {"range": "1d"}, "history")
+    assert base == SuggestionCache.make_key("chart", list(reversed(PARAMS)), {"range": "1d"}, "history")
+    assert base != SuggestionCache.make_key("chart", PARAMS, {"range": "1w"}, "history")
+    assert base != SuggestionCache.make_key("chart", PARAMS[:1], {"range": "1d"}, "history")
+    assert base != SuggestionCache.make_key("chart", PARAMS, {"range": "1d"}, "history + new run")
+
+
+@pytest.mark.asyncio
+async def test_single_flight_and_lru():
+    cache = SuggestionCache(max_entries=2)
+    calls = 0
+
+    async def compute():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return {"marketId": {"type": "direct", "value": "m1"}}
+
+    results = await asyncio.gather(*[cache.get_or_compute("k1", compute) for _ in range(5)])
+    assert calls == 1
+    assert [cached for _, cached in results].count(False) == 1
+
+    suggestions, cached = await cache.get_or_compute("k1", compute)
+    assert cached and suggestions["marketId"]["value"] == "m1"
+
+    await cache.get_or_compute("k2", compute)
+    await cache.get_or_compute("k3", compute)
+    assert cache.get("k1") is None  # Evicted
+    assert cache.get_stats()["inflight_joins"] == 4
+
+
+@pytest.mark.asyncio
+async def test_computation_cancelled_only_when_all_waiters_leave():
+    cache = SuggestionCache()
+    cancelled = asyncio.Event()
+
+    async def slow():
+        try:
+            await asyncio.sleep(5)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+        return {}
+
+    patient = asyncio.create_task(cache.get_or_compute("k", slow))
+    await asyncio.sleep(0)
+    with pytest.raises(asyncio.TimeoutError):
+        await asyncio.wait_for(cache.get_or_compute("k", slow), timeout=0.01)
+    assert not cancelled.is_set() and cache.is_computing("k")
+
+    patient.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await patient
+    await asyncio.sleep(0)
+    assert cancelled.is_set()
+
+
+@pytest.mark.asyncio
+async def test_partials_reach_every_streaming_waiter():
+    cache = SuggestionCache()
+    halfway = asyncio.Event()
+    finish = asyncio.Event()
+
+    async def compute():
+        await cache.publish("k", "marketId", {"type": "direct", "value": "m1"})
+        halfway.set()
+        await finish.wait()
+        await cache.publish("k", "range", {"type": "direct", "value": "1d"})
+        return {}
+
+    received = {"first": [], "joiner": []}
+
+    def listener(name):
+        async def on_partial(param_name, suggestion):
+            received[name].append(param_name)
+        return on_partial
+
+    first = asyncio.create_task(cache.get_or_compute("k", compute, on_partial=listener("first")))
+    await halfway.wait()
+    # Joins after the first partial was published: it is replayed
+    joiner = asyncio.create_task(cache.get_or_compute("k", compute, on_partial=listener("joiner")))
+    silent = asyncio.create_task(cache.get_or_compute("k", compute))
+    await asyncio.sleep(0)
+    finish.set()
+    await asyncio.gather(first, joiner, silent)
+
+    assert received == {"first": ["marketId", "range"], "joiner": ["marketId", "range"]}
+
+
+@pytest.mark.asyncio
+async def test_empty_results_are_not_cached():
+    cache = SuggestionCache()
+    calls = 0
+
+    async def failing():
+        nonlocal calls
+        calls += 1
+        return {}
+
+    assert await cache.get_or_compute("k", failing) == ({}, False)
+    assert await cache.get_or_compute("k", failing) == ({}, False)
+    assert calls == 2
+
+    await cache.warm("k", failing)
+    assert cache.get("k") is None
@@ -0,0 +1,70 @@
+import asyncio
+
+import pytest
+
+from app.ai.llm_service import LLMService
+from app.ai.suggestion_prefetch import SuggestionPrefetcher, predict_next_commands
+
+PARAMS = [{"name": "marketId", "type": "market"}]
+
+
+class SlowSuggestLLM(LLMService):
+    def __init__(self, delay: float = 0.0):
+        super().__init__(api_key="test")
+        self.delay = delay
+        self.calls = []
+
+    async def suggest_params(self, command_id, params, current_params=None, state_manager=None, on_suggestion=None):
+        self.calls.append(command_id)
+        await asyncio.sleep(self.delay)
+        return {"marketId": {"type": "direct", "value": f"for-{command_id}"}}
+
+
+def test_predict_markov_then_frequency():
+    history = ["search", "chart", "search", "chart", "search"]
+    assert predict_next_commands(history, top_k=1) == [("chart", 1.0)]
+    # Only one transition out of "news": fall back to overall frequency
+    assert predict_next_commands(["chart", "news", "chart", "chart"], top_k=1)[0][0] == "chart"
+    assert predict_next_commands([]) == []
+
+
+@pytest.mark.asyncio
+async def test_prefetch_warms_cache_within_budget():
+    llm = SlowSuggestLLM()
+    prefetcher = SuggestionPrefetcher(llm, max_per_minute=1, delay_seconds=0)
+    prefetcher.record_request("chart", PARAMS, {})
+    prefetcher.record_request("news", PARAMS, {})
+
+    for command_id in ["search", "chart", "search", "news", "search"]:
+        await llm.track_execution(command_id, {})
+    prefetcher.on_execution()
+    await prefetcher._scheduler
+    await asyncio.gather(*prefetcher._warming.values())
+
+    assert len(llm.calls) == 1  # Budget allows a single prefetch
+    assert prefetcher.get_stats()["skipped_budget"] == 1
+
+    key = await llm.suggestion_cache_key(llm.calls[0], PARAMS, {})
+    suggestions, cached = await llm.suggestion_cache.get_or_compute(key, None)
+    assert cached and suggestions["marketId"]["value"] == f"for-{llm.calls[0]}"
+    assert llm.suggestion_cache.get_stats()["prefetch_hits"] == 1
+
+
+@pytest.mark.asyncio
+async def test_new_execution_cancels_stale_prefetch():
+    llm = SlowSuggestLLM(delay=5)
+    prefetcher = SuggestionPrefetcher(llm, max_per_minute=10, delay_seconds=0)
+    prefetcher.record_request("chart", PARAMS, {})
+
+    await llm.track_execution("chart", {})
+    prefetcher.on_execution()
+    await prefetcher._scheduler
+    stale = list(prefetcher._warming.values())
+    assert len(stale) == 1
+
+    await llm.track_execution("chart", {})
+    prefetcher.on_execution()
+    await asyncio.sleep(0)
+    assert stale[0].cancelled()
+    assert prefetcher.get_stats()["cancelled"] == 1
+    prefetcher.cancel()
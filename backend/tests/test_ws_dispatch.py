@@ -0,0 +1,93 @@
+import asyncio
+import time
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api import router
+from app.manager import SubscriptionManager
+from app.ws_dispatch import ConnectionDispatcher
+
+
+class FakeSocket:
+    def __init__(self):
+        self.sent = []
+
+    async def send_json(self, message):
+        self.sent.append(message)
+
+
+class SlowAgent:
+    assistant_id = "asst"
+
+    def __init__(self):
+        self.cancelled = False
+
+    async def acquire_thread(self):
+        return type("Thread", (), {"thread_id": "t1"})()
+
+    async def run_agent_turn(self, **kwargs):
+        try:
+            await asyncio.sleep(5)
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+        return {"reasoning": "", "actions": [], "done": False}
+
+
+@pytest.mark.asyncio
+async def test_caps_cancel_and_close():
+    socket = FakeSocket()
+    dispatcher = ConnectionDispatcher(socket, op_limits={"slow": 1})
+    started = asyncio.Event()
+
+    async def slow():
+        started.set()
+        await asyncio.sleep(5)
+
+    assert await dispatcher.submit("slow", slow, request_id="r1")
+    assert not await dispatcher.submit("slow", slow, request_id="r2")
+    assert socket.sent[-1]["request_id"] == "r2"
+
+    await started.wait()
+    assert dispatcher.cancel("r1")
+    await asyncio.sleep(0.01)
+    assert dispatcher.active("slow") == 0
+
+    await dispatcher.submit("slow", slow)
+    await dispatcher.submit("other", slow)
+    assert dispatcher.active() == 2
+    await dispatcher.close()
+    assert dispatcher.active() == 0
+
+
+def test_subscriptions_not_blocked_by_agent_step():
+    app = FastAPI()
+    app.include_router(router)
+    agent = SlowAgent()
+    app.state.agent = agent
+    app.state.llm = None
+
+    manager = SubscriptionManager()
+    with TestClient(app) as client:
+        with client.websocket_connect("/ws") as ws:
+            ws.send_json({"op": "agent_start", "prompt": "research btc", "commands": []})
+            ws.send_json({"op": "subscribe_market", "market_id": "dispatch-test"})
+
+            deadline = time.time() + 2
+            while "dispatch-test" not in manager.subscriptions and time.time() < deadline:
+                time.sleep(0.01)
+            assert "dispatch-test" in manager.subscriptions
+
+            ws.send_json({"op": "unsubscribe_market", "market_id": "dispatch-test"})
+            deadline = time.time() + 2
+            while "dispatch-test" in manager.subscriptions and time.time() < deadline:
+                time.sleep(0.01)
+            assert "dispatch-test" not in manager.subscriptions
+
+    # Disconnect cancels the in-flight agent step
+    deadline = time.time() + 2
+    while not agent.cancelled and time.time() < deadline:
+        time.sleep(0.01)
+    assert agent.cancelled